@@ -0,0 +1,144 @@
+"""
+Artifact Format Benchmark
+Size and load time of the model artifacts as joblib files versus the compact store
+
+For each codec the models/ artifacts are converted into a temporary
+ArtifactStore and compared with the original joblib files on:
+
+    - total bytes on disk
+    - time to load every artifact (fresh store, imports already warm)
+    - time to load the scoring set of the latest version (all_models,
+      best models and stacked ensembles), as a scoring pod does at start
+
+Predictions of every model loaded from the store are checked against the
+joblib originals on data/emf-data-sipc-ibri.csv.
+
+Usage:
+    python benchmarks/bench_artifacts.py --output artifact_bench.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.artifact_store import CODECS, ArtifactStore, artifact_paths, convert
+from emf_ml.features import TARGETS, engineer_feature_array, load_measurements
+from emf_ml.registry import MODELS_DIR, ModelRegistry
+
+
+def best_time(func, repeats=3):
+    """Return the fastest of several timed calls in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scoring_names(version):
+    """Bundle names a scoring pod loads for one version"""
+    names = [f'all_models_{version}']
+    for target in TARGETS:
+        names += [f'best_model_{target}_{version}', f'stacked_ensemble_{target}_{version}']
+    return [n for n in names if os.path.exists(os.path.join(MODELS_DIR, f'{n}.joblib'))]
+
+
+def load_store(root, names):
+    """Load bundles into a fresh store"""
+    store = ArtifactStore(root)
+    for name in names:
+        store.load(name)
+
+
+def load_joblib(names):
+    """Load joblib artifacts"""
+    for name in names:
+        joblib.load(os.path.join(MODELS_DIR, f'{name}.joblib'))
+
+
+def prediction_error(root):
+    """Largest absolute prediction difference between store and joblib models, over all scorable versions"""
+    original = ModelRegistry()
+    compact = ModelRegistry(artifact_store=ArtifactStore(root))
+    df = load_measurements()
+    worst = 0.0
+    for version in original.supported_versions():
+        X = engineer_feature_array(df, original.features(version))
+        pairs = [(original.load_all_models(version)[k], compact.load_all_models(version)[k])
+                 for k in original.load_all_models(version)]
+        for target in TARGETS:
+            for kind in ['best_model', 'stacked_ensemble']:
+                if os.path.exists(original.path(kind, version, target)):
+                    pairs.append((original.load(kind, version, target), compact.load(kind, version, target)))
+        for a, b in pairs:
+            difference = np.abs(original.predict(a, X, version) - compact.predict(b, X, version))
+            worst = max(worst, float(difference.max()))
+    return worst
+
+
+def main():
+    """Main function to run the artifact format benchmark"""
+    parser = argparse.ArgumentParser(description='Artifact size and load time benchmark')
+    parser.add_argument('--codecs', nargs='+', choices=sorted(CODECS), default=['none', 'zlib', 'zlib9', 'lzma'])
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Artifact Format Benchmark")
+    print("=" * 60)
+
+    names = [os.path.splitext(os.path.basename(p))[0] for p in artifact_paths(MODELS_DIR)]
+    latest = ModelRegistry().latest_version()
+    scoring = scoring_names(latest)
+    load_joblib(names)  # warm imports
+
+    results = [{
+        'format': 'joblib',
+        'bytes': sum(os.path.getsize(os.path.join(MODELS_DIR, f'{n}.joblib')) for n in names),
+        'load_all_s': best_time(lambda: load_joblib(names)),
+        'load_scoring_s': best_time(lambda: load_joblib(scoring)),
+        'max_prediction_error': 0.0,
+    }]
+    with tempfile.TemporaryDirectory() as work_dir:
+        for codec in args.codecs:
+            for float32 in (False, True):
+                label = f"compact-{codec}{'-f32' if float32 else ''}"
+                root = os.path.join(work_dir, label)
+                start = time.perf_counter()
+                store = convert(MODELS_DIR, ArtifactStore(root, codec=codec, float32=float32))
+                convert_s = time.perf_counter() - start
+                results.append({
+                    'format': label,
+                    'bytes': store.info()['stored_bytes'],
+                    'convert_s': convert_s,
+                    'load_all_s': best_time(lambda: load_store(root, names)),
+                    'load_scoring_s': best_time(lambda: load_store(root, scoring)),
+                    'max_prediction_error': prediction_error(root),
+                })
+
+    print(f"\n{len(names)} artifacts; scoring set of {latest}: {len(scoring)} artifacts\n")
+    print(f"{'Format':<22} {'Size KB':>9} {'Load all ms':>12} {'Scoring ms':>11} {'Max |dy|':>10}")
+    for r in results:
+        print(f"{r['format']:<22} {r['bytes'] / 1024:>9,.0f} {r['load_all_s'] * 1000:>12.1f} "
+              f"{r['load_scoring_s'] * 1000:>11.1f} {r['max_prediction_error']:>10.2e}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
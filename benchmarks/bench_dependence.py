@@ -0,0 +1,101 @@
+"""
+Partial Dependence Benchmark
+Batched grid x sample scoring against a loop over grid points
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.dependence import TWO_WAY_INPUTS, DependenceEngine, batched_predict, input_grid
+from emf_ml.features import load_measurements, synthetic_measurements
+
+
+def loop_predict(predict, columns, names, grids):
+    """Reference implementation: one predict call per grid point"""
+    mesh = np.meshgrid(*grids, indexing='ij')
+    out = np.empty(mesh[0].shape + (len(next(iter(columns.values()))),))
+    for point in np.ndindex(mesh[0].shape):
+        batch = dict(columns)
+        for name, values in zip(names, mesh):
+            batch[name] = np.full(len(batch[name]), values[point])
+        out[point] = predict(batch)
+    return out
+
+
+def run(n_rows=None, sizes=(40, 25), model='best'):
+    """
+    Time a two-way Distance x Temp PDP both ways
+
+    Args:
+        n_rows: Synthetic samples in the ICE set (None for the 66 measurements)
+        sizes: Grid sizes of the two inputs
+        model: 'best' or 'stacked'
+
+    Returns:
+        dict: Timings, rows scored and agreement of the two paths
+    """
+    data = load_measurements() if n_rows is None else synthetic_measurements(n_rows)
+    engine = DependenceEngine(model=model, data=data, cache_dir=None)
+    predict = engine.predictor('E_ICNIRP')
+    grids = [input_grid(data, n, s) for n, s in zip(TWO_WAY_INPUTS, sizes)]
+    predict({k: v[:1] for k, v in engine.columns.items()})
+
+    start = time.perf_counter()
+    batched = batched_predict(predict, engine.columns, TWO_WAY_INPUTS, grids)
+    batched_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    looped = loop_predict(predict, engine.columns, TWO_WAY_INPUTS, grids)
+    loop_s = time.perf_counter() - start
+
+    return {
+        'model': model,
+        'samples': len(data),
+        'grid': list(sizes),
+        'rows_scored': int(batched.size),
+        'loop_s': loop_s,
+        'batched_s': batched_s,
+        'speedup': loop_s / batched_s,
+        'max_abs_difference': float(np.abs(batched - looped).max()),
+    }
+
+
+def main():
+    """Main function to run the partial dependence benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=2000, help='Synthetic samples in the larger ICE set')
+    parser.add_argument('--model', choices=['best', 'stacked'], default='best')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Partial Dependence Benchmark")
+    print("=" * 60)
+
+    results = [run(None, model=args.model), run(args.rows, model=args.model)]
+    for r in results:
+        print(f"\nTwo-way {TWO_WAY_INPUTS[0]} x {TWO_WAY_INPUTS[1]} PDP ({r['model']} model)")
+        print(f"  Grid: {r['grid'][0]} x {r['grid'][1]} | samples: {r['samples']:,} | rows: {r['rows_scored']:,}")
+        print(f"  Loop over grid points: {r['loop_s']:8.2f} s")
+        print(f"  Batched:               {r['batched_s']:8.2f} s ({r['speedup']:.1f}x)")
+        print(f"  Max difference:        {r['max_abs_difference']:.2e}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+    return results
+
+
+if __name__ == '__main__':
+    main()
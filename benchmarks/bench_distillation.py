@@ -0,0 +1,146 @@
+"""
+Distillation Benchmark
+Fidelity versus speedup of the distilled students against the stacked ensembles
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.distillation import (
+    DEFAULT_EVAL_SAMPLES, GridStudent, STUDENT_KINDS, TreeStudent, dense_samples, distill, fidelity,
+    student_path, teacher_predictor,
+)
+from emf_ml.features import TARGETS, load_measurements, train_test_indices
+from emf_ml.registry import ModelRegistry
+
+
+STUDENT_CLASSES = {'grid': GridStudent, 'trees': TreeStudent}
+
+
+def time_single_row(predict, row, repeats):
+    """Return the median latency of single-row predictions in microseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def time_batch(predict, samples):
+    """Return the throughput of one batch prediction in rows per second"""
+    start = time.perf_counter()
+    predict(samples)
+    return len(samples) / (time.perf_counter() - start)
+
+
+def test_r2(predict, test, target):
+    """R2 against the measured test split"""
+    from sklearn.metrics import r2_score
+
+    return float(r2_score(test[target], predict(test)))
+
+
+def run(version=None, n_rows=DEFAULT_EVAL_SAMPLES, repeats=200, retrain=False):
+    """
+    Compare the teacher with each student for both targets
+
+    Args:
+        version: Artifact version (defaults to the latest)
+        n_rows: Fresh synthetic rows for fidelity and throughput
+        repeats: Single-row predictions timed per model
+        retrain: Distill new students instead of loading the saved ones
+
+    Returns:
+        list: One result dictionary per target and model
+    """
+    registry = ModelRegistry()
+    version = version or registry.latest_version()
+    df = load_measurements()
+    _, test_idx = train_test_indices(len(df))
+    test = df.iloc[test_idx]
+    samples = dense_samples(n_rows, df, random_state=7)
+    # A gateway passes plain arrays, not DataFrame rows
+    row = {name: samples[name].to_numpy()[:1] for name in samples.columns}
+
+    results = []
+    for target in TARGETS:
+        teacher = teacher_predictor(registry, version, target)
+        teacher_path = registry.path('stacked_ensemble', version, target)
+        teacher_us = time_single_row(teacher, row, repeats)
+        teacher_rate = time_batch(teacher, samples)
+        results.append({
+            'target': target,
+            'model': 'stacked ensemble',
+            'test_r2': test_r2(teacher, test, target),
+            'single_row_us': teacher_us,
+            'rows_per_s': teacher_rate,
+            'size_kb': os.path.getsize(teacher_path) / 1024,
+        })
+
+        for kind in STUDENT_KINDS:
+            path = student_path(registry, kind, target, version)
+            if retrain or not os.path.exists(path):
+                distill(registry, version, target, kind)
+            student = STUDENT_CLASSES[kind].load(path)
+            single_us = time_single_row(student.predict, row, repeats)
+            rate = time_batch(student.predict, samples)
+            results.append({
+                'target': target,
+                'model': f'{kind} student',
+                'test_r2': test_r2(student.predict, test, target),
+                'fidelity': fidelity(student, teacher, samples),
+                'single_row_us': single_us,
+                'rows_per_s': rate,
+                'size_kb': os.path.getsize(path) / 1024,
+                'single_row_speedup': teacher_us / single_us,
+                'batch_speedup': rate / teacher_rate,
+            })
+    return results
+
+
+def main():
+    """Main function to run the distillation benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--rows', type=int, default=DEFAULT_EVAL_SAMPLES, help='Evaluation batch size')
+    parser.add_argument('--retrain', action='store_true', help='Distill new students first')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Distillation Benchmark")
+    print("=" * 60)
+
+    results = run(args.version, args.rows, retrain=args.retrain)
+    for r in results:
+        print(f"\n{r['target']} - {r['model']}")
+        print(f"  Test R2:     {r['test_r2']:9.4f}")
+        if 'fidelity' in r:
+            f = r['fidelity']
+            print(f"  Fidelity:    R2 {f['r2']:.4f} | MAE {f['mae']:.4f} | max error {f['max_abs_error']:.3f}")
+        print(f"  Single row:  {r['single_row_us']:9.1f} us")
+        print(f"  Throughput:  {r['rows_per_s']:9.0f} rows/s")
+        print(f"  File size:   {r['size_kb']:9.1f} KB")
+        if 'batch_speedup' in r:
+            print(f"  Speedup:     {r['single_row_speedup']:.1f}x single row | {r['batch_speedup']:.1f}x batch")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+DOCX Packaging Benchmark
+Save time and size of the report with python-docx's save versus the packaging layer
+
+The EMF ML report is built once (with every plot in outputs/plots) and then
+saved repeatedly to a file in a temporary directory with:
+
+    - python-docx document.save(), which deflates every part serially
+    - save_document() at several XML compression levels and thread counts,
+      with the PNG media stored, and with the media deflated as well
+
+Every saved package is checked to hold byte-identical parts to the
+python-docx output.
+
+Usage:
+    python benchmarks/bench_docx_packaging.py --output packaging_bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from word_generator.document_builder import DocumentBuilder
+from word_generator.packaging import DEFAULT_WORKERS, save_document
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLOTS_DIR = os.path.join(BASE_DIR, 'outputs', 'plots')
+
+
+def best_time(func, repeats=5):
+    """Return the fastest of several timed calls in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def build_document(plots_dir):
+    """Build the report in memory and return the python-docx Document"""
+    builder = DocumentBuilder(io.BytesIO(), plots_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder.build()
+    return builder.document
+
+
+def same_parts(path, reference):
+    """Return True when two packages hold the same members with the same bytes"""
+    with zipfile.ZipFile(path) as a, zipfile.ZipFile(reference) as b:
+        return a.testzip() is None and a.namelist() == b.namelist() and \
+            all(a.read(n) == b.read(n) for n in a.namelist())
+
+
+def main():
+    """Main function to run the DOCX packaging benchmark"""
+    parser = argparse.ArgumentParser(description='DOCX save time and size benchmark')
+    parser.add_argument('--plots-dir', default=PLOTS_DIR)
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 6, 9])
+    parser.add_argument('--threads', type=int, nargs='+', default=sorted({1, 4, DEFAULT_WORKERS}))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("DOCX Packaging Benchmark")
+    print("=" * 60)
+
+    document = build_document(args.plots_dir)
+    configurations = [(f'packaging level={level} threads={threads}', dict(level=level, workers=threads))
+                      for level in args.levels for threads in args.threads]
+    threads = max(args.threads)
+    configurations.append((f'packaging level=6 threads={threads} media=6',
+                           dict(level=6, workers=threads, media_level=6)))
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        reference = os.path.join(work_dir, 'python-docx.docx')
+        results.append({
+            'method': 'python-docx save',
+            'save_s': best_time(lambda: document.save(reference), args.repeats),
+            'bytes': os.path.getsize(reference),
+            'identical_parts': True,
+        })
+        for i, (label, options) in enumerate(configurations):
+            path = os.path.join(work_dir, f'packaged_{i}.docx')
+            results.append({
+                'method': label,
+                'save_s': best_time(lambda: save_document(document, path, **options), args.repeats),
+                'bytes': os.path.getsize(path),
+                'identical_parts': same_parts(path, reference),
+            })
+
+    baseline = results[0]
+    print(f"\n{'Method':<42} {'Save ms':>8} {'Speedup':>8} {'Size KB':>9} {'Parts':>6}")
+    for r in results:
+        print(f"{r['method']:<42} {r['save_s'] * 1000:>8.1f} {baseline['save_s'] / r['save_s']:>7.2f}x "
+              f"{r['bytes'] / 1024:>9,.0f} {'same' if r['identical_parts'] else 'DIFF':>6}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Measurement Store Benchmark
+Compares CSV parsing with the columnar memory-mapped measurement store
+
+Each load runs in a fresh process so the reported peak memory (VmHWM minus
+the resident size after imports) belongs to that load alone.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.features import synthetic_measurements
+from emf_ml.store import MeasurementStore
+
+
+# Decimals reported by the field instruments (as in data/emf-data-sipc-ibri.csv)
+CSV_DECIMALS = {'Time_Hour': 2, 'Temp_C': 1, 'Humidity_Pct': 1, 'E_ICNIRP': 4, 'H_ICNIRP': 4}
+
+CAMPAIGN_DAYS = 90
+LAST_DAYS = 30
+
+
+def build_csv(path, n_rows, first_date='2025-09-12'):
+    """Write a synthetic measurement CSV spread over CAMPAIGN_DAYS campaign dates"""
+    df = synthetic_measurements(n_rows)
+    for col, decimals in CSV_DECIMALS.items():
+        df[col] = df[col].round(decimals)
+    df['Distance_m'] = df['Distance_m'].round().astype(np.int64)
+    days = np.random.default_rng(0).integers(0, CAMPAIGN_DAYS, n_rows)
+    df.insert(0, 'Campaign_Date', np.datetime64(first_date, 'D') + days.astype('timedelta64[D]'))
+    df.to_csv(path, index=False)
+
+
+def _rss_kb(field):
+    """Read a memory field of this process from /proc in KB"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1])
+    return 0
+
+
+def _measure(task, args, queue):
+    """Run one load in a child process and report time and peak memory"""
+    baseline = _rss_kb('VmRSS:')
+    start = time.perf_counter()
+    df = task(*args)
+    elapsed = time.perf_counter() - start
+    queue.put({
+        'seconds': elapsed,
+        'peak_mb': (_rss_kb('VmHWM:') - baseline) / 1024,
+        'frame_mb': df.memory_usage(deep=True).sum() / 2 ** 20,
+        'rows': len(df),
+    })
+
+
+def isolated(task, *args):
+    """Run task(*args) in a fresh process"""
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(task, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def csv_full(path):
+    """Parse the whole CSV"""
+    return pd.read_csv(path, parse_dates=['Campaign_Date'])
+
+
+def csv_query(path, last_date):
+    """Parse the CSV and apply the Suhar / Circuit 2 / last-days query"""
+    df = pd.read_csv(path, usecols=['Campaign_Date', 'City', 'Circuit', 'E_ICNIRP', 'H_ICNIRP'],
+                     parse_dates=['Campaign_Date'])
+    first = pd.Timestamp(last_date) - pd.Timedelta(days=LAST_DAYS - 1)
+    mask = (df['City'] == 1) & (df['Circuit'] == 2) & (df['Campaign_Date'] >= first)
+    return df.loc[mask, ['E_ICNIRP', 'H_ICNIRP']]
+
+
+def store_full(root):
+    """Load every column from the store"""
+    return MeasurementStore(root).load()
+
+
+def store_query(root):
+    """Load two columns for Suhar, Circuit 2, last days"""
+    store = MeasurementStore(root)
+    filters = [('City', '==', 'Suhar'), ('Circuit', '==', 2), store.last_days(LAST_DAYS)]
+    return store.load(['E_ICNIRP', 'H_ICNIRP'], filters)
+
+
+def disk_mb(path):
+    """Size of a file or directory tree in MB"""
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 2 ** 20
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files) / 2 ** 20
+
+
+def run(n_rows=10_000_000, workdir=None):
+    """
+    Run the benchmark
+
+    Args:
+        n_rows: Synthetic measurement rows
+        workdir: Directory for the CSV and store (defaults to a temp directory)
+
+    Returns:
+        dict: Timings, memory and sizes
+    """
+    if workdir is None:
+        with tempfile.TemporaryDirectory(prefix='emf_store_') as tmp:
+            return run(n_rows, tmp)
+    csv_path = os.path.join(workdir, 'measurements.csv')
+    root = os.path.join(workdir, 'store')
+
+    build_csv(csv_path, n_rows)
+    start = time.perf_counter()
+    store = MeasurementStore(root)
+    store.ingest_csv(csv_path)
+    ingest_s = time.perf_counter() - start
+
+    results = {
+        'rows': n_rows,
+        'csv_mb': disk_mb(csv_path),
+        'store_mb': disk_mb(root),
+        'partitions': len(store.partitions()),
+        'ingest_s': ingest_s,
+        'csv_full': isolated(csv_full, csv_path),
+        'store_full': isolated(store_full, root),
+        'csv_query': isolated(csv_query, csv_path, str(store.latest_date())),
+        'store_query': isolated(store_query, root),
+    }
+    results['query_rows_match'] = results['csv_query']['rows'] == results['store_query']['rows']
+    return results
+
+
+def main():
+    """Main function to run the measurement store benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10_000_000, help='Synthetic measurement rows')
+    parser.add_argument('--workdir', help='Directory for the generated CSV and store')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Measurement Store Benchmark")
+    print("=" * 60)
+
+    r = run(args.rows, args.workdir)
+    print(f"\n{r['rows']:,} rows: CSV {r['csv_mb']:.0f} MB | store {r['store_mb']:.0f} MB "
+          f"in {r['partitions']} partitions (one-off ingest {r['ingest_s']:.1f} s)")
+    for name in ['csv_full', 'store_full', 'csv_query', 'store_query']:
+        m = r[name]
+        print(f"  {name:12s} {m['seconds']:7.2f} s | peak {m['peak_mb']:7.0f} MB | "
+              f"frame {m['frame_mb']:7.0f} MB | {m['rows']:,} rows")
+    print(f"  Query results match: {r['query_rows_match']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(r, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+    return r
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Multi Target Benchmark
+Compares the two single-target best models with joint E_ICNIRP/H_ICNIRP models
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.features import TARGETS, engineer_feature_array, load_measurements, synthetic_measurements, train_test_indices
+from emf_ml.multi_target import JOINT_KINDS, train_joint_model
+from emf_ml.registry import ModelRegistry
+
+
+def time_single_row(predict, row, repeats):
+    """Return the median latency of single-row predictions in microseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def time_batch(predict, X):
+    """Return the throughput of one batch prediction in rows per second"""
+    start = time.perf_counter()
+    predict(X)
+    return X.shape[0] / (time.perf_counter() - start)
+
+
+def test_metrics(predictions, test):
+    """Test R2 and RMSE per target"""
+    from sklearn.metrics import mean_squared_error, r2_score
+
+    return {
+        target: {
+            'r2': float(r2_score(test[target], predictions[target])),
+            'rmse': float(np.sqrt(mean_squared_error(test[target], predictions[target]))),
+        }
+        for target in TARGETS
+    }
+
+
+def run(version=None, n_rows=100_000, repeats=200):
+    """
+    Benchmark the two-model path against joint models
+
+    Args:
+        version: Artifact version (defaults to the latest)
+        n_rows: Rows in the throughput batch
+        repeats: Single-row predictions timed per path
+
+    Returns:
+        list: One result dictionary per prediction path
+    """
+    registry = ModelRegistry()
+    version = version or registry.latest_version()
+    features = registry.features(version)
+    df = load_measurements()
+    _, test_idx = train_test_indices(len(df))
+    test = df.iloc[test_idx]
+    X_test = engineer_feature_array(test, features)
+    X = engineer_feature_array(synthetic_measurements(n_rows), features)
+
+    best = {t: registry.load_best_model(t, version) for t in TARGETS}
+    paths = {'two best models': (lambda A: {t: best[t].predict(A) for t in TARGETS}, list(best.values()))}
+    for kind in JOINT_KINDS:
+        joint = train_joint_model(registry, version, kind, save=False)
+        paths[f'joint {kind}'] = (joint.predict_targets, [joint])
+
+    results = []
+    for name, (predict, models) in paths.items():
+        results.append({
+            'path': name,
+            'metrics': test_metrics(predict(X_test), test),
+            'single_row_us': time_single_row(predict, X[:1], repeats),
+            'rows_per_s': time_batch(predict, X),
+            'model_kb': sum(len(pickle.dumps(m)) for m in models) / 1024,
+        })
+    return results
+
+
+def main():
+    """Main function to run the multi-target benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--rows', type=int, default=100_000, help='Throughput batch size')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Multi Target Benchmark")
+    print("=" * 60)
+
+    results = run(args.version, args.rows)
+    for r in results:
+        scores = ' | '.join(f"{t} R2 {m['r2']:.4f} RMSE {m['rmse']:.3f}" for t, m in r['metrics'].items())
+        print(f"\n{r['path']}")
+        print(f"  Test:        {scores}")
+        print(f"  Single row:  {r['single_row_us']:9.1f} us (both targets)")
+        print(f"  Throughput:  {r['rows_per_s']:9.0f} rows/s (both targets)")
+        print(f"  Model size:  {r['model_kb']:9.1f} KB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Render Service Benchmark
+Cold one-shot report rendering versus the warm rendering service
+
+Cold: a fresh `python -m word_generator.render_service render` process per
+report, timed end to end (interpreter start, imports, template parsing,
+styling and the build), as a report script pays today.
+
+Warm: requests to a running service, timed end to end over HTTP, both
+uncached ("cache": false, a warm worker renders the report) and cached
+(the output is served from the content-addressed cache).
+
+Usage:
+    python benchmarks/bench_render_service.py --requests 10 --format docx
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PORT = 8779
+STARTUP_TIMEOUT = 120
+
+
+def cold_render(spec_path, output_path):
+    """Time one render in a fresh process"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'word_generator.render_service', 'render', spec_path, output_path],
+                   cwd=BASE_DIR, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def post(url, spec):
+    """POST a specification and return (seconds, bytes, X-Cache header)"""
+    request = urllib.request.Request(url, data=json.dumps(spec).encode(), method='POST')
+    start = time.perf_counter()
+    with urllib.request.urlopen(request) as response:
+        data = response.read()
+        cache = response.headers.get('X-Cache')
+    return time.perf_counter() - start, data, cache
+
+
+def start_service(port, workers, cache_dir):
+    """Start the service and wait until /health answers"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'word_generator.render_service', 'serve', '--port', str(port),
+         '--workers', str(workers), '--cache-dir', cache_dir, '--quiet'],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health') as response:
+                response.read()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError('Render service exited during startup')
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('Render service did not start')
+
+
+def summarize(timings):
+    """Median, min and max in milliseconds"""
+    return {'median_ms': statistics.median(timings) * 1000, 'min_ms': min(timings) * 1000,
+            'max_ms': max(timings) * 1000, 'n': len(timings)}
+
+
+def main():
+    """Main function to run the render service benchmark"""
+    parser = argparse.ArgumentParser(description='Cold vs warm report rendering latency')
+    parser.add_argument('--requests', type=int, default=10, help='Renders per mode')
+    parser.add_argument('--format', choices=['docx', 'pdf'], default='docx')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Render Service Benchmark ({args.format.upper()})")
+    print("=" * 60)
+
+    spec = {'format': args.format}
+    with tempfile.TemporaryDirectory() as work_dir:
+        spec_path = os.path.join(work_dir, 'spec.json')
+        with open(spec_path, 'w') as f:
+            json.dump(spec, f)
+        output_path = os.path.join(work_dir, f'report.{args.format}')
+
+        print(f"\nCold: {args.requests} one-shot render process(es)...")
+        cold = [cold_render(spec_path, output_path) for _ in range(args.requests)]
+
+        print(f"Warm: starting service with {args.workers} worker(s)...")
+        url = f'http://127.0.0.1:{args.port}/render'
+        start = time.perf_counter()
+        process = start_service(args.port, args.workers, os.path.join(work_dir, 'cache'))
+        startup = time.perf_counter() - start
+        try:
+            uncached = [post(url, dict(spec, cache=False))[0] for _ in range(args.requests)]
+            post(url, spec)
+            hits = [post(url, spec) for _ in range(args.requests)]
+        finally:
+            process.terminate()
+            process.wait()
+
+    if any(cache != 'hit' for _, _, cache in hits):
+        print("WARNING: cached requests were not all served from the cache")
+    results = {
+        'format': args.format,
+        'service_startup_s': startup,
+        'cold_process': summarize(cold),
+        'warm_uncached': summarize(uncached),
+        'warm_cached': summarize([t for t, _, _ in hits]),
+    }
+
+    print(f"\nService startup (workers warm): {startup:.2f} s")
+    print(f"\n{'Mode':<16} {'Median ms':>10} {'Min ms':>10} {'Max ms':>10}")
+    for mode in ['cold_process', 'warm_uncached', 'warm_cached']:
+        r = results[mode]
+        print(f"{mode:<16} {r['median_ms']:>10.1f} {r['min_ms']:>10.1f} {r['max_ms']:>10.1f}")
+    cold_median = results['cold_process']['median_ms']
+    print(f"\nSpeed-up vs cold: {cold_median / results['warm_uncached']['median_ms']:.1f}x uncached, "
+          f"{cold_median / results['warm_cached']['median_ms']:.0f}x cached")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+"""
+Benchmark Suite
+Report building, table and image insertion, PDF conversion and model scoring
+
+Every workload is generated from data/emf-data-sipc-ibri.csv (resampled
+with synthetic_measurements) or from the report's own content and
+plots, scaled up to stress the code paths the report farm runs:
+
+    - DocumentBuilder.build() at 1x, 10x and 100x content and table size
+    - create_table / create_results_table with large row counts
+    - add_image with many figures
+    - convert_to_pdf on large Markdown inputs
+    - predict latency and throughput for every model in all_models_*.joblib
+
+Results are written as JSON and compared against a stored baseline
+(benchmarks/baseline.json); metrics that are more than --tolerance worse
+than the baseline are reported as regressions and make the run exit with
+status 1.
+
+Usage:
+    python benchmarks/bench_suite.py --output bench_results.json
+    python benchmarks/bench_suite.py --write-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+
+import convert_to_pdf
+from emf_ml.export import TABLES_DIR, load_tables
+from emf_ml.features import BASE_DIR, engineer_feature_array, synthetic_measurements
+from emf_ml.registry import ModelRegistry, is_tree_model
+from word_generator.document_builder import DocumentBuilder
+from word_generator.images import add_image
+from word_generator.tables import create_results_table, create_table
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+PLOTS_DIR = os.path.join(BASE_DIR, 'outputs', 'plots')
+MARKDOWN_PATH = os.path.join(BASE_DIR, 'outputs', 'METHODOLOGY_RESULTS_DISCUSSION.md')
+
+SCALES = (1, 10, 100)
+TABLE_ROWS = (1_000, 10_000)
+IMAGE_COUNTS = (10, 100)
+PREDICT_ROWS = 100_000
+DEFAULT_TOLERANCE = 0.25
+
+
+class ScaledDocumentBuilder(DocumentBuilder):
+    """
+    DocumentBuilder that repeats the report body `scale` times
+
+    The in-memory result tables (already `scale` times longer) are used in
+    the first pass only and the published tables in the repeats, so the
+    document grows linearly with the scale.
+    """
+
+    def __init__(self, output_path, plots_dir=None, results=None, scale=1):
+        super().__init__(output_path, plots_dir, results)
+        self.scale = scale
+
+    def _add_methodology_section(self):
+        self._repeat(super()._add_methodology_section)
+
+    def _add_results_section(self):
+        self._repeat(super()._add_results_section)
+
+    def _add_discussion_section(self):
+        self._repeat(super()._add_discussion_section)
+
+    def _repeat(self, add_section):
+        """Add a section `scale` times with the scaled results in the first pass"""
+        results = self.results
+        for i in range(self.scale):
+            self.results = results if i == 0 else {}
+            add_section()
+        self.results = results
+
+
+def metric(name, value, unit, higher_is_better=False, **details):
+    """Build one result record"""
+    return {'name': name, 'value': float(value), 'unit': unit, 'higher_is_better': higher_is_better, **details}
+
+
+def best_time(func, repeats=3):
+    """Return the fastest of several timed calls in seconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scaled_results(scale):
+    """In-memory result tables with `scale` times the published rows"""
+    tables = load_tables(TABLES_DIR, names=['descriptive_statistics', 'model_results_comparison'])
+    results = dict(tables)
+    if 'model_results_comparison' in tables:
+        results['model_results_comparison'] = pd.concat([tables['model_results_comparison']] * scale,
+                                                        ignore_index=True)
+    sobol_path = os.path.join(TABLES_DIR, 'sobol_indices.csv')
+    if os.path.exists(sobol_path):
+        results['sobol_indices'] = pd.concat([pd.read_csv(sobol_path)] * scale, ignore_index=True)
+    return results
+
+
+def measurement_rows(n_rows):
+    """Synthetic measurement rows formatted as table cells"""
+    data = synthetic_measurements(n_rows)
+    columns = [c for c in ['Distance_m', 'Temp_C', 'Humidity_Pct', 'Time_Hour', 'E_ICNIRP', 'H_ICNIRP'] if c in data]
+    return columns, data[columns].round(3).astype(str).values.tolist()
+
+
+def synthetic_markdown(scale):
+    """The report Markdown repeated `scale` times, each copy followed by a measurement table"""
+    with open(MARKDOWN_PATH, 'r', encoding='utf-8') as f:
+        report = f.read()
+    headers, rows = measurement_rows(66)
+    table = '\n'.join(
+        ['| ' + ' | '.join(headers) + ' |', '|' + '---|' * len(headers)]
+        + ['| ' + ' | '.join(r) + ' |' for r in rows]
+    )
+    return '\n\n'.join(f'{report}\n\n## Measurements ({i + 1})\n\n{table}\n' for i in range(scale))
+
+
+def bench_document_build(scales, work_dir):
+    """Time DocumentBuilder.build() at several content and table scales"""
+    # Untimed warm-up build so the first scale does not pay for lazy imports
+    with contextlib.redirect_stdout(io.StringIO()):
+        DocumentBuilder(os.path.join(work_dir, 'warmup.docx'), PLOTS_DIR).build()
+    results = []
+    for scale in scales:
+        path = os.path.join(work_dir, f'report_{scale}x.docx')
+        builder = ScaledDocumentBuilder(path, PLOTS_DIR, scaled_results(scale), scale=scale)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            builder.build()
+        elapsed = time.perf_counter() - start
+        results.append(metric(f'document_build_{scale}x', elapsed, 's', scale=scale,
+                              size_kb=os.path.getsize(path) / 1024))
+    return results
+
+
+def bench_tables(row_counts):
+    """Time create_table and create_results_table with large row counts"""
+    results = []
+    for n_rows in row_counts:
+        headers, rows = measurement_rows(n_rows)
+        elapsed = best_time(lambda: create_table(Document(), headers, rows, 'Table X: Measurements'), repeats=1)
+        results.append(metric(f'create_table_{n_rows}_rows', elapsed, 's', rows=n_rows))
+        elapsed = best_time(lambda: create_results_table(Document(), 'Measurements', headers, rows,
+                                                         highlight_best=True), repeats=1)
+        results.append(metric(f'create_results_table_{n_rows}_rows', elapsed, 's', rows=n_rows))
+    return results
+
+
+def bench_images(counts):
+    """Time add_image with many figures (the report plots, cycled)"""
+    plots = sorted(os.path.join(PLOTS_DIR, f) for f in os.listdir(PLOTS_DIR) if f.endswith('.png'))
+    results = []
+    for count in counts:
+        def add_all():
+            document = Document()
+            for i in range(count):
+                add_image(document, plots[i % len(plots)], f'Figure {i + 1}')
+        results.append(metric(f'add_image_{count}_figures', best_time(add_all, repeats=1), 's', figures=count))
+    return results
+
+
+def bench_pdf(scales, work_dir):
+    """Time the Markdown to PDF conversion on large inputs"""
+    results = []
+    for scale in scales:
+        source = os.path.join(work_dir, f'report_{scale}x.md')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(synthetic_markdown(scale))
+        target = os.path.join(work_dir, f'report_{scale}x.pdf')
+        start = time.perf_counter()
+        convert_to_pdf.convert(source, target)
+        elapsed = time.perf_counter() - start
+        results.append(metric(f'convert_to_pdf_{scale}x', elapsed, 's', scale=scale,
+                              markdown_kb=os.path.getsize(source) / 1024))
+    return results
+
+
+def bench_predict(version=None, n_rows=PREDICT_ROWS, repeats=200):
+    """Time single-row latency and batch throughput of every all_models estimator"""
+    registry = ModelRegistry()
+    version = version or registry.latest_version()
+    X = engineer_feature_array(synthetic_measurements(n_rows), registry.features(version))
+    row = X[:1]
+
+    # Random Forest and XGBoost were trained on raw features and must bypass the scaler
+    for key in ['rf_e', 'rf_h', 'xgb_e', 'xgb_h']:
+        if not is_tree_model(registry.load_model(key, version)):
+            raise RuntimeError(f'{key} is not recognized as a tree model and would be scored on scaled input')
+
+    results = []
+    for key, model in registry.load_all_models(version).items():
+        registry.predict(model, row, version)
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            registry.predict(model, row, version)
+            timings.append(time.perf_counter() - start)
+        results.append(metric(f'predict_{key}_latency', np.median(timings) * 1e6, 'us', model=key))
+        elapsed = best_time(lambda: registry.predict(model, X, version), repeats=1)
+        results.append(metric(f'predict_{key}_throughput', n_rows / elapsed, 'rows/s', higher_is_better=True,
+                              model=key, rows=n_rows))
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results with a baseline
+
+    Args:
+        results: List of metric records
+        baseline: List of metric records from an earlier run
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        list of (name, baseline value, value, change, regressed) tuples;
+        change is the relative slowdown (positive is worse)
+    """
+    previous = {m['name']: m for m in baseline}
+    rows = []
+    for m in results:
+        if m['name'] not in previous or previous[m['name']]['value'] <= 0 or m['value'] <= 0:
+            continue
+        old = previous[m['name']]['value']
+        change = old / m['value'] - 1 if m['higher_is_better'] else m['value'] / old - 1
+        rows.append((m['name'], old, m['value'], change, change > tolerance))
+    return rows
+
+
+def environment():
+    """Describe the machine the benchmarks ran on"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+
+def run(scales=SCALES, table_rows=TABLE_ROWS, image_counts=IMAGE_COUNTS, predict_rows=PREDICT_ROWS):
+    """
+    Run every benchmark
+
+    Returns:
+        dict with 'environment' and 'results' (list of metric records)
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        results = (bench_document_build(scales, work_dir)
+                   + bench_tables(table_rows)
+                   + bench_images(image_counts)
+                   + bench_pdf(scales, work_dir)
+                   + bench_predict(n_rows=predict_rows))
+    return {'environment': environment(), 'results': results}
+
+
+def main():
+    """Main function to run the benchmark suite"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Optional JSON results file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Baseline JSON file')
+    parser.add_argument('--write-baseline', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed relative slowdown before a metric counts as a regression')
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES),
+                        help='Content scales for the document build and PDF conversion')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Benchmark Suite")
+    print("=" * 60)
+
+    report = run(scales=args.scales)
+    print(f"\n{'Benchmark':<36} {'Value':>14}  Unit")
+    for m in report['results']:
+        print(f"{m['name']:<36} {m['value']:>14,.3f}  {m['unit']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    regressions = []
+    if args.write_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparison with {args.baseline} (tolerance {args.tolerance:.0%})")
+        for name, old, new, change, regressed in compare(report['results'], baseline['results'], args.tolerance):
+            flag = 'REGRESSION' if regressed else ''
+            print(f"  {name:<36} {old:>14,.3f} -> {new:>14,.3f}  {change:+7.1%}  {flag}")
+            if regressed:
+                regressions.append(name)
+        print(f"\n{len(regressions)} regression(s)")
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --write-baseline to create one")
+
+    print("\n" + "=" * 60)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
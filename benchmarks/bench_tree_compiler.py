@@ -0,0 +1,117 @@
+"""
+Tree Compiler Benchmark
+Compares compiled array-based predictors with the original model.predict
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emf_ml.features import engineer_feature_array, synthetic_measurements
+from emf_ml.registry import ModelRegistry
+from emf_ml.tree_compiler import compile_model, load_compiled
+
+
+TREE_MODELS = ['xgb_e', 'xgb_h', 'rf_e', 'rf_h']
+
+
+def time_single_row(predict, row, repeats):
+    """Return the median latency of single-row predictions in microseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(row)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1e6)
+
+
+def time_batch(predict, X):
+    """Return the throughput of one batch prediction in rows per second"""
+    start = time.perf_counter()
+    predict(X)
+    return X.shape[0] / (time.perf_counter() - start)
+
+
+def run(version=None, n_rows=1_000_000, repeats=200):
+    """
+    Run the benchmark for every tree model of a version
+
+    Args:
+        version: Artifact version (defaults to the latest)
+        n_rows: Rows in the throughput batch
+        repeats: Single-row predictions timed per model
+
+    Returns:
+        list: One result dictionary per model
+    """
+    registry = ModelRegistry()
+    version = version or registry.latest_version()
+    X = engineer_feature_array(synthetic_measurements(n_rows))
+    row = X[:1]
+
+    results = []
+    for key in TREE_MODELS:
+        model = registry.load_model(key, version)
+        if hasattr(model, 'n_jobs'):
+            model.set_params(n_jobs=1)  # Fixed summation order for exact comparison
+        compiled = compile_model(model)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = compiled.save(os.path.join(tmp, f'{key}.npz'))
+            file_size = os.path.getsize(path)
+            compiled = load_compiled(path)
+
+        identical = bool(np.array_equal(model.predict(X), compiled.predict(X)))
+        results.append({
+            'model': key,
+            'version': version,
+            'trees': compiled.n_trees,
+            'nodes': compiled.n_nodes,
+            'file_kb': file_size / 1024,
+            'identical': identical,
+            'predict_single_us': time_single_row(model.predict, row, repeats),
+            'compiled_single_us': time_single_row(compiled.predict, row, repeats),
+            'predict_rows_per_s': time_batch(model.predict, X),
+            'compiled_rows_per_s': time_batch(compiled.predict, X),
+        })
+    return results
+
+
+def main():
+    """Main function to run the tree compiler benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Throughput batch size')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Tree Compiler Benchmark")
+    print("=" * 60)
+
+    results = run(args.version, args.rows)
+    for r in results:
+        print(f"\n{r['model']} ({r['trees']} trees, {r['nodes']} nodes, {r['file_kb']:.1f} KB compiled)")
+        print(f"  Identical predictions: {r['identical']}")
+        print(f"  Single row:  predict {r['predict_single_us']:9.1f} us | compiled {r['compiled_single_us']:9.1f} us")
+        print(f"  Throughput:  predict {r['predict_rows_per_s']:9.0f} r/s | compiled {r['compiled_rows_per_s']:9.0f} r/s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    print("\n" + "=" * 60)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# EMF ML Package
+# Model loading, feature engineering and fast scoring for the EMF ML Analysis
+
+from .features import FEATURES, TARGETS, load_measurements, engineer_features
+from .registry import ModelRegistry
+from .tree_compiler import CompiledTreeEnsemble, compile_model, load_compiled
+from .streaming_stats import StreamingDescriptiveStats, describe_chunks, describe_csv
+from .correlation import StreamingCorrelation, correlate_chunks
+from .scenarios import ScenarioEngine, scenario_grid
+from .conformal import ConformalCalibration, calibrate, load_calibration
+from .prediction import EMFPredictor
+from .store import MeasurementStore, open_store
+from .validation import InputProfile, InputValidator, build_profile, load_profile
+from .monitor import ExceedanceMonitor, file_source, socket_source
+from .export import export_tables, load_tables
+from .multi_target import JointTargetModel, train_joint_model
+from .distillation import GridStudent, TreeStudent, distill
+from .online import update_version
+from .attribution import TreeExplainer, explain, permutation_importance
+from .dependence import DependenceEngine
+from .sensitivity import saltelli_matrices, sobol_indices
+from .report_index import ReportIndex
+from .docx_reader import read_report, read_reports
+from .artifact_store import ArtifactStore
+from .quality import DataQualityProfile, profile_chunks, profile_csv
+from .learning_curves import estimate_sample_sizes, run_curves
+from .model_comparison import FoldCache, compare_models, corrected_ttest, run_repeated_cv
+from .partitioned import PartitionedModel, train_partitioned_models
+
+__all__ = [
+    'FEATURES',
+    'TARGETS',
+    'load_measurements',
+    'engineer_features',
+    'ModelRegistry',
+    'CompiledTreeEnsemble',
+    'compile_model',
+    'load_compiled',
+    'StreamingDescriptiveStats',
+    'describe_chunks',
+    'describe_csv',
+    'StreamingCorrelation',
+    'correlate_chunks',
+    'ScenarioEngine',
+    'scenario_grid',
+    'ConformalCalibration',
+    'calibrate',
+    'load_calibration',
+    'EMFPredictor',
+    'MeasurementStore',
+    'open_store',
+    'InputProfile',
+    'InputValidator',
+    'build_profile',
+    'load_profile',
+    'ExceedanceMonitor',
+    'file_source',
+    'socket_source',
+    'export_tables',
+    'load_tables',
+    'JointTargetModel',
+    'train_joint_model',
+    'GridStudent',
+    'TreeStudent',
+    'distill',
+    'update_version',
+    'TreeExplainer',
+    'explain',
+    'permutation_importance',
+    'DependenceEngine',
+    'saltelli_matrices',
+    'sobol_indices',
+    'ReportIndex',
+    'read_report',
+    'read_reports',
+    'ArtifactStore',
+    'DataQualityProfile',
+    'profile_chunks',
+    'profile_csv',
+    'run_curves',
+    'estimate_sample_sizes',
+    'FoldCache',
+    'run_repeated_cv',
+    'corrected_ttest',
+    'compare_models',
+    'PartitionedModel',
+    'train_partitioned_models',
+]
@@ -0,0 +1,384 @@
+"""
+Artifact Store Module
+Compact, deduplicated storage of the fitted model artifacts
+
+The joblib artifacts pickle the same fitted estimators several times over:
+every all_models_<version>.joblib generation repeats the base models, each
+best_model_* file repeats one of them, and the stacked ensembles carry their
+own copies of the base learners. This store keeps every fitted estimator
+exactly once:
+
+    models/compact/
+        objects/ab/ab12...ef.zlib     one compressed pickle per estimator
+        bundles/all_models_20251210_101547.json   root object and the objects it references
+
+Each estimator (any scikit-learn style estimator except the individual
+decision trees of a forest, which stay inside their forest) is pickled on
+its own and replaced in its parent by a reference to the sha256 of its
+pickle, so identical estimators in different artifacts - or different
+versions - are written and loaded once. A loaded store returns the same
+object for every bundle that references it; treat loaded models as
+read-only.
+
+scikit-learn decision trees are stored column-wise in narrow dtypes instead
+of the 64-byte node records. Thresholds are rounded down to float32, which
+is exact: trees compare float32 inputs with `x <= threshold`, and no float32
+value lies between a threshold and the largest float32 below it. Leaf values
+are stored as float32 when the resulting prediction error bound stays within
+the tolerance (otherwise as float64). XGBoost models are float32 already.
+
+Object pickles are compressed with a fast codec (zlib at level 1 by
+default; lz4 and zstd are not part of the environment).
+
+Usage:
+    python -m emf_ml.artifact_store convert
+    python -m emf_ml.artifact_store info
+"""
+
+import argparse
+import io
+import json
+import lzma
+import os
+import pickle
+import zlib
+import hashlib
+
+import numpy as np
+
+from .features import BASE_DIR
+
+
+STORE_DIR = os.path.join(BASE_DIR, 'models', 'compact')
+
+# name -> (compress, decompress)
+CODECS = {
+    'none': (lambda data: data, lambda data: data),
+    'zlib': (lambda data: zlib.compress(data, 1), zlib.decompress),
+    'zlib9': (lambda data: zlib.compress(data, 9), zlib.decompress),
+    'lzma': (lambda data: lzma.compress(data, preset=1), lzma.decompress),
+}
+DEFAULT_CODEC = 'zlib'
+
+# Largest allowed change of any prediction from storing leaf values as float32
+DEFAULT_TOLERANCE = 1e-6
+
+PICKLE_PROTOCOL = 5
+
+
+def _is_estimator(obj):
+    """Estimators stored as separate objects (all but the trees inside a forest)"""
+    from sklearn.base import BaseEstimator
+    from sklearn.tree._classes import BaseDecisionTree
+
+    return isinstance(obj, BaseEstimator) and not isinstance(obj, BaseDecisionTree)
+
+
+def _trees(estimator):
+    """sklearn Tree objects held directly by an estimator, and whether their outputs are averaged"""
+    if hasattr(estimator, 'tree_'):
+        return [estimator.tree_], True
+    members = np.ravel(np.asarray(getattr(estimator, 'estimators_', []) or [], dtype=object))
+    trees = [m.tree_ for m in members if hasattr(m, 'tree_')]
+    # Forests and bagging average their trees; boosting sums them
+    averaged = not hasattr(estimator, 'learning_rate')
+    return trees, averaged
+
+
+def leaf_error_bound(estimator):
+    """
+    Upper bound of the prediction change from storing an estimator's leaf values as float32
+
+    Args:
+        estimator: Fitted estimator
+
+    Returns:
+        float (0.0 for estimators without sklearn trees)
+    """
+    trees, averaged = _trees(estimator)
+    errors = [float(np.max(np.abs(t.value - t.value.astype(np.float32)), initial=0.0)) for t in trees]
+    if not errors:
+        return 0.0
+    if averaged:
+        return max(errors)
+    return sum(errors) * float(getattr(estimator, 'learning_rate', 1.0))
+
+
+def float32_floor(values):
+    """Round float64 values down to the largest float32 not above them"""
+    rounded = values.astype(np.float32)
+    above = rounded.astype(np.float64) > values
+    rounded[above] = np.nextafter(rounded[above], np.float32(-np.inf))
+    return rounded
+
+
+def _narrow_int(values):
+    """Cast an integer array to the narrowest signed type holding it"""
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if values.size == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return values.astype(dtype)
+    return values.astype(np.int64)
+
+
+def _compact_tree(tree, float32_values):
+    """Column-wise, narrow-dtype state of a sklearn Tree"""
+    state = tree.__getstate__()
+    nodes = state['nodes']
+    columns = {
+        'left_child': _narrow_int(nodes['left_child']),
+        'right_child': _narrow_int(nodes['right_child']),
+        'feature': _narrow_int(nodes['feature']),
+        'threshold': float32_floor(nodes['threshold']),
+        'impurity': nodes['impurity'].astype(np.float32),
+        'n_node_samples': _narrow_int(nodes['n_node_samples']),
+        'weighted_n_node_samples': nodes['weighted_n_node_samples'].astype(np.float32),
+        'missing_go_to_left': nodes['missing_go_to_left'],
+    }
+    values = state['values'].astype(np.float32) if float32_values else state['values']
+    return (tree.n_features, np.asarray(tree.n_classes), tree.n_outputs, state['max_depth'], columns, values)
+
+
+def _restore_tree(n_features, n_classes, n_outputs, max_depth, columns, values):
+    """Rebuild a sklearn Tree from _compact_tree() state"""
+    from sklearn.tree._tree import NODE_DTYPE, Tree
+
+    nodes = np.zeros(len(columns['threshold']), dtype=NODE_DTYPE)
+    for name, column in columns.items():
+        nodes[name] = column
+    tree = Tree(n_features, n_classes, n_outputs)
+    tree.__setstate__({'max_depth': max_depth, 'node_count': len(nodes), 'nodes': nodes,
+                       'values': np.ascontiguousarray(values, dtype=np.float64)})
+    return tree
+
+
+class _ObjectPickler(pickle.Pickler):
+    """Pickles one object, replacing nested estimators by content references"""
+
+    def __init__(self, file, store, root, float32_values):
+        super().__init__(file, protocol=PICKLE_PROTOCOL)
+        self.store = store
+        self.root = root
+        self.float32_values = float32_values
+        self.references = []
+        from sklearn.tree._tree import Tree
+        self._tree_type = Tree
+
+    def persistent_id(self, obj):
+        if obj is not self.root and _is_estimator(obj):
+            key = self.store._put_object(obj)
+            self.references.append(key)
+            return key
+        return None
+
+    def reducer_override(self, obj):
+        if type(obj) is self._tree_type:
+            return _restore_tree, _compact_tree(obj, self.float32_values)
+        return NotImplemented
+
+
+class _ObjectUnpickler(pickle.Unpickler):
+    """Resolves content references while unpickling"""
+
+    def __init__(self, file, store, objects):
+        super().__init__(file)
+        self.store = store
+        self.objects = objects
+
+    def persistent_load(self, key):
+        return self.store._load_object(key, self.objects)
+
+
+class ArtifactStore:
+    """Content-addressed store of fitted estimators and the bundles built from them"""
+
+    def __init__(self, root=None, codec=DEFAULT_CODEC, float32=True, tolerance=DEFAULT_TOLERANCE):
+        """
+        Initialize the store
+
+        Args:
+            root: Store directory (defaults to models/compact)
+            codec: Compression codec for new objects (a CODECS key)
+            float32: Store tree leaf values as float32 where within tolerance
+            tolerance: Largest allowed prediction change from float32 leaf values
+        """
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}'; expected one of {sorted(CODECS)}")
+        self.root = root or STORE_DIR
+        self.codec = codec
+        self.float32 = float32
+        self.tolerance = tolerance
+        self._loaded = {}
+        self._written = {}
+
+    def bundle_path(self, name):
+        """Manifest file of a bundle"""
+        return os.path.join(self.root, 'bundles', f'{name}.json')
+
+    def object_path(self, key, codec):
+        """File of a stored object"""
+        return os.path.join(self.root, 'objects', key[:2], f'{key}.{codec}')
+
+    def bundles(self):
+        """Names of the stored bundles"""
+        directory = os.path.join(self.root, 'bundles')
+        if not os.path.isdir(directory):
+            return []
+        return sorted(n[:-len('.json')] for n in os.listdir(directory) if n.endswith('.json'))
+
+    def has(self, name):
+        """Return True if a bundle is stored"""
+        return os.path.exists(self.bundle_path(name))
+
+    def save(self, name, obj, source=None):
+        """
+        Store an object (an estimator, or a dict/list of them) as a bundle
+
+        Args:
+            name: Bundle name (conventionally the joblib file name without extension)
+            obj: Object to store
+            source: Optional original artifact path recorded in the manifest
+
+        Returns:
+            dict: The bundle manifest
+        """
+        self._written = {}
+        root = self._put_object(obj)
+        manifest = {
+            'name': name,
+            'root': root,
+            'objects': {key: info for key, info in sorted(self._written.items())},
+        }
+        if source:
+            manifest['source'] = os.path.basename(source)
+            manifest['source_bytes'] = os.path.getsize(source)
+        path = self.bundle_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def load(self, name):
+        """
+        Load a bundle
+
+        Objects shared with previously loaded bundles are not loaded again;
+        the same instance is returned.
+
+        Args:
+            name: Bundle name
+
+        Returns:
+            The stored object
+        """
+        with open(self.bundle_path(name)) as f:
+            manifest = json.load(f)
+        return self._load_object(manifest['root'], manifest['objects'])
+
+    def _put_object(self, obj):
+        """Pickle, hash and (if new) write one object and the estimators it references"""
+        float32_values = self.float32 and leaf_error_bound(obj) <= self.tolerance
+        buffer = io.BytesIO()
+        pickler = _ObjectPickler(buffer, self, obj, float32_values)
+        pickler.dump(obj)
+        data = buffer.getvalue()
+        key = hashlib.sha256(data).hexdigest()
+
+        existing = [c for c in CODECS if os.path.exists(self.object_path(key, c))]
+        codec = existing[0] if existing else self.codec
+        if not existing:
+            path = self.object_path(key, codec)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f'{path}.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(CODECS[codec][0](data))
+            os.replace(temporary, path)
+        self._written[key] = {
+            'codec': codec,
+            'type': f'{type(obj).__module__}.{type(obj).__name__}',
+            'bytes': os.path.getsize(self.object_path(key, codec)),
+            'float32_values': bool(float32_values and _trees(obj)[0]),
+            'references': sorted(set(pickler.references)),
+        }
+        return key
+
+    def _load_object(self, key, objects):
+        """Load one object, resolving its references"""
+        if key not in self._loaded:
+            codec = objects[key]['codec']
+            with open(self.object_path(key, codec), 'rb') as f:
+                data = CODECS[codec][1](f.read())
+            self._loaded[key] = _ObjectUnpickler(io.BytesIO(data), self, objects).load()
+        return self._loaded[key]
+
+    def info(self):
+        """
+        Summarize the store
+
+        Returns:
+            dict with bundle count, source bytes of the converted artifacts,
+            object count and stored bytes
+        """
+        objects, source_bytes = {}, 0
+        for name in self.bundles():
+            with open(self.bundle_path(name)) as f:
+                manifest = json.load(f)
+            objects.update(manifest['objects'])
+            source_bytes += manifest.get('source_bytes', 0)
+        return {
+            'bundles': len(self.bundles()),
+            'source_bytes': source_bytes,
+            'objects': len(objects),
+            'stored_bytes': sum(o['bytes'] for o in objects.values()),
+        }
+
+
+def artifact_paths(models_dir):
+    """joblib artifacts of a models directory (skipping empty files)"""
+    return [os.path.join(models_dir, n) for n in sorted(os.listdir(models_dir))
+            if n.endswith('.joblib') and os.path.getsize(os.path.join(models_dir, n)) > 0]
+
+
+def convert(models_dir=None, store=None):
+    """
+    Convert every joblib artifact of a models directory into the store
+
+    Args:
+        models_dir: Directory with *.joblib artifacts (defaults to models/)
+        store: ArtifactStore (defaults to models/compact with the default codec)
+
+    Returns:
+        ArtifactStore
+    """
+    import joblib
+
+    models_dir = models_dir or os.path.join(BASE_DIR, 'models')
+    store = store or ArtifactStore()
+    for path in artifact_paths(models_dir):
+        store.save(os.path.splitext(os.path.basename(path))[0], joblib.load(path), source=path)
+    return store
+
+
+def main():
+    """Convert the model artifacts or summarize the store"""
+    parser = argparse.ArgumentParser(description='Compact deduplicated model artifact store')
+    parser.add_argument('command', choices=['convert', 'info'])
+    parser.add_argument('--models-dir', default=os.path.join(BASE_DIR, 'models'))
+    parser.add_argument('--store', default=STORE_DIR)
+    parser.add_argument('--codec', choices=sorted(CODECS), default=DEFAULT_CODEC)
+    parser.add_argument('--float64', action='store_true', help='Keep tree leaf values in float64')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store, codec=args.codec, float32=not args.float64, tolerance=args.tolerance)
+    if args.command == 'convert':
+        convert(args.models_dir, store)
+    info = store.info()
+    print(f"Bundles: {info['bundles']}")
+    print(f"Objects: {info['objects']}")
+    print(f"Source artifacts: {info['source_bytes'] / 1024:,.0f} KB")
+    print(f"Stored objects: {info['stored_bytes'] / 1024:,.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
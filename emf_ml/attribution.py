@@ -0,0 +1,438 @@
+"""
+Attribution Module
+Exact TreeSHAP values and permutation importance for the tree models
+
+TreeSHAP values split every prediction of a Random Forest / XGBoost model
+into one additive contribution per feature: prediction = base value + sum
+of contributions. They are computed exactly (path-dependent TreeSHAP)
+on the compiled node arrays of tree_compiler, batched over rows and over
+leaves instead of recursing tree by tree for one row at a time:
+
+- every root-to-leaf path is flattened once per model into its features,
+  zero fractions (cover ratios) and split nodes; repeated features are merged
+- leaves are grouped by path length, and the EXTEND / UNWIND polynomial
+  recurrences run on (leaves x rows) arrays for a whole group at once
+- paths of up to PATTERN_MAX_LENGTH features have few distinct
+  one-fraction patterns; their contributions are precomputed per pattern
+  and looked up per row
+- per-feature contributions are accumulated with one matrix product per batch
+
+Permutation importance (drop in test R2 when a feature column is shuffled)
+runs all (feature, repeat) permutations as stacked prediction batches,
+split across joblib workers.
+
+The aggregated results extend outputs/tables/06_feature_importance.csv;
+per-row explanations are written as feature_attributions_<target>.csv.
+
+Usage:
+    python -m emf_ml.attribution --n-jobs -1
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .features import TARGETS, engineer_feature_array, load_measurements, train_test_indices
+from .registry import TARGET_SUFFIXES, ModelRegistry, is_tree_model
+from .tree_compiler import compile_model
+
+
+DEFAULT_REPEATS = 30
+
+# Upper bound of (leaves x rows x path length) elements held by one TreeSHAP batch
+SHAP_BATCH_ELEMENTS = 1 << 22
+
+# Paths up to this length use precomputed contributions per one-fraction pattern
+PATTERN_MAX_LENGTH = 8
+
+# Rows of stacked permuted data per prediction call
+PERMUTATION_BATCH_ROWS = 65536
+
+# Tree models of all_models_* summarized in the feature importance table
+IMPORTANCE_MODELS = {'rf_e': 'RF_E', 'rf_h': 'RF_H', 'xgb_e': 'XGB_E', 'xgb_h': 'XGB_H'}
+
+ATTRIBUTION_FILE = 'feature_attributions_{target}.csv'
+
+
+class TreeExplainer:
+    """Exact path-dependent TreeSHAP for a compiled tree ensemble"""
+
+    def __init__(self, model):
+        """
+        Initialize the explainer
+
+        Args:
+            model: Fitted XGBoost / Random Forest model or a CompiledTreeEnsemble
+                that carries node covers
+        """
+        compiled = model if hasattr(model, 'roots') else compile_model(model)
+        if compiled.cover is None:
+            raise ValueError('TreeSHAP needs node covers; recompile the model with tree_compiler')
+        if compiled.n_outputs != 1:
+            raise ValueError('Only single-output models are supported')
+        self.compiled = compiled
+        self.n_features = compiled.n_features
+        self.scale = 1.0 / compiled.n_trees if compiled.average else 1.0
+        self._build_paths()
+
+    @property
+    def expected_value(self):
+        """Mean prediction over the training data (cover-weighted)"""
+        return self._expected_value
+
+    def _build_paths(self):
+        """Flatten all root-to-leaf paths into grouped arrays"""
+        c = self.compiled
+        internal = np.flatnonzero(c.left != np.arange(c.n_nodes))
+        self.internal = internal
+        position = np.full(c.n_nodes, -1, dtype=np.intp)
+        position[internal] = np.arange(len(internal))
+
+        expected = 0.0
+        paths = {}
+        for root in c.roots:
+            stack = [(root, [])]
+            while stack:
+                node, path = stack.pop()
+                if c.left[node] == node:
+                    weight = c.cover[node] / c.cover[root]
+                    value = float(c.value[node, 0]) * self.scale
+                    expected += weight * value
+                    paths.setdefault(len(_merge_path(path)), []).append((_merge_path(path), value))
+                    continue
+                for child, right in ((c.left[node], False), (c.left[node] + 1, True)):
+                    zero = c.cover[child] / c.cover[node] if c.cover[node] > 0 else 0.0
+                    stack.append((child, path + [(c.feature[node], zero, position[node], right)]))
+        self._expected_value = float(c.base_score) + expected
+
+        # Per path length: features (L, d), zero fractions (L, d), leaf values (L,)
+        # and the splits of each (leaf, position), padded to the most splits on
+        # one feature by repeating the first split, shape (L * d, m)
+        self.groups = []
+        for length, leaves in sorted(paths.items()):
+            features = np.array([[f for f, _, _ in path] for path, _ in leaves], dtype=np.intp).reshape(-1, length)
+            zeros = np.array([[z for _, z, _ in path] for path, _ in leaves], dtype=np.float64).reshape(-1, length)
+            values = np.array([v for _, v in leaves])
+            splits = [s for path, _ in leaves for _, _, s in path]
+            width = max((len(s) for s in splits), default=1)
+            conditions = np.array([s + s[:1] * (width - len(s)) for s in splits], dtype=np.intp).reshape(-1, width, 2)
+            self.groups.append({
+                'features': features,
+                'zeros': zeros,
+                'values': values,
+                'split': conditions[:, :, 0],
+                'right': conditions[:, :, 1].astype(bool),
+                'indicator': np.eye(self.n_features)[features.ravel()],
+            })
+
+    def shap_values(self, X):
+        """
+        Compute exact TreeSHAP values
+
+        Args:
+            X: Array of shape (n_rows, n_features) in the model's input space
+
+        Returns:
+            ndarray of shape (n_rows, n_features); each row sums to the
+            prediction minus expected_value
+        """
+        X = self.compiled._validate(X)
+        n_rows = X.shape[0]
+        phi = np.zeros((n_rows, self.n_features))
+        go_right = self._split_directions(X)
+        for group in self.groups:
+            n_leaves, length = group['features'].shape
+            if length == 0:
+                continue
+            # Short paths have few distinct one-fraction patterns: look them up
+            use_table = length <= PATTERN_MAX_LENGTH and 2 ** length <= n_rows
+            per_leaf = max(1, SHAP_BATCH_ELEMENTS // (n_rows * (length + 1)))
+            for start in range(0, n_leaves, per_leaf):
+                leaves = slice(start, min(start + per_leaf, n_leaves))
+                ones = self._one_fractions(go_right, group, leaves)
+                if use_table:
+                    code = np.einsum('ldr,d->lr', ones, 1 << np.arange(length))
+                    contributions = np.take_along_axis(self._pattern_table(group)[leaves], code[:, None, :], axis=2)
+                else:
+                    contributions = path_contributions(group['zeros'][leaves], ones, group['values'][leaves])
+                indicator = group['indicator'][leaves.start * length:leaves.stop * length]
+                phi += contributions.reshape(-1, n_rows).T @ indicator
+        return phi
+
+    def _split_directions(self, X):
+        """Direction taken by every row at every internal node, shape (n_internal, n_rows)"""
+        c = self.compiled
+        x = X[:, c.feature[self.internal]].T
+        go_right = x >= c.threshold[self.internal][:, None]
+        missing = np.isnan(x)
+        if missing.any():
+            go_right = np.where(missing, ~c.default_left[self.internal][:, None], go_right)
+        return go_right
+
+    def _one_fractions(self, go_right, group, leaves):
+        """
+        One fractions of a slice of leaves: 1 where a row follows every split
+        on that path feature, shape (n_leaves, length, n_rows)
+        """
+        length = group['features'].shape[1]
+        rows = slice(leaves.start * length, leaves.stop * length)
+        split, right = group['split'][rows], group['right'][rows]
+        ones = go_right[split[:, 0]] == right[:, 0, None]
+        for j in range(1, split.shape[1]):
+            ones &= go_right[split[:, j]] == right[:, j, None]
+        return ones.reshape(leaves.stop - leaves.start, length, -1)
+
+    def _pattern_table(self, group):
+        """Contributions of every leaf for all 2**length one-fraction patterns (cached)"""
+        if 'table' not in group:
+            n_leaves, length = group['features'].shape
+            patterns = (np.arange(2 ** length)[None, :] >> np.arange(length)[:, None]) & 1
+            table = np.empty((n_leaves, length, 2 ** length))
+            per_leaf = max(1, SHAP_BATCH_ELEMENTS // (2 ** length * (length + 1)))
+            for start in range(0, n_leaves, per_leaf):
+                leaves = slice(start, min(start + per_leaf, n_leaves))
+                ones = np.broadcast_to(patterns, (leaves.stop - leaves.start,) + patterns.shape)
+                table[leaves] = path_contributions(group['zeros'][leaves], ones, group['values'][leaves])
+            group['table'] = table
+        return group['table']
+
+
+def path_contributions(zeros, ones, values):
+    """
+    TreeSHAP contributions of the features on a batch of equal-length paths
+
+    Runs the EXTEND recurrence over every path element, then UNWINDs each
+    element to obtain its Shapley weight.
+
+    Args:
+        zeros: Zero fractions (cover ratios), shape (n_leaves, length)
+        ones: One fractions (0/1), shape (n_leaves, length, n_rows)
+        values: Leaf values, shape (n_leaves,)
+
+    Returns:
+        ndarray of shape (n_leaves, length, n_rows)
+    """
+    n_leaves, length, n_rows = ones.shape
+    ones = ones.astype(np.float64)
+
+    # EXTEND: path weights after adding every element, shape (length + 1, L, R)
+    weights = np.zeros((length + 1, n_leaves, n_rows))
+    weights[0] = 1.0
+    for depth in range(1, length + 1):
+        zero = zeros[:, depth - 1, None]
+        one = ones[:, depth - 1]
+        for i in range(depth - 1, -1, -1):
+            weights[i + 1] += one * weights[i] * (i + 1) / (depth + 1)
+            weights[i] = zero * weights[i] * (depth - i) / (depth + 1)
+
+    # UNWIND each element and sum the remaining weights
+    contributions = np.empty((n_leaves, length, n_rows))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for k in range(length):
+            zero = zeros[:, k, None]
+            one = ones[:, k]
+            total = np.zeros((n_leaves, n_rows))
+            next_one = weights[length].copy()
+            for j in range(length - 1, -1, -1):
+                step = next_one * (length + 1) / (j + 1)
+                through = weights[j] * (length + 1) / (zero * (length - j))
+                total += np.where(one == 1, step, np.where(zero > 0, through, 0.0))
+                next_one = weights[j] - step * zero * (length - j) / (length + 1)
+            contributions[:, k] = total * (one - zero) * values[:, None]
+    return contributions
+
+
+def _merge_path(path):
+    """
+    Merge repeated features on a path
+
+    Args:
+        path: List of (feature, zero fraction, internal node position, went right)
+
+    Returns:
+        list: (feature, zero fraction product, [(position, right), ...]) per unique feature
+    """
+    merged = {}
+    for feature, zero, position, right in path:
+        entry = merged.setdefault(feature, [1.0, []])
+        entry[0] *= zero
+        entry[1].append((position, int(right)))
+    return [(feature, zero, splits) for feature, (zero, splits) in merged.items()]
+
+
+def permutation_importance(predict, X, y, n_repeats=DEFAULT_REPEATS, n_jobs=1, random_state=42):
+    """
+    Drop in R2 when each feature column is shuffled
+
+    All (feature, repeat) permutations are stacked into large prediction
+    batches; the batches are spread over joblib workers.
+
+    Args:
+        predict: Function mapping a feature matrix to predictions
+        X: Feature matrix of the evaluation rows
+        y: Targets of the evaluation rows
+        n_repeats: Shuffles per feature
+        n_jobs: joblib workers
+        random_state: Shuffle seed
+
+    Returns:
+        tuple: (mean drop per feature, standard deviation per feature)
+    """
+    from joblib import Parallel, delayed
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_rows, n_features = X.shape
+    baseline = _r2(y, predict(X))
+
+    rng = np.random.default_rng(random_state)
+    orders = np.argsort(rng.random((n_features, n_repeats, n_rows)), axis=2)
+    tasks = [(f, r) for f in range(n_features) for r in range(n_repeats)]
+    per_batch = max(1, PERMUTATION_BATCH_ROWS // n_rows)
+    batches = [tasks[i:i + per_batch] for i in range(0, len(tasks), per_batch)]
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_permuted_scores)(predict, X, y, orders, batch) for batch in batches
+    )
+    drops = baseline - np.concatenate(scores).reshape(n_features, n_repeats)
+    return drops.mean(axis=1), drops.std(axis=1)
+
+
+def _permuted_scores(predict, X, y, orders, tasks):
+    """R2 of one stacked batch of permuted copies of X"""
+    stacked = np.tile(X, (len(tasks), 1))
+    for i, (feature, repeat) in enumerate(tasks):
+        block = slice(i * len(X), (i + 1) * len(X))
+        stacked[block, feature] = X[orders[feature, repeat], feature]
+    predictions = np.asarray(predict(stacked)).reshape(len(tasks), len(X))
+    return np.array([_r2(y, p) for p in predictions])
+
+
+def _r2(y, predictions):
+    """Coefficient of determination"""
+    return 1.0 - np.sum((y - predictions) ** 2) / np.sum((y - y.mean()) ** 2)
+
+
+def builtin_importance(model):
+    """
+    Impurity (Random Forest) or total-gain share (XGBoost) importance per feature
+
+    XGBoost's feature_importances_ is float32; the gain shares are taken
+    from the booster in float64, which reproduces the published table values
+    to the last digit or two.
+    """
+    if hasattr(model, 'get_booster'):
+        scores = model.get_booster().get_score(importance_type='gain')
+        gain = np.array([scores.get(f'f{i}', 0.0) for i in range(model.n_features_in_)])
+        return gain / gain.sum()
+    return np.asarray(model.feature_importances_, dtype=np.float64)
+
+
+def explain(data, target='E_ICNIRP', registry=None, version=None, model=None):
+    """
+    Per-row TreeSHAP explanations
+
+    Args:
+        data: DataFrame or mapping with the raw measurement columns
+        target: Target name
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        model: Tree model to explain (defaults to the target's best model)
+
+    Returns:
+        DataFrame with one contribution column per feature plus
+        Base_Value and Prediction (Base_Value + sum of contributions)
+    """
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    model = model if model is not None else registry.load_best_model(target, version)
+    if not is_tree_model(model):
+        raise ValueError(f'TreeSHAP needs a tree model, got {type(model).__name__}')
+    features = registry.features(version)
+    explainer = TreeExplainer(model)
+    phi = explainer.shap_values(engineer_feature_array(data, features))
+    frame = pd.DataFrame(phi, columns=features, index=getattr(data, 'index', None))
+    frame['Base_Value'] = explainer.expected_value
+    frame['Prediction'] = explainer.expected_value + phi.sum(axis=1)
+    return frame
+
+
+def importance_table(registry=None, version=None, n_repeats=DEFAULT_REPEATS, n_jobs=1):
+    """
+    Build the feature importance table
+
+    Columns:
+        RF_E ... XGB_H: Built-in (impurity / gain) importances scaled to a
+            maximum of 1, and Avg_Importance, their mean (as before)
+        SHAP_RF_E ... SHAP_XGB_H: Mean |TreeSHAP| over all measurements,
+            scaled to a maximum of 1, and SHAP_Avg, their mean
+        Perm_E / Perm_H: Mean drop in test R2 of the best model when the
+            feature is shuffled, with Perm_E_Std / Perm_H_Std
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        n_repeats: Permutation repeats per feature
+        n_jobs: joblib workers for permutation importance
+
+    Returns:
+        DataFrame sorted by Avg_Importance, indexed by feature position
+    """
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    features = registry.features(version)
+    models = registry.load_all_models(version)
+    df = load_measurements()
+    X = engineer_feature_array(df, features)
+    _, test_idx = train_test_indices(len(df))
+
+    table = pd.DataFrame({'Feature': features})
+    for key, column in IMPORTANCE_MODELS.items():
+        importance = builtin_importance(models[key])
+        table[column] = importance / importance.max()
+    table['Avg_Importance'] = table[list(IMPORTANCE_MODELS.values())].mean(axis=1)
+
+    for key, column in IMPORTANCE_MODELS.items():
+        mean_abs = np.abs(TreeExplainer(models[key]).shap_values(X)).mean(axis=0)
+        table[f'SHAP_{column}'] = mean_abs / mean_abs.max()
+    table['SHAP_Avg'] = table[[f'SHAP_{c}' for c in IMPORTANCE_MODELS.values()]].mean(axis=1)
+
+    for target in TARGETS:
+        best = registry.load_best_model(target, version)
+        mean, std = permutation_importance(lambda A: registry.predict(best, A, version), X[test_idx],
+                                           df[target].to_numpy()[test_idx], n_repeats, n_jobs)
+        suffix = TARGET_SUFFIXES[target].upper()
+        table[f'Perm_{suffix}'] = mean
+        table[f'Perm_{suffix}_Std'] = std
+    return table.sort_values('Avg_Importance', ascending=False)
+
+
+def main():
+    """Write the feature importance table and per-row explanations"""
+    from .export import TABLES_DIR, table_filename
+
+    parser = argparse.ArgumentParser(description='TreeSHAP and permutation feature importance')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--output-dir', default=TABLES_DIR)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    table = importance_table(version=args.version, n_repeats=args.repeats, n_jobs=args.n_jobs)
+    path = os.path.join(args.output_dir, table_filename('feature_importance'))
+    table.to_csv(path)
+    print(f"Saved: {path}")
+    print(table[['Feature', 'Avg_Importance', 'SHAP_Avg', 'Perm_E', 'Perm_H']].head(10).to_string(index=False))
+
+    df = load_measurements()
+    for target in TARGETS:
+        path = os.path.join(args.output_dir, ATTRIBUTION_FILE.format(target=target))
+        explain(df, target, version=args.version).to_csv(path)
+        print(f"Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
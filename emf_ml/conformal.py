@@ -0,0 +1,197 @@
+"""
+Conformal Module
+Split-conformal prediction intervals for the EMF models
+
+Calibration scores are the absolute residuals |y - y_hat| of a model on
+data it was not trained on (the held-out 20% test split). They are sorted
+once and saved next to the model artifacts as
+conformal_<model>_<target>_<version>.joblib, so an interval at any
+coverage level is a single index lookup plus `y_hat +/- q`.
+
+With n calibration points the (1 - alpha) interval uses the
+ceil((n + 1)(1 - alpha))-th smallest score; when that exceeds n the
+interval is unbounded. The held-out split has 14 rows, so the finite
+levels go up to 1 - 1/15 (about 93%) until more calibration data is added.
+
+Usage:
+    python -m emf_ml.conformal --version 20251210_101547
+"""
+
+import argparse
+import math
+import os
+
+import joblib
+import numpy as np
+
+from .features import TARGETS, engineer_feature_array, load_measurements, train_test_indices
+from .registry import ModelRegistry
+
+
+DEFAULT_ALPHAS = (0.1, 0.2)
+
+MODEL_KINDS = {
+    'best': 'best_model',
+    'stacked': 'stacked_ensemble',
+    'joint': 'joint_model',
+    'partitioned': 'partitioned_model',
+}
+
+# Kinds stored as one artifact predicting every target
+JOINT_MODEL_KINDS = {'joint'}
+
+# Kinds routed by partition key, whose input carries the key columns
+PARTITIONED_MODEL_KINDS = {'partitioned'}
+
+
+class ConformalCalibration:
+    """Sorted nonconformity scores of one model on calibration data"""
+
+    def __init__(self, scores, target=None, version=None, model_kind='best'):
+        """
+        Initialize from calibration scores
+
+        Args:
+            scores: Absolute residuals on calibration data
+            target: Target name
+            version: Artifact version
+            model_kind: 'best', 'stacked' or 'joint'
+        """
+        self.scores = np.sort(np.asarray(scores, dtype=np.float64))
+        self.target = target
+        self.version = version
+        self.model_kind = model_kind
+
+    @property
+    def n_calibration(self):
+        """Number of calibration points"""
+        return len(self.scores)
+
+    def quantile(self, alpha):
+        """
+        Return the interval half-width for miscoverage alpha
+
+        Args:
+            alpha: Allowed miscoverage (0.1 for a 90% interval)
+
+        Returns:
+            float (inf when there are too few calibration points)
+        """
+        rank = math.ceil((self.n_calibration + 1) * (1 - alpha))
+        if rank > self.n_calibration:
+            return np.inf
+        return float(self.scores[max(rank, 1) - 1])
+
+    def interval(self, predictions, alpha):
+        """
+        Build intervals around point predictions
+
+        Args:
+            predictions: Array of point predictions
+            alpha: Allowed miscoverage
+
+        Returns:
+            tuple: (lower, upper) arrays
+        """
+        q = self.quantile(alpha)
+        return predictions - q, predictions + q
+
+    def to_dict(self):
+        """Return the saved representation"""
+        return {
+            'scores': self.scores,
+            'target': self.target,
+            'version': self.version,
+            'model_kind': self.model_kind,
+            'quantiles': {alpha: self.quantile(alpha) for alpha in DEFAULT_ALPHAS},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a calibration saved with to_dict()"""
+        return cls(state['scores'], state['target'], state['version'], state['model_kind'])
+
+
+def calibration_path(registry, target, version=None, model_kind='best'):
+    """Return the artifact path of a conformal calibration"""
+    return registry.path(f'conformal_{MODEL_KINDS[model_kind]}', version, target)
+
+
+def calibrate(registry=None, version=None, model_kind='best', targets=TARGETS, data=None, save=True):
+    """
+    Compute and save conformal calibrations for a model version
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        model_kind: 'best', 'stacked', 'joint' or 'partitioned'
+        targets: Targets to calibrate
+        data: Calibration measurements (defaults to the held-out test split)
+        save: Write conformal_*.joblib next to the model artifacts
+
+    Returns:
+        dict: ConformalCalibration per target
+    """
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    if data is None:
+        df = load_measurements()
+        _, test_idx = train_test_indices(len(df))
+        data = df.iloc[test_idx]
+    X = engineer_feature_array(data, registry.features(version))
+
+    if model_kind in JOINT_MODEL_KINDS:
+        joint = registry.load(MODEL_KINDS[model_kind], version)
+        predictions = joint.predict_targets(registry.prepare_input(joint, X, version))
+    elif model_kind in PARTITIONED_MODEL_KINDS:
+        from .partitioned import partition_matrix
+
+        predictions = {}
+        for target in targets:
+            model = registry.load(MODEL_KINDS[model_kind], version, target)
+            predictions[target] = model.predict(partition_matrix(data, registry.features(version), model.key_columns))
+    else:
+        predictions = {
+            target: registry.predict(registry.load(MODEL_KINDS[model_kind], version, target), X, version)
+            for target in targets
+        }
+
+    calibrations = {}
+    for target in targets:
+        residuals = np.abs(data[target].to_numpy(dtype=np.float64) - predictions[target])
+        calibration = ConformalCalibration(residuals, target, version, model_kind)
+        if save:
+            joblib.dump(calibration.to_dict(), calibration_path(registry, target, version, model_kind))
+        calibrations[target] = calibration
+    return calibrations
+
+
+def load_calibration(registry, target, version=None, model_kind='best'):
+    """
+    Load a saved calibration
+
+    Returns:
+        ConformalCalibration, or None when the version has not been calibrated
+    """
+    path = calibration_path(registry, target, version, model_kind)
+    if not os.path.exists(path):
+        return None
+    return ConformalCalibration.from_dict(registry.load(f'conformal_{MODEL_KINDS[model_kind]}', version, target))
+
+
+def main():
+    """Calibrate conformal intervals for saved models"""
+    parser = argparse.ArgumentParser(description='Compute conformal calibration scores')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--model', choices=sorted(MODEL_KINDS), default='best')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    for target, calibration in calibrate(registry, args.version, args.model).items():
+        widths = ', '.join(f'{1 - a:.0%}: +/-{calibration.quantile(a):.3f}' for a in DEFAULT_ALPHAS)
+        print(f"{target} ({calibration.n_calibration} points) {widths}")
+        print(f"  Saved: {calibration_path(registry, target, calibration.version, args.model)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Dependence Module
+Batched partial dependence (PDP) and individual conditional expectation (ICE) curves
+
+The curves vary a raw measurement input (Distance_m, Temp_C, Humidity_Pct)
+and re-derive every engineered feature from it, so Distance_Squared,
+Distance_Inverse and the interaction terms move together with distance as
+they do in real measurements. For every grid value the whole sample set is
+repeated with the input overwritten; all grid x sample rows are engineered
+and scored in a few large predict calls rather than one call per grid
+point. Two-way grids (e.g. Distance_m x Temp_C) are built the same way.
+
+Results are cached on disk by model version, model kind, target, grid and
+sample set, so report rebuilds reuse them. The module writes CSV tables to
+outputs/tables/ and the figures 13_partial_dependence.png and
+14_pdp_distance_temp.png to outputs/plots/.
+
+Usage:
+    python -m emf_ml.dependence --model best
+"""
+
+import argparse
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .conformal import MODEL_KINDS
+from .features import BASE_DIR, TARGETS, engineer_feature_array, load_measurements
+from .registry import ModelRegistry
+
+
+CACHE_DIR = os.path.join(BASE_DIR, 'outputs', 'cache', 'dependence')
+
+# Raw inputs varied for the one-way curves and their grid sizes
+DEPENDENCE_INPUTS = {'Distance_m': 40, 'Temp_C': 25, 'Humidity_Pct': 25}
+TWO_WAY_INPUTS = ('Distance_m', 'Temp_C')
+
+# Rows engineered and scored per predict call
+BATCH_ROWS = 1 << 18
+
+PDP_FIGURE = '13_partial_dependence.png'
+TWO_WAY_FIGURE = '14_pdp_distance_temp.png'
+PDP_TABLE = 'partial_dependence.csv'
+TWO_WAY_TABLE = 'partial_dependence_{first}_{second}.csv'
+
+
+def input_grid(data, name, n_points):
+    """
+    Evenly spaced grid over the observed range of a raw input
+
+    Args:
+        data: DataFrame with the raw measurement columns
+        name: Column name
+        n_points: Number of grid values
+
+    Returns:
+        ndarray of grid values
+    """
+    values = np.asarray(data[name], dtype=np.float64)
+    return np.linspace(values.min(), values.max(), n_points)
+
+
+def batched_predict(predict, columns, names, grids, batch_rows=BATCH_ROWS):
+    """
+    Predict every sample at every point of a (multi-dimensional) input grid
+
+    Args:
+        predict: Function mapping a dict of raw columns to predictions
+        columns: Dict of raw column arrays of the sample set
+        names: Inputs that are overwritten
+        grids: One grid array per input name
+        batch_rows: Rows per predict call
+
+    Returns:
+        ndarray of shape (*grid sizes, n_samples)
+    """
+    n_samples = len(next(iter(columns.values())))
+    mesh = [m.ravel() for m in np.meshgrid(*grids, indexing='ij')]
+    n_points = len(mesh[0])
+    out = np.empty((n_points, n_samples))
+    per_batch = max(1, batch_rows // n_samples)
+    for start in range(0, n_points, per_batch):
+        stop = min(start + per_batch, n_points)
+        batch = {k: np.tile(v, stop - start) for k, v in columns.items()}
+        for name, values in zip(names, mesh):
+            batch[name] = np.repeat(values[start:stop], n_samples)
+        out[start:stop] = np.asarray(predict(batch), dtype=np.float64).reshape(stop - start, n_samples)
+    return out.reshape(*(len(g) for g in grids), n_samples)
+
+
+class DependenceEngine:
+    """Computes and caches PDP/ICE results for one model version"""
+
+    def __init__(self, registry=None, version=None, model='best', data=None, cache_dir=CACHE_DIR):
+        """
+        Initialize the engine
+
+        Args:
+            registry: ModelRegistry
+            version: Artifact version (defaults to the latest)
+            model: 'best' or 'stacked'
+            data: Sample set of raw measurements (defaults to load_measurements())
+            cache_dir: Directory for cached results, or None to disable caching
+        """
+        if model not in ('best', 'stacked'):
+            raise ValueError("model must be 'best' or 'stacked'")
+        self.registry = registry or ModelRegistry()
+        self.version = version or self.registry.latest_version()
+        self.model_kind = model
+        self.data = load_measurements() if data is None else data
+        self.columns = {c: self.data[c].to_numpy(dtype=np.float64) for c in self.data.columns
+                        if c not in TARGETS and self.data[c].dtype.kind in 'biuf'}
+        self.features = self.registry.features(self.version)
+        self.cache_dir = cache_dir
+        self._data_key = hashlib.sha1(
+            b''.join(np.ascontiguousarray(v).tobytes() for v in self.columns.values())
+        ).hexdigest()[:16]
+
+    def predictor(self, target):
+        """Return a function predicting a target from a dict of raw columns"""
+        model = self.registry.load(MODEL_KINDS[self.model_kind], self.version, target)
+        return lambda columns: self.registry.predict(model, engineer_feature_array(columns, self.features),
+                                                     self.version)
+
+    def ice(self, target, names, grids):
+        """
+        ICE predictions over a grid of one or more raw inputs
+
+        Args:
+            target: Target name
+            names: Input name or tuple of input names
+            grids: Grid array or one grid array per input
+
+        Returns:
+            ndarray of shape (*grid sizes, n_samples); the mean over the last
+            axis is the partial dependence
+        """
+        if isinstance(names, str):
+            names, grids = (names,), (grids,)
+        grids = [np.asarray(g, dtype=np.float64) for g in grids]
+        path = self._cache_path(target, names, grids)
+        if path and os.path.exists(path):
+            with np.load(path) as cached:
+                return cached['ice']
+        values = batched_predict(self.predictor(target), self.columns, names, grids)
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            np.savez_compressed(path, ice=values)
+        return values
+
+    def one_way(self, inputs=None):
+        """
+        One-way PDP table for every target and input
+
+        Args:
+            inputs: Dict of input name -> grid size (defaults to DEPENDENCE_INPUTS)
+
+        Returns:
+            DataFrame with Target, Feature, Value, PD and ICE_P10 / ICE_P90
+            (10th / 90th percentile of the ICE curves)
+        """
+        rows = []
+        for target in TARGETS:
+            for name, n_points in (inputs or DEPENDENCE_INPUTS).items():
+                grid = input_grid(self.data, name, n_points)
+                curves = self.ice(target, name, grid)
+                rows.append(pd.DataFrame({
+                    'Target': target,
+                    'Feature': name,
+                    'Value': grid,
+                    'PD': curves.mean(axis=1),
+                    'ICE_P10': np.percentile(curves, 10, axis=1),
+                    'ICE_P90': np.percentile(curves, 90, axis=1),
+                }))
+        return pd.concat(rows, ignore_index=True)
+
+    def two_way(self, names=TWO_WAY_INPUTS, sizes=None):
+        """
+        Two-way PDP table for every target
+
+        Args:
+            names: Pair of input names
+            sizes: Pair of grid sizes (defaults to DEPENDENCE_INPUTS sizes)
+
+        Returns:
+            DataFrame with Target, the two input columns and PD
+        """
+        sizes = sizes or [DEPENDENCE_INPUTS.get(n, 25) for n in names]
+        grids = [input_grid(self.data, n, s) for n, s in zip(names, sizes)]
+        first, second = np.meshgrid(*grids, indexing='ij')
+        rows = []
+        for target in TARGETS:
+            pd_grid = self.ice(target, tuple(names), grids).mean(axis=-1)
+            rows.append(pd.DataFrame({'Target': target, names[0]: first.ravel(), names[1]: second.ravel(),
+                                      'PD': pd_grid.ravel()}))
+        return pd.concat(rows, ignore_index=True)
+
+    def _cache_path(self, target, names, grids):
+        """Cache file of one ICE computation, or None when caching is disabled"""
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha1()
+        digest.update(repr((self.model_kind, target, names, self._data_key)).encode())
+        for grid in grids:
+            digest.update(grid.tobytes())
+        return os.path.join(self.cache_dir, f'ice_{self.version}_{digest.hexdigest()[:16]}.npz')
+
+
+def save_dependence_figure(table, path):
+    """
+    Plot one-way PD curves with the 10-90% ICE band, one row per target
+
+    Args:
+        table: DataFrame from DependenceEngine.one_way()
+        path: Output image path
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    targets = list(dict.fromkeys(table['Target']))
+    inputs = list(dict.fromkeys(table['Feature']))
+    fig, axes = plt.subplots(len(targets), len(inputs), figsize=(4 * len(inputs), 3.2 * len(targets)),
+                             squeeze=False)
+    for i, target in enumerate(targets):
+        for j, name in enumerate(inputs):
+            ax = axes[i, j]
+            part = table[(table['Target'] == target) & (table['Feature'] == name)]
+            ax.fill_between(part['Value'], part['ICE_P10'], part['ICE_P90'], alpha=0.25, label='ICE 10-90%')
+            ax.plot(part['Value'], part['PD'], linewidth=2, label='Partial dependence')
+            ax.set_xlabel(name)
+            if j == 0:
+                ax.set_ylabel(f'{target} (% ICNIRP)')
+            ax.grid(alpha=0.3)
+    axes[0, 0].legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def save_two_way_figure(table, path, names=TWO_WAY_INPUTS):
+    """
+    Plot two-way PD surfaces as filled contours, one panel per target
+
+    Args:
+        table: DataFrame from DependenceEngine.two_way()
+        path: Output image path
+        names: Pair of input names in the table
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    targets = list(dict.fromkeys(table['Target']))
+    fig, axes = plt.subplots(1, len(targets), figsize=(5.5 * len(targets), 4.2), squeeze=False)
+    for ax, target in zip(axes[0], targets):
+        grid = table[table['Target'] == target].pivot(index=names[1], columns=names[0], values='PD')
+        contour = ax.contourf(grid.columns, grid.index, grid.to_numpy(), levels=20, cmap='viridis')
+        fig.colorbar(contour, ax=ax, label=f'{target} (% ICNIRP)')
+        ax.set_xlabel(names[0])
+        ax.set_ylabel(names[1])
+        ax.set_title(target)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def main():
+    """Write PDP/ICE tables and figures"""
+    import time
+
+    from .export import TABLES_DIR
+
+    parser = argparse.ArgumentParser(description='Partial dependence and ICE curves for the report')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--model', choices=['best', 'stacked'], default='best')
+    parser.add_argument('--tables-dir', default=TABLES_DIR)
+    parser.add_argument('--plots-dir', default=os.path.join(BASE_DIR, 'outputs', 'plots'))
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    engine = DependenceEngine(version=args.version, model=args.model,
+                              cache_dir=None if args.no_cache else CACHE_DIR)
+    one_way = engine.one_way()
+    two_way = engine.two_way()
+    print(f"Computed partial dependence in {time.perf_counter() - start:.2f} s")
+
+    os.makedirs(args.tables_dir, exist_ok=True)
+    os.makedirs(args.plots_dir, exist_ok=True)
+    written = [
+        os.path.join(args.tables_dir, PDP_TABLE),
+        os.path.join(args.tables_dir, TWO_WAY_TABLE.format(first=TWO_WAY_INPUTS[0], second=TWO_WAY_INPUTS[1])),
+    ]
+    one_way.to_csv(written[0], index=False)
+    two_way.to_csv(written[1], index=False)
+    written.append(save_dependence_figure(one_way, os.path.join(args.plots_dir, PDP_FIGURE)))
+    written.append(save_two_way_figure(two_way, os.path.join(args.plots_dir, TWO_WAY_FIGURE)))
+    for path in written:
+        print(f"Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,346 @@
+"""
+Distillation Module
+Compact student models distilled from the stacked ensembles for low-power gateways
+
+The stacked ensembles run SVR, Random Forest, XGBoost and MLP base
+learners plus a RidgeCV meta-learner for every prediction. A student
+reproduces the ensemble's predictions (not the measurements) from dense
+synthetic samples labeled by the ensemble:
+
+- 'trees': a shallow XGBoost model fitted on the ensemble's labels and
+  compiled to flat NumPy arrays (see tree_compiler)
+- 'grid': a lookup table over Distance_m x Temp_C x Humidity_Pct for every
+  Circuit / Profile_Type / afternoon combination, filled with ensemble
+  predictions at the grid nodes and read with trilinear interpolation
+
+The ensembles see Time_Hour only through Time_Period_3 (afternoon) and City
+only through City_x_Profile, with City fixed by the circuit, so these three
+discrete keys and three continuous axes cover every model input. Both
+students are saved as .npz files that load and predict with NumPy alone;
+the grid table is stored in half precision.
+
+Usage:
+    python -m emf_ml.distillation --student grid
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from .features import CIRCUIT_CITY, TARGETS, engineer_feature_array, load_measurements, synthetic_measurements
+from .registry import ModelRegistry
+from .tree_compiler import CompiledTreeEnsemble, compile_model
+
+
+STUDENT_KINDS = ['trees', 'grid']
+
+# Continuous grid axes and node counts of the lookup-table student
+GRID_AXES = {'Distance_m': 79, 'Temp_C': 17, 'Humidity_Pct': 17}
+
+# Storage type of the lookup table. Half precision keeps the .npz well below
+# the stacked ensemble it replaces; its rounding error (under 0.004 at the
+# largest predictions) is small next to the interpolation error
+GRID_STORAGE_DTYPE = np.float16
+
+# Shallow boosted student settings
+TREE_STUDENT_PARAMS = {
+    'n_estimators': 300,
+    'max_depth': 6,
+    'learning_rate': 0.1,
+    'tree_method': 'hist',
+    'random_state': 42,
+}
+
+DEFAULT_TRAIN_SAMPLES = 200_000
+DEFAULT_EVAL_SAMPLES = 100_000
+
+
+class GridStudent:
+    """Lookup-table model with trilinear interpolation over the continuous inputs"""
+
+    def __init__(self, table, lows, highs, target=None):
+        """
+        Initialize the student
+
+        Args:
+            table: Array of shape (3 circuits, 2 profiles, 2 periods, *GRID_AXES counts)
+            lows: Lower bound per continuous axis
+            highs: Upper bound per continuous axis
+            target: Target name
+        """
+        self.table = np.asarray(table, dtype=np.float32)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.target = target
+
+    @classmethod
+    def from_teacher(cls, predict, ranges, target=None, counts=None):
+        """
+        Fill the table with teacher predictions at every grid node
+
+        Args:
+            predict: Callable mapping a dict of raw columns to predictions
+            ranges: Dict of axis name -> (low, high)
+            target: Target name
+            counts: Dict of axis name -> node count (defaults to GRID_AXES)
+
+        Returns:
+            GridStudent
+        """
+        counts = counts or GRID_AXES
+        axes = list(GRID_AXES)
+        nodes = [np.linspace(*ranges[name], counts[name]) for name in axes]
+        mesh = np.meshgrid(np.arange(3), np.arange(2), np.arange(2), *nodes, indexing='ij')
+        circuit, profile, afternoon = (m.ravel().astype(np.float64) for m in mesh[:3])
+        columns = {
+            'Circuit': circuit,
+            'City': np.array([CIRCUIT_CITY[c] for c in range(3)], dtype=np.float64)[circuit.astype(int)],
+            'Profile_Type': profile,
+            'Time_Hour': np.where(afternoon == 1, 15.0, 8.0),
+        }
+        for name, values in zip(axes, mesh[3:]):
+            columns[name] = values.ravel()
+        table = np.asarray(predict(columns)).reshape(mesh[0].shape)
+        return cls(table, [ranges[a][0] for a in axes], [ranges[a][1] for a in axes], target)
+
+    @property
+    def nbytes(self):
+        """Size of the lookup table"""
+        return self.table.nbytes
+
+    def predict(self, columns):
+        """
+        Predict from raw measurement columns
+
+        Args:
+            columns: Mapping with Circuit, Profile_Type, Time_Hour, Distance_m,
+                Temp_C and Humidity_Pct arrays; values outside the grid are clamped
+
+        Returns:
+            ndarray of predictions
+        """
+        circuit = np.asarray(columns['Circuit']).astype(np.intp)
+        profile = np.asarray(columns['Profile_Type']).astype(np.intp)
+        afternoon = (np.asarray(columns['Time_Hour']) > 12).astype(np.intp)
+        block = self.table.reshape(-1, *self.table.shape[3:])
+        key = (circuit * 2 + profile) * 2 + afternoon
+
+        shape = np.array(self.table.shape[3:])
+        index, frac = [], []
+        for axis, name in enumerate(GRID_AXES):
+            span = (shape[axis] - 1) / (self.highs[axis] - self.lows[axis])
+            u = np.clip((np.asarray(columns[name], dtype=np.float64) - self.lows[axis]) * span, 0, shape[axis] - 1)
+            i = np.minimum(u.astype(np.intp), shape[axis] - 2)
+            index.append(i)
+            frac.append(u - i)
+
+        out = np.zeros(len(key))
+        for corner in range(8):
+            bits = [(corner >> axis) & 1 for axis in range(3)]
+            weight = np.ones(len(key))
+            for axis, bit in enumerate(bits):
+                weight *= frac[axis] if bit else 1 - frac[axis]
+            out += weight * block[key, index[0] + bits[0], index[1] + bits[1], index[2] + bits[2]]
+        return out
+
+    def save(self, path):
+        """Save the student as a standalone .npz file"""
+        np.savez_compressed(path, table=self.table.astype(GRID_STORAGE_DTYPE), lows=self.lows, highs=self.highs,
+                            meta=np.array(json.dumps({'target': self.target, 'axes': list(GRID_AXES)})))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load a student saved with save()"""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            return cls(data['table'], data['lows'], data['highs'], meta['target'])
+
+
+class TreeStudent:
+    """Shallow boosted model compiled to NumPy arrays"""
+
+    def __init__(self, compiled, features, target=None):
+        """
+        Initialize the student
+
+        Args:
+            compiled: CompiledTreeEnsemble over the engineered features
+            features: Engineered feature names in model order
+            target: Target name
+        """
+        self.compiled = compiled
+        self.features = list(features)
+        self.target = target
+
+    @classmethod
+    def fit(cls, columns, labels, features, target=None, params=None):
+        """
+        Fit a shallow XGBoost model on teacher labels and compile it
+
+        Args:
+            columns: Raw measurement columns of the synthetic samples
+            labels: Teacher predictions
+            features: Engineered feature names
+            target: Target name
+            params: XGBRegressor parameters (defaults to TREE_STUDENT_PARAMS)
+
+        Returns:
+            TreeStudent
+        """
+        from xgboost import XGBRegressor
+
+        model = XGBRegressor(**(params or TREE_STUDENT_PARAMS))
+        model.fit(engineer_feature_array(columns, features), labels)
+        return cls(compile_model(model), features, target)
+
+    @property
+    def nbytes(self):
+        """Size of the node arrays"""
+        c = self.compiled
+        return sum(a.nbytes for a in (c.feature, c.threshold, c.left, c.default_left, c.value, c.roots, c.depths))
+
+    def predict(self, columns):
+        """Predict from raw measurement columns"""
+        return self.compiled.predict(engineer_feature_array(columns, self.features)).ravel()
+
+    def save(self, path):
+        """Save the compiled trees; the feature list is stored as the source tag"""
+        self.compiled.source = json.dumps({'target': self.target, 'features': self.features})
+        return self.compiled.save(path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a student saved with save()"""
+        compiled = CompiledTreeEnsemble.load(path)
+        meta = json.loads(compiled.source)
+        return cls(compiled, meta['features'], meta['target'])
+
+
+def student_path(registry, student, target, version=None):
+    """Return the .npz path of a distilled student"""
+    return registry.path(f'distilled_{student}', version, target).replace('.joblib', '.npz')
+
+
+def dense_samples(n_samples, df=None, random_state=0):
+    """
+    Synthetic conditions covering the measured ranges densely
+
+    Rows are resampled from the measurements with jitter; Distance_m,
+    Temp_C and Humidity_Pct are then drawn uniformly over their observed
+    ranges so that the students see the whole input box.
+
+    Args:
+        n_samples: Number of samples
+        df: Seed measurements (defaults to load_measurements())
+        random_state: Random seed
+
+    Returns:
+        DataFrame of raw measurement columns
+    """
+    df = load_measurements() if df is None else df
+    samples = synthetic_measurements(n_samples, df, random_state)
+    rng = np.random.default_rng(random_state + 1)
+    for name in GRID_AXES:
+        samples[name] = rng.uniform(df[name].min(), df[name].max(), n_samples)
+    samples['City'] = samples['Circuit'].map(CIRCUIT_CITY)
+    return samples
+
+
+def teacher_predictor(registry, version, target, teacher='stacked'):
+    """
+    Return a function predicting a target with the teacher model from raw columns
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version
+        target: Target name
+        teacher: 'stacked' for stacked_ensemble_* or 'best' for best_model_*
+    """
+    kind = 'stacked_ensemble' if teacher == 'stacked' else 'best_model'
+    model = registry.load(kind, version, target)
+    features = registry.features(version)
+    return lambda columns: registry.predict(model, engineer_feature_array(columns, features), version)
+
+
+def distill(registry=None, version=None, target='E_ICNIRP', student='grid', teacher='stacked',
+            n_samples=DEFAULT_TRAIN_SAMPLES, save=True):
+    """
+    Distill a teacher model into a student
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        target: Target name
+        student: 'grid' or 'trees'
+        teacher: 'stacked' or 'best'
+        n_samples: Synthetic training samples for the 'trees' student
+        save: Write distilled_<student>_<target>_<version>.npz next to the model artifacts
+
+    Returns:
+        GridStudent or TreeStudent
+    """
+    if student not in STUDENT_KINDS:
+        raise ValueError(f'student must be one of {STUDENT_KINDS}')
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    predict = teacher_predictor(registry, version, target, teacher)
+
+    if student == 'grid':
+        df = load_measurements()
+        ranges = {name: (float(df[name].min()), float(df[name].max())) for name in GRID_AXES}
+        model = GridStudent.from_teacher(predict, ranges, target)
+    else:
+        samples = dense_samples(n_samples)
+        model = TreeStudent.fit(samples, predict(samples), registry.features(version), target)
+    if save:
+        model.save(student_path(registry, student, target, version))
+    return model
+
+
+def fidelity(student, teacher_predict, samples):
+    """
+    Agreement of a student with its teacher
+
+    Args:
+        student: Fitted student
+        teacher_predict: Teacher function from teacher_predictor()
+        samples: Evaluation conditions (not used for training)
+
+    Returns:
+        dict: r2, mae and max_abs_error of student vs teacher
+    """
+    expected = teacher_predict(samples)
+    error = student.predict(samples) - expected
+    return {
+        'r2': float(1 - np.sum(error ** 2) / np.sum((expected - expected.mean()) ** 2)),
+        'mae': float(np.mean(np.abs(error))),
+        'max_abs_error': float(np.max(np.abs(error))),
+    }
+
+
+def main():
+    """Distill students for both targets"""
+    parser = argparse.ArgumentParser(description='Distill the stacked ensembles into compact students')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--student', choices=STUDENT_KINDS, default='grid')
+    parser.add_argument('--teacher', choices=['stacked', 'best'], default='stacked')
+    parser.add_argument('--samples', type=int, default=DEFAULT_TRAIN_SAMPLES)
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    version = args.version or registry.latest_version()
+    evaluation = dense_samples(DEFAULT_EVAL_SAMPLES, random_state=1)
+    for target in TARGETS:
+        model = distill(registry, version, target, args.student, args.teacher, args.samples)
+        scores = fidelity(model, teacher_predictor(registry, version, target, args.teacher), evaluation)
+        path = student_path(registry, args.student, target, version)
+        print(f"{target}: fidelity R2 {scores['r2']:.4f}, MAE {scores['mae']:.4f}, "
+              f"max error {scores['max_abs_error']:.3f} ({os.path.getsize(path) / 1024:.1f} KB)")
+        print(f"  Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,311 @@
+"""
+DOCX Reader Module
+Streaming extraction of result tables and figure captions from report DOCX files
+
+Historical EMF_ML_ANALYSIS_REPORT.docx files are the only record of some
+past runs. This module stream-parses word/document.xml with iterparse
+(paragraphs and tables are yielded and cleared as soon as they close, so
+the python-docx object model is never built) and maps the tables it
+recognises back onto the outputs/tables schemas:
+
+    model_results_comparison   07_model_results_comparison.csv columns
+    anova_results              03_anova_results.csv columns
+    vif_multicollinearity      05_vif_multicollinearity.csv columns
+    chi_square_results         10_chi_square_results.csv columns
+    figure_captions            Number, Caption
+
+Tables are recognised by their header row. Values the report does not show
+(e.g. Train_RMSE or the chi-square DOF) are left as NaN. A directory of
+reports is processed in parallel with one task per file.
+
+Usage:
+    python -m emf_ml.docx_reader outputs/ --output-dir outputs/history --n-jobs -1
+"""
+
+import argparse
+import os
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+import pandas as pd
+
+from .features import TARGETS
+
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Column layouts of the outputs/tables CSV files the extracted tables follow
+MODEL_RESULTS_COLUMNS = ['Model', 'Target', 'Train_RMSE', 'Test_RMSE', 'Train_MAE', 'Test_MAE', 'Train_R²',
+                         'Test_R²', 'Test_Adj_R²', 'Test_MAPE', 'Test_Max_Error', 'CV_R²_Mean', 'CV_R²_Std',
+                         'Training_Time']
+ANOVA_COLUMNS = ['Categorical Feature', 'Target Variable', 'F-statistic', 'p-value', 'Eta-squared', 'Significant']
+VIF_COLUMNS = ['Feature', 'VIF', 'Status']
+CHI_SQUARE_COLUMNS = ['Variable 1', 'Variable 2', 'Chi-square', 'p-value', 'DOF', "Cramér's V", 'Significant']
+CAPTION_COLUMNS = ['Number', 'Caption']
+
+TABLE_COLUMNS = {
+    'model_results_comparison': MODEL_RESULTS_COLUMNS,
+    'anova_results': ANOVA_COLUMNS,
+    'vif_multicollinearity': VIF_COLUMNS,
+    'chi_square_results': CHI_SQUARE_COLUMNS,
+    'figure_captions': CAPTION_COLUMNS,
+}
+
+# Report header -> CSV column, per recognised table (the first headers identify the table)
+HEADER_MAPS = {
+    'model_results_comparison': {
+        'Model': 'Model', 'Train R²': 'Train_R²', 'Test R²': 'Test_R²', 'Test RMSE': 'Test_RMSE',
+        'Test MAE': 'Test_MAE', 'CV R² (Mean±Std)': ('CV_R²_Mean', 'CV_R²_Std'),
+    },
+    'anova_results': {
+        'Feature': 'Categorical Feature', 'Target': 'Target Variable', 'F-Statistic': 'F-statistic',
+        'p-value': 'p-value', 'Eta²': 'Eta-squared', 'Significant': 'Significant',
+    },
+    'vif_multicollinearity': {'Feature': 'Feature', 'VIF': 'VIF', 'Status': 'Status'},
+    'chi_square_results': {
+        'Variable 1': 'Variable 1', 'Variable 2': 'Variable 2', 'χ²': 'Chi-square', 'p-value': 'p-value',
+        "Cramér's V": "Cramér's V", 'Significant': 'Significant',
+    },
+}
+SIGNATURE_LENGTH = 3
+
+TEXT_COLUMNS = {'Model', 'Target', 'Categorical Feature', 'Target Variable', 'Feature', 'Status',
+                'Variable 1', 'Variable 2'}
+BOOLEAN_COLUMNS = {'Significant'}
+
+CAPTION_PATTERN = re.compile(r'^Figure (\d+):\s*(.*)$')
+
+
+def docx_blocks(path):
+    """
+    Stream the body of a DOCX file
+
+    Args:
+        path: DOCX file
+
+    Yields:
+        ('paragraph', text) and ('table', rows) tuples in document order;
+        rows are lists of cell texts
+    """
+    depth = 0
+    texts, cell, cells, rows = [], [], [], []
+    with zipfile.ZipFile(path) as archive, archive.open('word/document.xml') as xml:
+        for event, elem in ElementTree.iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == W_NS + 'tbl':
+                    depth += 1
+                    if depth == 1:
+                        rows = []
+                continue
+            if tag == W_NS + 't':
+                texts.append(elem.text or '')
+            elif tag == W_NS + 'tab':
+                texts.append('\t')
+            elif tag in (W_NS + 'br', W_NS + 'cr'):
+                texts.append('\n')
+            elif tag == W_NS + 'p':
+                if depth:
+                    cell.append(''.join(texts))
+                else:
+                    yield 'paragraph', ''.join(texts)
+                texts = []
+                elem.clear()
+            elif tag == W_NS + 'tc' and depth == 1:
+                cells.append('\n'.join(cell))
+                cell = []
+            elif tag == W_NS + 'tr' and depth == 1:
+                rows.append(cells)
+                cells = []
+            elif tag == W_NS + 'tbl':
+                depth -= 1
+                if depth == 0:
+                    yield 'table', rows
+                    elem.clear()
+
+
+def table_kind(headers):
+    """Return the outputs/tables name of a report table from its header row, or None"""
+    headers = [h.strip() for h in headers]
+    for name, mapping in HEADER_MAPS.items():
+        signature = list(mapping)[:SIGNATURE_LENGTH]
+        if headers[:SIGNATURE_LENGTH] == signature:
+            return name
+    return None
+
+
+def parse_value(text, column):
+    """
+    Convert a report cell to the CSV value type of its column
+
+    Args:
+        text: Cell text
+        column: CSV column name
+
+    Returns:
+        str, bool, float or NaN
+    """
+    text = text.strip()
+    if column in TEXT_COLUMNS:
+        return text
+    if column in BOOLEAN_COLUMNS:
+        return {'yes': True, 'no': False, 'true': True, 'false': False}.get(text.lower(), np.nan)
+    if text in ('∞', 'inf', 'Inf'):
+        return np.inf
+    try:
+        return float(text.replace('−', '-'))
+    except ValueError:
+        return np.nan
+
+
+def table_records(name, rows, target=None):
+    """
+    Convert the rows of a recognised report table to CSV records
+
+    Args:
+        name: Table name from table_kind()
+        rows: Header row followed by data rows
+        target: Target of a model results table (from its title)
+
+    Returns:
+        list of dicts keyed by CSV column
+    """
+    mapping = HEADER_MAPS[name]
+    headers = [h.strip() for h in rows[0]]
+    records = []
+    for row in rows[1:]:
+        record = {'Target': target} if name == 'model_results_comparison' else {}
+        for header, cell in zip(headers, row):
+            column = mapping.get(header)
+            if isinstance(column, tuple):
+                values = re.split(r'\s*±\s*', cell.strip())
+                for c, v in zip(column, values):
+                    record[c] = parse_value(v, c)
+            elif column:
+                record[column] = parse_value(cell, column)
+        records.append(record)
+    return records
+
+
+def parse_blocks(blocks):
+    """
+    Collect the recognised tables and figure captions of a block stream
+
+    Args:
+        blocks: Iterable of docx_blocks() tuples
+
+    Returns:
+        dict of table name -> DataFrame with the TABLE_COLUMNS columns
+    """
+    records = {name: [] for name in TABLE_COLUMNS}
+    target = None
+    for kind, block in blocks:
+        if kind == 'paragraph':
+            caption = CAPTION_PATTERN.match(block.strip())
+            if caption:
+                records['figure_captions'].append({'Number': int(caption.group(1)), 'Caption': caption.group(2)})
+            # Results tables are titled '<target> Target Performance'
+            found = [t for t in TARGETS if t in block]
+            if found and len(block) < 80:
+                target = found[0]
+            continue
+        if not block:
+            continue
+        name = table_kind(block[0])
+        if name:
+            records[name].extend(table_records(name, block, target))
+        if name == 'model_results_comparison':
+            target = None
+    return {name: pd.DataFrame(rows, columns=TABLE_COLUMNS[name]) for name, rows in records.items()}
+
+
+def read_report(path):
+    """
+    Extract the result tables and figure captions of one report
+
+    Args:
+        path: DOCX file
+
+    Returns:
+        dict of table name -> DataFrame
+    """
+    return parse_blocks(docx_blocks(path))
+
+
+def report_paths(paths):
+    """Expand files and directories (searched recursively) into report DOCX paths"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                found.extend(os.path.join(directory, n) for n in sorted(names)
+                             if n.endswith('.docx') and not n.startswith('~$'))
+        else:
+            found.append(path)
+    return found
+
+
+def _read_report_safe(path):
+    """read_report() for a pool worker: returns (path, tables, error)"""
+    try:
+        return path, read_report(path), None
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        return path, None, f'{type(e).__name__}: {e}'
+
+
+def read_reports(paths, n_jobs=1):
+    """
+    Extract the tables of many reports in parallel
+
+    Args:
+        paths: DOCX files and/or directories
+        n_jobs: Worker processes (joblib; -1 for all cores)
+
+    Returns:
+        dict of table name -> DataFrame with a leading Source column (the
+        report path), plus 'errors' (Source, Error) for unreadable files
+    """
+    from joblib import Parallel, delayed
+
+    files = report_paths(paths)
+    results = Parallel(n_jobs=n_jobs, batch_size='auto')(delayed(_read_report_safe)(p) for p in files)
+
+    combined = {}
+    for name, columns in TABLE_COLUMNS.items():
+        parts = [tables[name].assign(Source=path) for path, tables, _ in results
+                 if tables is not None and len(tables[name])]
+        frame = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns + ['Source'])
+        combined[name] = frame[['Source'] + columns]
+    combined['errors'] = pd.DataFrame([(p, e) for p, _, e in results if e], columns=['Source', 'Error'])
+    return combined
+
+
+def main():
+    """Extract report tables into CSV files"""
+    import time
+
+    parser = argparse.ArgumentParser(description='Extract result tables from report DOCX files')
+    parser.add_argument('paths', nargs='+', help='DOCX files or directories')
+    parser.add_argument('--output-dir', help='Write one <table>.csv per extracted table')
+    parser.add_argument('--n-jobs', type=int, default=1)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tables = read_reports(args.paths, n_jobs=args.n_jobs)
+    n_reports = len(report_paths(args.paths))
+    print(f"Read {n_reports} report(s) in {time.perf_counter() - start:.2f} s")
+    for name, table in tables.items():
+        print(f"  {name}: {len(table)} row(s)")
+
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for name, table in tables.items():
+            path = os.path.join(args.output_dir, f'{name}.csv')
+            table.to_csv(path, index=False)
+            print(f"Saved: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+Export Module
+Writes all result tables in one pass as CSV files and one consolidated XLSX workbook
+
+Results are kept in memory as a dictionary of DataFrames keyed by table
+name (e.g. 'descriptive_statistics'), the same dictionary DocumentBuilder
+accepts as `results`. Each table is written as outputs/tables/NN_<name>.csv
+and as one sheet of a single workbook. The workbook is streamed with
+xlsxwriter in constant-memory mode: rows are flushed to disk as they are
+written, no worksheet DOM is built, and one set of header/index formats is
+shared by all sheets. Tables longer than an Excel sheet continue on
+'<name> (2)', '<name> (3)', ... sheets.
+
+Usage:
+    python -m emf_ml.export --tables-dir outputs/tables
+"""
+
+import argparse
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from .features import BASE_DIR
+
+
+TABLES_DIR = os.path.join(BASE_DIR, 'outputs', 'tables')
+WORKBOOK_NAME = 'all_tables.xlsx'
+
+# Table order of the analysis outputs; the file prefix is the 1-based position
+TABLE_NAMES = [
+    'descriptive_statistics',
+    'correlation_matrix',
+    'anova_results',
+    'normality_tests',
+    'vif_multicollinearity',
+    'feature_importance',
+    'model_results_comparison',
+    'original_dataset',
+    'processed_dataset',
+    'chi_square_results',
+    'eta_squared_results',
+    'cohens_d_results',
+]
+
+TABLE_FILE_PATTERN = re.compile(r'^(\d+)_(.+)\.csv$')
+
+EXCEL_MAX_ROWS = 1_048_576
+SHEET_NAME_LENGTH = 31
+CSV_BUFFER_BYTES = 1 << 20
+CHUNK_ROWS = 50_000
+
+
+def table_filename(name, extension='csv'):
+    """
+    Return the NN_<name> file name of a result table
+
+    Args:
+        name: Table name (e.g. 'descriptive_statistics')
+        extension: File extension
+
+    Returns:
+        str
+    """
+    number = TABLE_NAMES.index(name) + 1 if name in TABLE_NAMES else None
+    return f'{number:02d}_{name}.{extension}' if number else f'{name}.{extension}'
+
+
+def load_tables(tables_dir=None, names=None):
+    """
+    Read exported CSV tables back into a results dictionary
+
+    Args:
+        tables_dir: Directory with NN_<name>.csv files (defaults to outputs/tables)
+        names: Table names to load (defaults to all found)
+
+    Returns:
+        dict of table name -> DataFrame
+    """
+    tables_dir = tables_dir or TABLES_DIR
+    results = {}
+    for filename in sorted(os.listdir(tables_dir)):
+        match = TABLE_FILE_PATTERN.match(filename)
+        if match and (names is None or match.group(2) in names):
+            results[match.group(2)] = pd.read_csv(os.path.join(tables_dir, filename), index_col=0,
+                                                 float_precision='round_trip')
+    return results
+
+
+def export_tables(results, output_dir=None, workbook=WORKBOOK_NAME, csv=True, index=True):
+    """
+    Write result tables as CSV files and one consolidated XLSX workbook
+
+    Args:
+        results: Dict of table name -> DataFrame, written in TABLE_NAMES order
+            followed by any other tables in insertion order
+        output_dir: Destination directory (defaults to outputs/tables)
+        workbook: Workbook file name, or None to skip the XLSX output
+        csv: Write NN_<name>.csv files
+        index: Write the DataFrame index as the first column
+
+    Returns:
+        dict: {'csv': [paths], 'xlsx': path or None}
+    """
+    import xlsxwriter
+
+    output_dir = output_dir or TABLES_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    names = [n for n in TABLE_NAMES if n in results] + [n for n in results if n not in TABLE_NAMES]
+
+    written = {'csv': [], 'xlsx': None}
+    book = None
+    if workbook:
+        written['xlsx'] = os.path.join(output_dir, workbook)
+        book = xlsxwriter.Workbook(written['xlsx'], {'constant_memory': True})
+        formats = {
+            'header': book.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'}),
+            'index': book.add_format({'bold': True, 'border': 1, 'valign': 'top'}),
+        }
+
+    try:
+        for name in names:
+            df = results[name]
+            if csv:
+                path = os.path.join(output_dir, table_filename(name))
+                with open(path, 'w', newline='', encoding='utf-8', buffering=CSV_BUFFER_BYTES) as f:
+                    df.to_csv(f, index=index, chunksize=CHUNK_ROWS)
+                written['csv'].append(path)
+            if book is not None:
+                write_sheets(book, name, df, formats, index)
+    finally:
+        if book is not None:
+            book.close()
+    return written
+
+
+def write_sheets(book, name, df, formats, index=True):
+    """
+    Stream a DataFrame into one or more worksheets
+
+    Args:
+        book: xlsxwriter Workbook opened with constant_memory
+        name: Table name used for the sheet names
+        df: DataFrame to write
+        formats: Dict with shared 'header' and 'index' formats
+        index: Write the DataFrame index as the first column
+
+    Returns:
+        list: Sheet names written
+    """
+    per_sheet = EXCEL_MAX_ROWS - 1
+    n_sheets = max(1, -(-len(df) // per_sheet))
+    headers = ([df.index.name or ''] if index else []) + [str(c) for c in df.columns]
+    offset = 1 if index else 0
+
+    sheet_names = []
+    for part in range(n_sheets):
+        sheet_name = _sheet_name(name, part)
+        sheet = book.add_worksheet(sheet_name)
+        sheet_names.append(sheet_name)
+        for col, header in enumerate(headers):
+            sheet.set_column(col, col, max(10, min(len(header) + 2, 40)))
+        # Header row; the index header cell stays blank as in pandas output
+        for col, header in enumerate(headers):
+            if header or not index or col > 0:
+                sheet.write_string(0, col, header, formats['header'])
+
+        row = 1
+        stop = min(len(df), (part + 1) * per_sheet)
+        for start in range(part * per_sheet, stop, CHUNK_ROWS):
+            chunk = df.iloc[start:min(start + CHUNK_ROWS, stop)]
+            columns = [_cell_values(chunk[c]) for c in chunk.columns]
+            labels = _cell_values(chunk.index) if index else None
+            for i, values in enumerate(zip(*columns) if columns else [()] * len(chunk)):
+                if labels is not None and labels[i] is not None:
+                    sheet.write(row, 0, labels[i], formats['index'])
+                sheet.write_row(row, offset, values)
+                row += 1
+    return sheet_names
+
+
+def _cell_values(values):
+    """Convert a Series or Index to Python cell values, with None for missing cells"""
+    kind = values.dtype.kind
+    cells = values.tolist()
+    if kind == 'M':
+        return [None if pd.isna(v) else v.isoformat() for v in cells]
+    if kind == 'f':
+        return [None if v != v or v in (np.inf, -np.inf) else v for v in cells]
+    if kind in 'biu':
+        return cells
+    return [None if _is_missing(v) else (v if isinstance(v, (str, int, float, bool)) else str(v)) for v in cells]
+
+
+def _is_missing(value):
+    """Return True for None and NaN-like scalars"""
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _sheet_name(name, part):
+    """Excel-safe sheet name for part `part` of a table"""
+    suffix = f' ({part + 1})' if part else ''
+    name = re.sub(r'[\[\]:*?/\\]', '_', name)
+    return name[:SHEET_NAME_LENGTH - len(suffix)] + suffix
+
+
+def main():
+    """Consolidate exported tables into one workbook"""
+    parser = argparse.ArgumentParser(description='Export result tables as CSV and one XLSX workbook')
+    parser.add_argument('--tables-dir', default=TABLES_DIR, help='Directory with NN_<name>.csv tables')
+    parser.add_argument('--output-dir', help='Destination directory (defaults to --tables-dir)')
+    parser.add_argument('--workbook', default=WORKBOOK_NAME)
+    args = parser.parse_args()
+
+    results = load_tables(args.tables_dir)
+    output_dir = args.output_dir or args.tables_dir
+    written = export_tables(results, output_dir, args.workbook, csv=output_dir != args.tables_dir)
+    print(f"Exported {len(results)} tables")
+    print(f"  Workbook: {written['xlsx']}")
+
+
+if __name__ == '__main__':
+    main()
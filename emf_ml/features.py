@@ -0,0 +1,178 @@
+"""
+Features Module
+Loading of the EMF measurement data and the feature engineering used by the trained models
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(BASE_DIR, 'data', 'emf-data-sipc-ibri.csv')
+
+RAW_COLUMNS = [
+    'City', 'Profile_Type', 'Time_Hour', 'Temp_C', 'Humidity_Pct',
+    'Distance_m', 'Circuit', 'E_ICNIRP', 'H_ICNIRP'
+]
+
+TARGETS = ['E_ICNIRP', 'H_ICNIRP']
+
+# Category codes used in the measurement data
+CITY_NAMES = {0: 'Ibri', 1: 'Suhar'}
+
+# Each circuit belongs to a single city (chi-square Cramer's V = 1.0)
+CIRCUIT_CITY = {0: 0, 1: 0, 2: 1}
+
+# Column order expected by the saved models from version 20251210 on
+# (see model_config_*.joblib)
+FEATURES = [
+    'Profile_Type', 'Temp_C', 'Humidity_Pct', 'Distance_m', 'Circuit',
+    'City_x_Profile', 'Circuit_2', 'Time_Period_3', 'Temp_x_Humidity',
+    'Environmental_Factor', 'Distance_x_Humidity', 'Distance_Squared',
+    'Distance_Inverse', 'Dist_Temp_Interaction', 'Dist_Hum_Interaction'
+]
+
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+
+def load_measurements(path=None, columns=None, filters=None):
+    """
+    Load the EMF measurements
+
+    The default data set is read from the columnar measurement store
+    (data/store), which re-ingests data/emf-data-sipc-ibri.csv whenever the
+    CSV changes. Only the rows of that CSV are returned, so campaigns
+    ingested into the store alongside it do not change the data set (load
+    those with MeasurementStore.load). An explicit CSV path is parsed
+    directly.
+
+    Args:
+        path: CSV file path (defaults to the measurement store)
+        columns: Columns to load (defaults to the raw measurement columns)
+        filters: Store predicates such as [('City', '==', 'Suhar')], also
+            applied when the CSV is parsed directly
+
+    Returns:
+        DataFrame with the raw measurement columns
+    """
+    from .store import ROW_COLUMN, filter_frame, open_store
+
+    if path is not None:
+        df = filter_frame(pd.read_csv(path), filters)
+        return df[columns] if columns else df
+
+    try:
+        store = open_store()
+    except OSError:
+        # Read-only checkout: fall back to parsing the CSV
+        df = filter_frame(pd.read_csv(DATA_PATH), filters)
+        return df[columns] if columns else df
+    columns = columns or [c for c in store.columns if c not in (ROW_COLUMN, 'Campaign_Date')]
+    return store.load(columns, store.source_filter(DATA_PATH) + list(filters or []))
+
+
+# Engineered feature definitions over raw measurement columns; each works on
+# pandas Series and NumPy arrays alike
+FEATURE_FORMULAS = {
+    'City': lambda c: c['City'],
+    'Profile_Type': lambda c: c['Profile_Type'],
+    'Time_Hour': lambda c: c['Time_Hour'],
+    'Temp_C': lambda c: c['Temp_C'],
+    'Humidity_Pct': lambda c: c['Humidity_Pct'],
+    'Distance_m': lambda c: c['Distance_m'],
+    'Circuit': lambda c: c['Circuit'],
+    'City_x_Profile': lambda c: c['City'] * c['Profile_Type'],
+    'Circuit_2': lambda c: (c['Circuit'] == 2) * 1,
+    'Time_Period_3': lambda c: (c['Time_Hour'] > 12) * 1,  # Afternoon period
+    'Temp_x_Humidity': lambda c: c['Temp_C'] * c['Humidity_Pct'],
+    'Environmental_Factor': lambda c: (c['Temp_C'] + c['Humidity_Pct']) / 2,
+    'Distance_x_Humidity': lambda c: c['Distance_m'] * c['Humidity_Pct'],
+    'Distance_Squared': lambda c: c['Distance_m'] ** 2,
+    'Distance_Inverse': lambda c: 1 / (c['Distance_m'] + 1),
+    'Dist_Temp_Interaction': lambda c: c['Distance_m'] * c['Temp_C'],
+    'Dist_Hum_Interaction': lambda c: c['Distance_m'] * c['Humidity_Pct'],
+}
+
+
+def engineer_features(df, features=None):
+    """
+    Build the model input features from raw measurements
+
+    Args:
+        df: DataFrame with the raw measurement columns (targets not required)
+        features: Feature names to build (defaults to FEATURES)
+
+    Returns:
+        DataFrame with columns in the requested order
+    """
+    features = features or FEATURES
+    return pd.DataFrame({name: FEATURE_FORMULAS[name](df) for name in features}, index=df.index)
+
+
+def engineer_feature_array(columns, features=None, dtype=np.float64):
+    """
+    Array version of engineer_features for large vectorized batches
+
+    Args:
+        columns: Mapping of raw column name to 1-D array (City, Profile_Type,
+            Time_Hour, Temp_C, Humidity_Pct, Distance_m, Circuit), e.g. a DataFrame
+        features: Feature names to build (defaults to FEATURES)
+        dtype: Output dtype
+
+    Returns:
+        ndarray of shape (n_rows, n_features) in the requested order
+    """
+    features = features or FEATURES
+    raw = {name: np.asarray(columns[name], dtype=np.float64) for name in RAW_COLUMNS[:7]}
+    out = np.empty((len(raw['Distance_m']), len(features)), dtype=dtype)
+    for i, name in enumerate(features):
+        out[:, i] = FEATURE_FORMULAS[name](raw)
+    return out
+
+
+def train_test_indices(n_samples, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """
+    Reproduce the train/test split used when the models were trained
+
+    Args:
+        n_samples: Number of rows in the dataset
+        test_size: Test fraction
+        random_state: Split seed
+
+    Returns:
+        tuple: (train_idx, test_idx) positional index arrays
+    """
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(np.arange(n_samples), test_size=test_size, random_state=random_state)
+
+
+def synthetic_measurements(n_rows, df=None, random_state=RANDOM_STATE):
+    """
+    Generate synthetic measurements by resampling the observed data with jitter
+
+    Categorical columns are resampled as-is; continuous columns receive
+    Gaussian noise scaled to 10% of the column standard deviation and are
+    clipped to the observed range.
+
+    Args:
+        n_rows: Number of rows to generate
+        df: Seed DataFrame (defaults to load_measurements())
+        random_state: Random seed
+
+    Returns:
+        DataFrame with the raw measurement columns
+    """
+    df = load_measurements() if df is None else df
+    rng = np.random.default_rng(random_state)
+    sample = df.iloc[rng.integers(0, len(df), n_rows)].reset_index(drop=True)
+    for col in ['Temp_C', 'Humidity_Pct', 'Distance_m', 'E_ICNIRP', 'H_ICNIRP']:
+        if col not in sample:
+            continue
+        lo, hi = df[col].min(), df[col].max()
+        noise = rng.normal(0.0, 0.1 * df[col].std(), n_rows)
+        sample[col] = np.clip(sample[col].to_numpy(dtype=np.float64) + noise, lo, hi)
+    return sample
@@ -0,0 +1,413 @@
+"""
+Learning Curves Module
+Parallel learning-curve and sample-size study of the EMF model families
+
+Every model family (SVR, Random Forest, XGBoost, Neural Network) is
+retrained with the version's hyperparameters on nested subsamples of the
+training split, over repeated random train/test splits of the
+measurements. Each (repeat, subsample size) pair is one task: the
+RobustScaler and PCA used by SVR and the Neural Network are fitted once
+per task and shared by both families and both targets, and the tasks are
+spread across a joblib process pool.
+
+The mean test R² per size is fitted with an inverse power law,
+
+    R²(n) = a - b n^(-c)
+
+and extrapolated to the number of training samples needed to reach a
+target R² (n = (b / (a - R²)) ^ (1 / c), unreachable when the asymptote a
+is below the target). The asymptote is bounded by R² = 1; a fit that
+ends on that bound has no plateau determined by the data, so its sample
+size is reported as NaN (At_Bound) rather than a number set by the
+constraint. Confidence bands and intervals come from the spread over
+repeats and a bootstrap over repeats.
+
+The module writes outputs/tables/learning_curves.csv (every score),
+outputs/tables/sample_size_estimates.csv and
+outputs/plots/16_learning_curves.png.
+
+Usage:
+    python -m emf_ml.learning_curves --repeats 20 --target-r2 0.5 --n-jobs -1
+    python -m emf_ml.learning_curves --curves outputs/tables/learning_curves.csv
+"""
+
+import argparse
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .features import BASE_DIR, TARGETS, TEST_SIZE, RANDOM_STATE, engineer_feature_array, load_measurements
+from .registry import MODEL_NAMES, PCA_VARIANCE, TARGET_SUFFIXES, ModelRegistry
+
+
+FAMILIES = list(MODEL_NAMES)
+
+# Families trained on scaled (and PCA-reduced) inputs; trees use raw features
+SCALED_FAMILIES = {'svr', 'mlp'}
+
+# Parameters not carried over from the saved models: no validation set is
+# passed for early stopping and parallelism is across tasks
+EXCLUDED_PARAMS = {'early_stopping_rounds', 'eval_metric', 'n_jobs'}
+
+DEFAULT_REPEATS = 20
+DEFAULT_SIZES = 8
+MIN_TRAIN_SIZE = 15
+DEFAULT_TARGET_R2 = 0.5
+DEFAULT_BOOTSTRAP = 200
+CONFIDENCE = 0.90
+
+# Samples-needed estimates above this are reported as beyond reach
+MAX_EXTRAPOLATION = 1_000_000
+
+# Upper bound of the fitted asymptote, and the distance below it at which a fit counts as pinned
+MAX_ASYMPTOTE = 1.0
+BOUND_TOLERANCE = 1e-6
+
+# Extent of the plotted extrapolation, as a multiple of the training split
+EXTRAPOLATION_FACTOR = 20
+
+CURVES_TABLE = 'learning_curves.csv'
+ESTIMATES_TABLE = 'sample_size_estimates.csv'
+CURVES_FIGURE = '16_learning_curves.png'
+
+
+def family_estimators(registry, version=None):
+    """
+    Unfitted estimators with the hyperparameters of a version's models
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version
+
+    Returns:
+        dict of (family, target) -> unfitted estimator
+    """
+    from sklearn.base import clone
+
+    estimators = {}
+    for family in FAMILIES:
+        for target in TARGETS:
+            model = registry.load_model(f'{family}_{TARGET_SUFFIXES[target]}', version)
+            overrides = {k: 1 if k == 'n_jobs' else None
+                         for k in EXCLUDED_PARAMS if k in model.get_params(deep=False)}
+            estimators[(family, target)] = clone(model).set_params(**overrides)
+    return estimators
+
+
+def train_sizes(n_train, n_sizes=DEFAULT_SIZES, min_size=MIN_TRAIN_SIZE):
+    """Evenly spaced nested subsample sizes up to the full training split"""
+    return np.unique(np.linspace(min(min_size, n_train), n_train, n_sizes).round().astype(int))
+
+
+def split_orders(n_samples, repeats, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """
+    Repeated random splits with a shuffled training order
+
+    The first n indices of a training order form the size-n subsample, so
+    subsamples are nested within a repeat.
+
+    Returns:
+        list of (train_order, test_idx) tuples
+    """
+    rng = np.random.default_rng(random_state)
+    n_test = int(np.ceil(test_size * n_samples))
+    splits = []
+    for _ in range(repeats):
+        order = rng.permutation(n_samples)
+        splits.append((order[n_test:], order[:n_test]))
+    return splits
+
+
+def fit_subsample(estimators, X, Y, train_idx, test_idx):
+    """
+    Train every family on one subsample and score it on the test split
+
+    The scaler and PCA are fitted once and shared by the scaled families.
+
+    Args:
+        estimators: Dict from family_estimators()
+        X: Engineered features of all measurements
+        Y: Target matrix in TARGETS order
+        train_idx: Subsample indices
+        test_idx: Test indices
+
+    Returns:
+        list of (family, target, train R², test R², test RMSE) tuples
+    """
+    from sklearn.base import clone
+    from sklearn.decomposition import PCA
+    from sklearn.metrics import mean_squared_error, r2_score
+    from sklearn.preprocessing import RobustScaler
+
+    scaler = RobustScaler().fit(X[train_idx])
+    pca = PCA(n_components=PCA_VARIANCE).fit(scaler.transform(X[train_idx]))
+    inputs = {
+        False: (X[train_idx], X[test_idx]),
+        True: (pca.transform(scaler.transform(X[train_idx])), pca.transform(scaler.transform(X[test_idx]))),
+    }
+
+    scores = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for (family, target), estimator in estimators.items():
+            X_train, X_test = inputs[family in SCALED_FAMILIES]
+            y = Y[:, TARGETS.index(target)]
+            model = clone(estimator).fit(X_train, y[train_idx])
+            predicted = model.predict(X_test)
+            scores.append((family, target, r2_score(y[train_idx], model.predict(X_train)),
+                           r2_score(y[test_idx], predicted),
+                           float(np.sqrt(mean_squared_error(y[test_idx], predicted)))))
+    return scores
+
+
+def _task(estimators, X, Y, repeat, size, train_order, test_idx):
+    """One (repeat, size) task for the process pool"""
+    return [(repeat, size, *score) for score in fit_subsample(estimators, X, Y, train_order[:size], test_idx)]
+
+
+def run_curves(registry=None, version=None, repeats=DEFAULT_REPEATS, n_sizes=DEFAULT_SIZES, n_jobs=1, data=None):
+    """
+    Compute learning curves for every family and target
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        repeats: Repeated train/test splits
+        n_sizes: Subsample sizes per split
+        n_jobs: Worker processes (joblib; -1 for all cores)
+        data: Measurements (defaults to load_measurements())
+
+    Returns:
+        DataFrame with Repeat, Train_Size, Model, Target, Train_R2, Test_R2, Test_RMSE
+    """
+    from joblib import Parallel, delayed
+
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    data = load_measurements() if data is None else data
+    X = engineer_feature_array(data, registry.features(version))
+    Y = data[TARGETS].to_numpy(dtype=np.float64)
+    estimators = family_estimators(registry, version)
+
+    splits = split_orders(len(data), repeats)
+    sizes = train_sizes(len(splits[0][0]), n_sizes)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_task)(estimators, X, Y, r, int(size), order, test_idx)
+        for r, (order, test_idx) in enumerate(splits) for size in sizes
+    )
+    rows = [row for task in results for row in task]
+    curves = pd.DataFrame(rows, columns=['Repeat', 'Train_Size', 'Family', 'Target', 'Train_R2', 'Test_R2',
+                                         'Test_RMSE'])
+    curves.insert(2, 'Model', curves.pop('Family').map(MODEL_NAMES))
+    return curves.sort_values(['Target', 'Model', 'Repeat', 'Train_Size'], ignore_index=True)
+
+
+def power_law(n, a, b, c):
+    """Inverse power law learning curve a - b n^(-c)"""
+    return a - b * np.power(n, -c)
+
+
+def fit_power_law(sizes, scores):
+    """
+    Fit the inverse power law to the scores of repeated runs
+
+    Args:
+        sizes: Training sizes
+        scores: Array of shape (n_repeats, n_sizes)
+
+    Returns:
+        (a, b, c) tuple, or None when the fit fails
+    """
+    from scipy.optimize import curve_fit
+
+    sizes = np.asarray(sizes, dtype=np.float64)
+    scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+    mean = scores.mean(axis=0)
+    # Weight each size by the standard error of its mean score
+    sigma = None
+    if len(scores) > 1:
+        sigma = np.maximum(scores.std(axis=0, ddof=1) / np.sqrt(len(scores)), 1e-3)
+    try:
+        params, _ = curve_fit(power_law, sizes, mean, p0=(min(mean.max() + 0.1, 1.0), 1.0, 0.5), sigma=sigma,
+                              bounds=([-np.inf, 0.0, 0.01], [MAX_ASYMPTOTE, np.inf, 5.0]), maxfev=20000)
+    except (RuntimeError, ValueError):
+        return None
+    return tuple(float(p) for p in params)
+
+
+def at_bound(params):
+    """Return True when a fitted asymptote sits on the R² = 1 bound"""
+    return params is not None and params[0] >= MAX_ASYMPTOTE - BOUND_TOLERANCE
+
+
+def samples_needed(params, target_r2):
+    """
+    Training samples at which the fitted curve reaches target_r2
+
+    Returns inf when the curve never reaches it, and NaN when the fit
+    failed or its asymptote is pinned at the bound (the estimate would
+    come from the constraint, not from the data).
+    """
+    if params is None or at_bound(params):
+        return np.nan
+    a, b, c = params
+    if a <= target_r2:
+        return np.inf
+    if b == 0:
+        return 1.0
+    needed = float((b / (a - target_r2)) ** (1.0 / c))
+    return needed if needed <= MAX_EXTRAPOLATION else np.inf
+
+
+def estimate_sample_sizes(curves, target_r2=DEFAULT_TARGET_R2, n_bootstrap=DEFAULT_BOOTSTRAP,
+                          confidence=CONFIDENCE, random_state=RANDOM_STATE):
+    """
+    Extrapolate the samples needed to reach a target R² per model and target
+
+    Args:
+        curves: DataFrame from run_curves()
+        target_r2: Test R² to reach
+        n_bootstrap: Bootstrap resamples of the repeats
+        confidence: Interval coverage
+        random_state: Bootstrap seed
+
+    Returns:
+        DataFrame with Target, Model, Train_Size, Test_R2 (mean at the full
+        size) with its interval, the fitted Asymptote and Exponent,
+        At_Bound, Target_R2, and Samples_Needed with its interval (inf
+        when the fitted asymptote is below the target or the estimate
+        exceeds MAX_EXTRAPOLATION; NaN, interval included, when the
+        asymptote is pinned at the R² = 1 bound)
+    """
+    rng = np.random.default_rng(random_state)
+    alpha = (1 - confidence) / 2
+    records = []
+    for (target, model), part in curves.groupby(['Target', 'Model'], sort=False):
+        table = part.pivot(index='Repeat', columns='Train_Size', values='Test_R2')
+        sizes, scores = table.columns.to_numpy(), table.to_numpy()
+        params = fit_power_law(sizes, scores)
+
+        resampled = []
+        for _ in range(n_bootstrap):
+            rows = rng.integers(0, len(scores), len(scores))
+            resampled.append(samples_needed(fit_power_law(sizes, scores[rows]), target_r2))
+        resampled = np.asarray(resampled)
+        resampled = resampled[~np.isnan(resampled)] if not at_bound(params) else np.empty(0)
+
+        full = scores[:, -1]
+        records.append({
+            'Target': target,
+            'Model': model,
+            'Train_Size': int(sizes[-1]),
+            'Test_R2': full.mean(),
+            'Test_R2_Low': np.quantile(full, alpha),
+            'Test_R2_High': np.quantile(full, 1 - alpha),
+            'Asymptote': params[0] if params else np.nan,
+            'Exponent': params[2] if params else np.nan,
+            'At_Bound': at_bound(params),
+            'Target_R2': target_r2,
+            'Samples_Needed': samples_needed(params, target_r2),
+            'Samples_Low': np.quantile(resampled, alpha, method='inverted_cdf') if len(resampled) else np.nan,
+            'Samples_High': np.quantile(resampled, 1 - alpha, method='inverted_cdf') if len(resampled) else np.nan,
+        })
+    return pd.DataFrame(records)
+
+
+def save_learning_curves_figure(curves, estimates, path, confidence=CONFIDENCE):
+    """
+    Plot mean test R² with confidence bands and the fitted extrapolation, one panel per target
+
+    Args:
+        curves: DataFrame from run_curves()
+        estimates: DataFrame from estimate_sample_sizes()
+        path: Output image path
+        confidence: Band coverage across repeats
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker
+
+    alpha = (1 - confidence) / 2
+    targets = list(dict.fromkeys(curves['Target']))
+    fig, axes = plt.subplots(1, len(targets), figsize=(6.5 * len(targets), 4.5), squeeze=False)
+    for ax, target in zip(axes[0], targets):
+        part = curves[curves['Target'] == target]
+        max_size = part['Train_Size'].max()
+        grid = np.geomspace(part['Train_Size'].min(), max_size * EXTRAPOLATION_FACTOR, 200)
+        for i, (model, group) in enumerate(part.groupby('Model')):
+            color = f'C{i}'
+            stats = group.groupby('Train_Size')['Test_R2']
+            ax.plot(stats.mean().index, stats.mean(), 'o-', color=color, label=model, markersize=4)
+            ax.fill_between(stats.mean().index, stats.quantile(alpha), stats.quantile(1 - alpha),
+                            color=color, alpha=0.15)
+            fit = estimates[(estimates['Target'] == target) & (estimates['Model'] == model)]
+            params = fit_power_law(stats.mean().index,
+                                   group.pivot(index='Repeat', columns='Train_Size', values='Test_R2').to_numpy())
+            # Fits pinned at the asymptote bound are not extrapolated
+            if params is not None and len(fit) and not at_bound(params):
+                extrapolated = grid[grid >= max_size]
+                ax.plot(extrapolated, power_law(extrapolated, *params), '--', color=color, alpha=0.7)
+        target_r2 = estimates['Target_R2'].iloc[0]
+        ax.axhline(target_r2, color='grey', linestyle=':', linewidth=1)
+        ax.axvline(max_size, color='grey', linewidth=0.8, alpha=0.5)
+        ax.set_xscale('log')
+        ax.xaxis.set_major_formatter(matplotlib.ticker.ScalarFormatter())
+        ax.xaxis.set_minor_formatter(matplotlib.ticker.NullFormatter())
+        ax.set_ylim(max(-1.0, part['Test_R2'].quantile(0.02)), 1.0)
+        ax.set_xlabel('Training samples')
+        ax.set_ylabel('Test R²')
+        ax.set_title(f'{target} (dashed: fitted extrapolation, dotted: R² = {target_r2:g})', fontsize=10)
+        ax.grid(alpha=0.3)
+    axes[0, 0].legend(fontsize=8, loc='lower right')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def main():
+    """Write the learning curves, sample size estimates and figure"""
+    import time
+
+    from .export import TABLES_DIR
+
+    parser = argparse.ArgumentParser(description='Learning curves and sample-size estimates of the EMF models')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--sizes', type=int, default=DEFAULT_SIZES, help='Subsample sizes per split')
+    parser.add_argument('--target-r2', type=float, default=DEFAULT_TARGET_R2)
+    parser.add_argument('--bootstrap', type=int, default=DEFAULT_BOOTSTRAP)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--tables-dir', default=TABLES_DIR)
+    parser.add_argument('--plots-dir', default=os.path.join(BASE_DIR, 'outputs', 'plots'))
+    parser.add_argument('--curves', help='Re-estimate from a saved learning_curves.csv instead of retraining')
+    args = parser.parse_args()
+
+    if args.curves:
+        curves = pd.read_csv(args.curves)
+    else:
+        start = time.perf_counter()
+        curves = run_curves(version=args.version, repeats=args.repeats, n_sizes=args.sizes, n_jobs=args.n_jobs)
+        elapsed = time.perf_counter() - start
+        print(f"{len(curves):,} model fits in {elapsed:.1f} s")
+    estimates = estimate_sample_sizes(curves, args.target_r2, args.bootstrap)
+    print(estimates.round(3).to_string(index=False))
+
+    os.makedirs(args.tables_dir, exist_ok=True)
+    os.makedirs(args.plots_dir, exist_ok=True)
+    tables = [(ESTIMATES_TABLE, estimates)] if args.curves else [(CURVES_TABLE, curves), (ESTIMATES_TABLE, estimates)]
+    for name, table in tables:
+        path = os.path.join(args.tables_dir, name)
+        table.to_csv(path, index=False)
+        print(f"Saved: {path}")
+    print(f"Saved: {save_learning_curves_figure(curves, estimates, os.path.join(args.plots_dir, CURVES_FIGURE))}")
+
+
+if __name__ == '__main__':
+    main()
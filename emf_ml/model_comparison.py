@@ -0,0 +1,338 @@
+"""
+Model Comparison Module
+Repeated K-fold cross-validation with a shared fold cache and paired model tests
+
+The single 5-fold "CV R² (Mean±Std)" of the results tables cannot say
+whether one model family really beats another on 52 training samples.
+This module repeats K-fold cross-validation of the training split with
+the version's hyperparameters and compares the families on identical
+folds:
+
+    - the repeated splits are generated once, and each fold's engineered
+      matrices (raw for the tree models, RobustScaler + PCA for SVR and the
+      Neural Network) are computed once and cached under
+      outputs/cache/cv/, keyed by the data, features and split settings
+    - every (fold, model family) pair is one job on a joblib process pool
+      and fits the family for both targets on the cached matrices
+    - scores are compared with the corrected resampled t-test of Nadeau
+      and Bengio, whose variance term (1/J + n_test/n_train) s² accounts
+      for the overlap between training sets of different folds
+
+The module writes outputs/tables/repeated_cv_scores.csv (every fold),
+outputs/tables/repeated_cv_summary.csv (mean R² with corrected intervals)
+and outputs/tables/model_comparisons.csv (paired tests).
+
+Usage:
+    python -m emf_ml.model_comparison --splits 5 --repeats 10 --n-jobs -1
+"""
+
+import argparse
+import hashlib
+import os
+import warnings
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from .features import BASE_DIR, TARGETS, RANDOM_STATE, engineer_feature_array, load_measurements, train_test_indices
+from .learning_curves import FAMILIES, SCALED_FAMILIES, family_estimators
+from .registry import MODEL_NAMES, PCA_VARIANCE, ModelRegistry
+
+
+CACHE_DIR = os.path.join(BASE_DIR, 'outputs', 'cache', 'cv')
+
+DEFAULT_SPLITS = 5
+DEFAULT_REPEATS = 10
+CONFIDENCE = 0.95
+
+SCORES_TABLE = 'repeated_cv_scores.csv'
+SUMMARY_TABLE = 'repeated_cv_summary.csv'
+COMPARISONS_TABLE = 'model_comparisons.csv'
+
+
+class FoldCache:
+    """Repeated K-fold splits with the engineered and scaled matrices of every fold"""
+
+    def __init__(self, X, Y, n_splits=DEFAULT_SPLITS, n_repeats=DEFAULT_REPEATS, random_state=RANDOM_STATE):
+        """
+        Generate the splits and preprocess every fold
+
+        Args:
+            X: Engineered feature matrix of the rows to cross-validate
+            Y: Target matrix in TARGETS order
+            n_splits: Folds per repeat
+            n_repeats: Repeats of the K-fold split
+            random_state: Split seed
+        """
+        from sklearn.decomposition import PCA
+        from sklearn.model_selection import RepeatedKFold
+        from sklearn.preprocessing import RobustScaler
+
+        self.X = np.ascontiguousarray(X, dtype=np.float64)
+        self.Y = np.ascontiguousarray(Y, dtype=np.float64)
+        self.n_splits = n_splits
+        self.n_repeats = n_repeats
+        self.folds = []
+        splitter = RepeatedKFold(n_splits=n_splits, n_repeats=n_repeats, random_state=random_state)
+        for train_idx, test_idx in splitter.split(self.X):
+            scaler = RobustScaler().fit(self.X[train_idx])
+            pca = PCA(n_components=PCA_VARIANCE).fit(scaler.transform(self.X[train_idx]))
+            self.folds.append({
+                'train_idx': train_idx,
+                'test_idx': test_idx,
+                'scaled_train': pca.transform(scaler.transform(self.X[train_idx])),
+                'scaled_test': pca.transform(scaler.transform(self.X[test_idx])),
+            })
+
+    def __len__(self):
+        return len(self.folds)
+
+    def fold(self, index, scaled=False):
+        """
+        Matrices of one fold
+
+        Args:
+            index: Fold index
+            scaled: Return the RobustScaler + PCA matrices instead of the raw features
+
+        Returns:
+            tuple: (X_train, X_test, Y_train, Y_test)
+        """
+        f = self.folds[index]
+        if scaled:
+            X_train, X_test = f['scaled_train'], f['scaled_test']
+        else:
+            X_train, X_test = self.X[f['train_idx']], self.X[f['test_idx']]
+        return X_train, X_test, self.Y[f['train_idx']], self.Y[f['test_idx']]
+
+    @property
+    def test_fraction(self):
+        """n_test / n_train of the folds, used by the corrected t-test"""
+        n_test = np.mean([len(f['test_idx']) for f in self.folds])
+        return n_test / (len(self.X) - n_test)
+
+    @staticmethod
+    def key(X, Y, n_splits, n_repeats, random_state):
+        """Content key of a fold cache"""
+        digest = hashlib.sha256()
+        for array in (X, Y):
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            digest.update(str(array.shape).encode())
+            digest.update(array.tobytes())
+        digest.update(f'{n_splits}:{n_repeats}:{random_state}:{PCA_VARIANCE}'.encode())
+        return digest.hexdigest()[:16]
+
+
+def build_fold_cache(X, Y, n_splits=DEFAULT_SPLITS, n_repeats=DEFAULT_REPEATS, random_state=RANDOM_STATE,
+                     cache_dir=CACHE_DIR):
+    """
+    Load a fold cache from disk, or build and store it
+
+    Args:
+        X: Engineered feature matrix
+        Y: Target matrix in TARGETS order
+        n_splits: Folds per repeat
+        n_repeats: Repeats of the K-fold split
+        random_state: Split seed
+        cache_dir: Cache directory (None disables the disk cache)
+
+    Returns:
+        FoldCache
+    """
+    import joblib
+
+    path = None
+    if cache_dir:
+        path = os.path.join(cache_dir, f'folds_{FoldCache.key(X, Y, n_splits, n_repeats, random_state)}.joblib')
+        if os.path.exists(path):
+            return joblib.load(path)
+    cache = FoldCache(X, Y, n_splits, n_repeats, random_state)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        joblib.dump(cache, path)
+    return cache
+
+
+def _fit_fold(estimators, family, fold, matrices):
+    """
+    Fit one family on one fold for every target
+
+    Args:
+        estimators: Dict of target -> unfitted estimator of the family
+        family: Model family
+        fold: Fold index
+        matrices: Tuple from FoldCache.fold()
+
+    Returns:
+        list of (fold, family, target, R²) tuples
+    """
+    from sklearn.base import clone
+    from sklearn.metrics import r2_score
+
+    X_train, X_test, Y_train, Y_test = matrices
+    scores = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for i, target in enumerate(TARGETS):
+            model = clone(estimators[target]).fit(X_train, Y_train[:, i])
+            scores.append((fold, family, target, r2_score(Y_test[:, i], model.predict(X_test))))
+    return scores
+
+
+def run_repeated_cv(registry=None, version=None, n_splits=DEFAULT_SPLITS, n_repeats=DEFAULT_REPEATS, n_jobs=1,
+                    data=None, cache_dir=CACHE_DIR):
+    """
+    Repeated K-fold cross-validation of every family on the training split
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        n_splits: Folds per repeat
+        n_repeats: Repeats of the K-fold split
+        n_jobs: Worker processes (joblib; -1 for all cores)
+        data: Measurements (defaults to load_measurements())
+        cache_dir: Fold cache directory (None disables the disk cache)
+
+    Returns:
+        tuple: (scores DataFrame with Fold, Repeat, Model, Target, R2; the FoldCache)
+    """
+    from joblib import Parallel, delayed
+
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    data = load_measurements() if data is None else data
+    train_idx, _ = train_test_indices(len(data))
+    X = engineer_feature_array(data, registry.features(version))[train_idx]
+    Y = data[TARGETS].to_numpy(dtype=np.float64)[train_idx]
+
+    cache = build_fold_cache(X, Y, n_splits, n_repeats, cache_dir=cache_dir)
+    estimators = family_estimators(registry, version)
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_fold)({t: estimators[(family, t)] for t in TARGETS}, family, i, cache.fold(i, family in SCALED_FAMILIES))
+        for i in range(len(cache)) for family in FAMILIES
+    )
+    scores = pd.DataFrame([row for job in results for row in job], columns=['Fold', 'Family', 'Target', 'R2'])
+    scores.insert(1, 'Repeat', scores['Fold'] // n_splits)
+    scores.insert(2, 'Model', scores.pop('Family').map(MODEL_NAMES))
+    return scores.sort_values(['Target', 'Model', 'Fold'], ignore_index=True), cache
+
+
+def corrected_ttest(differences, test_fraction, confidence=CONFIDENCE):
+    """
+    Nadeau-Bengio corrected resampled t-test of per-fold scores or score differences
+
+    The variance of the mean is (1/J + n_test/n_train) s² instead of s²/J,
+    which corrects for the overlap of training sets across folds.
+
+    Args:
+        differences: Per-fold values (J folds)
+        test_fraction: n_test / n_train of the folds
+        confidence: Interval coverage
+
+    Returns:
+        dict with mean, std_error, t, p_value (two-sided, against zero), low and high
+    """
+    from scipy import stats
+
+    differences = np.asarray(differences, dtype=np.float64)
+    J = len(differences)
+    mean = differences.mean()
+    std_error = np.sqrt((1.0 / J + test_fraction) * differences.var(ddof=1))
+    if std_error == 0:
+        t = 0.0 if mean == 0 else np.copysign(np.inf, mean)
+    else:
+        t = mean / std_error
+    p_value = 2 * stats.t.sf(abs(t), J - 1)
+    margin = stats.t.ppf(0.5 + confidence / 2, J - 1) * std_error
+    return {'mean': mean, 'std_error': std_error, 't': t, 'p_value': p_value,
+            'low': mean - margin, 'high': mean + margin}
+
+
+def summarize_scores(scores, test_fraction, confidence=CONFIDENCE):
+    """
+    Mean cross-validated R² per model with corrected intervals
+
+    Args:
+        scores: DataFrame from run_repeated_cv()
+        test_fraction: n_test / n_train of the folds
+        confidence: Interval coverage
+
+    Returns:
+        DataFrame with Target, Model, Folds, CV_R2_Mean, CV_R2_Std, CV_R2_Low, CV_R2_High
+    """
+    records = []
+    for (target, model), part in scores.groupby(['Target', 'Model']):
+        result = corrected_ttest(part['R2'], test_fraction, confidence)
+        records.append({'Target': target, 'Model': model, 'Folds': len(part), 'CV_R2_Mean': result['mean'],
+                        'CV_R2_Std': part['R2'].std(ddof=1), 'CV_R2_Low': result['low'],
+                        'CV_R2_High': result['high']})
+    return pd.DataFrame(records).sort_values(['Target', 'CV_R2_Mean'], ascending=[True, False], ignore_index=True)
+
+
+def compare_models(scores, test_fraction, confidence=CONFIDENCE):
+    """
+    Paired corrected t-tests between every pair of models per target
+
+    Args:
+        scores: DataFrame from run_repeated_cv()
+        test_fraction: n_test / n_train of the folds
+        confidence: Interval coverage
+
+    Returns:
+        DataFrame with Target, Model_A, Model_B, the mean R² difference
+        (A - B) with its corrected interval, t and p-value; A is the model
+        with the higher mean score
+    """
+    records = []
+    for target, part in scores.groupby('Target'):
+        table = part.pivot(index='Fold', columns='Model', values='R2')
+        ranked = table.mean().sort_values(ascending=False).index
+        for a, b in combinations(ranked, 2):
+            result = corrected_ttest(table[a] - table[b], test_fraction, confidence)
+            records.append({'Target': target, 'Model_A': a, 'Model_B': b, 'R2_Difference': result['mean'],
+                            'Difference_Low': result['low'], 'Difference_High': result['high'],
+                            't': result['t'], 'p_value': result['p_value']})
+    return pd.DataFrame(records)
+
+
+def main():
+    """Write the repeated cross-validation scores, summary and paired comparisons"""
+    import time
+
+    from .export import TABLES_DIR
+
+    parser = argparse.ArgumentParser(description='Repeated cross-validation and paired comparison of the EMF models')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--splits', type=int, default=DEFAULT_SPLITS)
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--no-cache', action='store_true', help='Rebuild the fold matrices without the disk cache')
+    parser.add_argument('--tables-dir', default=TABLES_DIR)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Repeated Cross-Validation")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    scores, cache = run_repeated_cv(version=args.version, n_splits=args.splits, n_repeats=args.repeats,
+                                    n_jobs=args.n_jobs, cache_dir=None if args.no_cache else CACHE_DIR)
+    print(f"{len(cache)} folds, {len(scores):,} scores in {time.perf_counter() - start:.1f} s")
+
+    summary = summarize_scores(scores, cache.test_fraction)
+    comparisons = compare_models(scores, cache.test_fraction)
+    print("\n" + summary.round(3).to_string(index=False))
+    print("\n" + comparisons.round(3).to_string(index=False))
+
+    os.makedirs(args.tables_dir, exist_ok=True)
+    for name, table in [(SCORES_TABLE, scores), (SUMMARY_TABLE, summary), (COMPARISONS_TABLE, comparisons)]:
+        path = os.path.join(args.tables_dir, name)
+        table.to_csv(path, index=False)
+        print(f"Saved: {path}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,532 @@
+"""
+Monitor Module
+Streaming ICNIRP exceedance monitoring over live sensor feeds
+
+Readings arrive per site as dictionaries (JSON lines or CSV rows) with a
+'site' id, an optional 'timestamp' (epoch seconds or ISO 8601), the raw
+measurement conditions and, when the sensor measures them, E_ICNIRP and
+H_ICNIRP. The monitor collects readings in micro-batches, predicts both
+targets for the whole batch with the saved models and keeps a fixed-size
+window of measured and predicted values per site, stored as rows of shared
+2-D ring buffers, so memory per stream is bounded by the window length.
+
+For every batch it raises, per site, target and source (measured or
+predicted):
+
+- 'approaching' when a reading reaches warn_pct of the reference
+- 'exceedance' when a reading reaches limit_pct
+- 'trend' when the window slope after the batch projects limit_pct
+  within horizon_s
+
+Levels are evaluated on every reading of the batch in arrival order, so a
+spike that falls back within the same batch still alerts. Model
+prediction runs in an executor thread, off the event loop.
+
+Level alerts fire once on the way up and re-arm after the value falls
+hysteresis_pct below the level; trend alerts re-arm when the projection
+clears the limit.
+
+Usage:
+    python -m emf_ml.monitor --file readings.jsonl
+    python -m emf_ml.monitor --listen 127.0.0.1:8765
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .features import RAW_COLUMNS, TARGETS
+from .prediction import EMFPredictor
+
+
+INPUT_COLUMNS = RAW_COLUMNS[:7]
+SOURCES = ['measured', 'predicted']
+
+DEFAULT_WINDOW = 60
+DEFAULT_BATCH_SIZE = 2048
+DEFAULT_BATCH_INTERVAL = 0.05
+DEFAULT_QUEUE_SIZE = 100_000
+
+LEVELS = {1: 'approaching', 2: 'exceedance'}
+
+
+class StreamWindows:
+    """Fixed-length sliding windows for many streams in shared ring buffers"""
+
+    def __init__(self, window=DEFAULT_WINDOW, series=(), capacity=1024):
+        """
+        Initialize empty windows
+
+        Args:
+            window: Readings kept per stream
+            series: Names of the value series tracked per stream
+            capacity: Initial number of stream rows
+        """
+        self.window = window
+        self.series = list(series)
+        self.index = {}
+        self.sites = []
+        self.head = np.zeros(capacity, dtype=np.int64)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.times = np.full((capacity, window), np.nan)
+        self.values = {name: np.full((capacity, window), np.nan) for name in self.series}
+
+    def __len__(self):
+        return len(self.sites)
+
+    @property
+    def nbytes(self):
+        """Memory held by the buffers"""
+        arrays = [self.head, self.count, self.times, *self.values.values()]
+        return sum(a.nbytes for a in arrays)
+
+    def rows(self, sites):
+        """Return buffer rows of sites, registering new ones"""
+        rows = np.empty(len(sites), dtype=np.int64)
+        for i, site in enumerate(sites):
+            row = self.index.get(site)
+            if row is None:
+                row = self.index[site] = len(self.sites)
+                self.sites.append(site)
+            rows[i] = row
+        if len(self.sites) > len(self.head):
+            self._grow(len(self.sites))
+        return rows
+
+    def append(self, rows, times, values):
+        """
+        Append a batch of readings
+
+        Readings of the same stream are written in batch order; only the
+        last `window` readings per stream are kept.
+
+        Args:
+            rows: Stream row per reading
+            times: Timestamp per reading
+            values: Dict of series name -> value per reading
+
+        Returns:
+            ndarray of the stream rows that received readings
+        """
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        touched, first, counts = np.unique(sorted_rows, return_index=True, return_counts=True)
+        rank = np.arange(len(rows)) - np.repeat(first, counts)
+        keep = rank >= np.repeat(counts, counts) - self.window
+        order, sorted_rows, rank = order[keep], sorted_rows[keep], rank[keep]
+
+        slots = (self.head[sorted_rows] + rank) % self.window
+        self.times[sorted_rows, slots] = times[order]
+        for name, series in values.items():
+            self.values[name][sorted_rows, slots] = series[order]
+        self.head[touched] = (self.head[touched] + counts) % self.window
+        self.count[touched] = np.minimum(self.count[touched] + counts, self.window)
+        return touched
+
+    def latest(self, rows, name):
+        """Most recent value of a series per stream"""
+        return self.values[name][rows, (self.head[rows] - 1) % self.window]
+
+    def statistics(self, rows, name):
+        """
+        Window mean, maximum and least-squares slope per second
+
+        Args:
+            rows: Stream rows
+            name: Series name
+
+        Returns:
+            tuple of arrays: (mean, max, slope); NaN where undefined
+        """
+        v = self.values[name][rows]
+        t = self.times[rows]
+        valid = np.isfinite(v) & np.isfinite(t)
+        n = valid.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, v, 0.0).sum(axis=1) / n
+            peak = np.where(valid, v, -np.inf).max(axis=1)
+            peak[n == 0] = np.nan
+            # Center times per stream to keep the regression well conditioned
+            t_mean = np.where(valid, t, 0.0).sum(axis=1) / n
+            dt = np.where(valid, t - t_mean[:, None], 0.0)
+            dv = np.where(valid, v - mean[:, None], 0.0)
+            slope = (dt * dv).sum(axis=1) / (dt * dt).sum(axis=1)
+        slope[n < 2] = np.nan
+        return mean, peak, slope
+
+    def _grow(self, needed):
+        """Double the stream capacity until it holds `needed` rows"""
+        capacity = len(self.head)
+        while capacity < needed:
+            capacity *= 2
+        extra = capacity - len(self.head)
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.times = np.vstack([self.times, np.full((extra, self.window), np.nan)])
+        for name in self.series:
+            self.values[name] = np.vstack([self.values[name], np.full((extra, self.window), np.nan)])
+
+
+class ExceedanceMonitor:
+    """Micro-batched threshold and trend alerting for ICNIRP exposure streams"""
+
+    def __init__(self, predictor=None, window=DEFAULT_WINDOW, limit_pct=100.0, warn_pct=80.0,
+                 hysteresis_pct=5.0, horizon_s=3600.0, min_trend_points=5,
+                 batch_size=DEFAULT_BATCH_SIZE, batch_interval=DEFAULT_BATCH_INTERVAL, on_alert=None):
+        """
+        Initialize the monitor
+
+        Args:
+            predictor: EMFPredictor (defaults to the latest best models)
+            window: Readings kept per site
+            limit_pct: Exceedance level in % of the ICNIRP reference
+            warn_pct: Approaching level in % of the ICNIRP reference
+            hysteresis_pct: Drop below a level needed to re-arm its alert
+            horizon_s: Look-ahead of trend alerts in seconds
+            min_trend_points: Readings needed before trend alerts
+            batch_size: Maximum readings per micro-batch
+            batch_interval: Maximum wait in seconds to fill a micro-batch
+            on_alert: Callable receiving each alert dictionary
+        """
+        self.predictor = predictor or EMFPredictor()
+        self.limit_pct = limit_pct
+        self.warn_pct = warn_pct
+        self.hysteresis_pct = hysteresis_pct
+        self.horizon_s = horizon_s
+        self.min_trend_points = min_trend_points
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.on_alert = on_alert or (lambda alert: print(json.dumps(alert)))
+
+        self.keys = [(target, source) for target in TARGETS for source in SOURCES]
+        self.windows = StreamWindows(window, [_series(t, s) for t, s in self.keys])
+        self._levels = {key: np.zeros(0, dtype=np.int8) for key in self.keys}
+        self._trending = {key: np.zeros(0, dtype=bool) for key in self.keys}
+        self.readings = 0
+        self.batches = 0
+        self.alerts = 0
+
+    def process(self, readings):
+        """
+        Process one micro-batch of readings
+
+        Args:
+            readings: List of reading dictionaries
+
+        Returns:
+            list of alert dictionaries
+        """
+        if not readings:
+            return []
+        batch = pd.DataFrame.from_records(readings)
+        return self._process_frame(batch, self._predict(batch))
+
+    def _process_frame(self, batch, predicted):
+        """
+        Window and evaluate one micro-batch
+
+        Args:
+            batch: DataFrame of readings
+            predicted: Dict of target -> predicted values per reading
+
+        Returns:
+            list of alert dictionaries
+        """
+        n = len(batch)
+        times = _timestamps(batch)
+        rows = self.windows.rows(batch['site'].astype(str).tolist())
+        self._grow_state()
+
+        values = {}
+        for target, source in self.keys:
+            if source == 'predicted':
+                series = predicted[target]
+            elif target in batch:
+                series = pd.to_numeric(batch[target], errors='coerce').to_numpy(dtype=np.float64)
+            else:
+                series = np.full(n, np.nan)
+            values[_series(target, source)] = series
+        touched = self.windows.append(rows, times, values)
+
+        alerts = []
+        for key in self.keys:
+            alerts.extend(self._evaluate_levels(rows, times, values[_series(*key)], key))
+        for key in self.keys:
+            alerts.extend(self._evaluate_trends(touched, key))
+        self.readings += n
+        self.batches += 1
+        self.alerts += len(alerts)
+        for alert in alerts:
+            self.on_alert(alert)
+        return alerts
+
+    async def run(self, source, queue_size=DEFAULT_QUEUE_SIZE):
+        """
+        Consume readings from an async iterable until it is exhausted
+
+        Args:
+            source: Async iterable of reading dictionaries
+            queue_size: Readings buffered between source and processing
+        """
+        queue = asyncio.Queue(queue_size)
+        done = object()
+
+        async def produce():
+            async for reading in source:
+                await queue.put(reading)
+            await queue.put(done)
+
+        loop = asyncio.get_running_loop()
+        producer = asyncio.create_task(produce())
+        finished = False
+        while not finished:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.batch_interval
+            while len(batch) < self.batch_size and batch[-1] is not done:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            if batch[-1] is done:
+                batch.pop()
+                finished = True
+            if batch:
+                frame = pd.DataFrame.from_records(batch)
+                predicted = await loop.run_in_executor(None, self._predict, frame)
+                self._process_frame(frame, predicted)
+            # Let the producer refill the queue between batches
+            await asyncio.sleep(0)
+        await producer
+
+    def summary(self, site):
+        """
+        Window statistics of one site
+
+        Returns:
+            dict keyed by '<target>_<source>' with mean, max, slope_per_h and latest
+        """
+        row = np.array([self.windows.index[site]])
+        result = {}
+        for target, source in self.keys:
+            name = _series(target, source)
+            mean, peak, slope = self.windows.statistics(row, name)
+            result[name] = {
+                'mean': float(mean[0]),
+                'max': float(peak[0]),
+                'slope_per_h': float(slope[0] * 3600),
+                'latest': float(self.windows.latest(row, name)[0]),
+            }
+        return result
+
+    def _predict(self, batch):
+        """Predict both targets; NaN for rows without valid conditions"""
+        n = len(batch)
+        if not all(col in batch for col in INPUT_COLUMNS):
+            return {target: np.full(n, np.nan) for target in TARGETS}
+        result = self.predictor.predict(batch[INPUT_COLUMNS], validate=True)
+        return {target: result[target].to_numpy(dtype=np.float64) for target in TARGETS}
+
+    def _evaluate_levels(self, rows, times, series, key):
+        """
+        Level alerts of one series, evaluated on every reading in batch order
+
+        Readings are stepped by their position within their stream, so each
+        step updates every stream at most once and stays vectorized.
+
+        Args:
+            rows: Stream row per reading
+            times: Timestamp per reading
+            series: Value per reading
+            key: (target, source)
+
+        Returns:
+            list of alert dictionaries
+        """
+        target, source = key
+        order = np.argsort(rows, kind='stable')
+        _, first, counts = np.unique(rows[order], return_index=True, return_counts=True)
+        rank = np.empty(len(rows), dtype=np.int64)
+        rank[order] = np.arange(len(rows)) - np.repeat(first, counts)
+        by_rank = np.argsort(rank, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(rank))])
+
+        levels = self._levels[key]
+        alerts = []
+        for r in range(len(bounds) - 1):
+            readings = by_rank[bounds[r]:bounds[r + 1]]
+            streams, value = rows[readings], series[readings]
+            # Levels only drop once the value clears the level by the hysteresis
+            old = levels[streams]
+            up = np.where(value >= self.limit_pct, 2, np.where(value >= self.warn_pct, 1, 0))
+            hold = np.where(value >= self.limit_pct - self.hysteresis_pct, 2,
+                            np.where(value >= self.warn_pct - self.hysteresis_pct, 1, 0))
+            new = np.where(np.isfinite(value), np.maximum(up, np.minimum(old, hold)), old).astype(np.int8)
+            levels[streams] = new
+            for i in np.flatnonzero(new > old):
+                alerts.append(self._alert(streams[i], times[readings[i]], target, source,
+                                          LEVELS[int(new[i])], value[i]))
+        return alerts
+
+    def _evaluate_trends(self, rows, key):
+        """Trend alerts of one series for the touched streams"""
+        target, source = key
+        name = _series(target, source)
+        latest = self.windows.latest(rows, name)
+        _, _, slope = self.windows.statistics(rows, name)
+        finite = np.isfinite(latest)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            eta = (self.limit_pct - latest) / slope
+        trending = (finite & (slope > 0) & (latest < self.limit_pct) & (eta <= self.horizon_s)
+                    & (self.windows.count[rows] >= self.min_trend_points))
+        started = np.flatnonzero(trending & ~self._trending[key][rows])
+        self._trending[key][rows] = trending
+
+        times = self.windows.times[rows, (self.windows.head[rows] - 1) % self.windows.window]
+        alerts = []
+        for i in started:
+            alert = self._alert(rows[i], times[i], target, source, 'trend', latest[i])
+            alert['eta_s'] = float(eta[i])
+            alert['slope_per_h'] = float(slope[i] * 3600)
+            alerts.append(alert)
+        return alerts
+
+    def _alert(self, row, timestamp, target, source, kind, value):
+        """Build an alert dictionary"""
+        return {
+            'site': self.windows.sites[row],
+            'timestamp': float(timestamp),
+            'target': target,
+            'source': source,
+            'kind': kind,
+            'value': float(value),
+        }
+
+    def _grow_state(self):
+        """Extend per-stream alert state to the window capacity"""
+        capacity = len(self.windows.head)
+        for key in self.keys:
+            extra = capacity - len(self._levels[key])
+            if extra:
+                self._levels[key] = np.concatenate([self._levels[key], np.zeros(extra, dtype=np.int8)])
+                self._trending[key] = np.concatenate([self._trending[key], np.zeros(extra, dtype=bool)])
+
+
+async def file_source(path, follow=False, poll_interval=0.5):
+    """
+    Read readings from a JSON-lines or CSV file
+
+    Args:
+        path: File path; .csv files need a header row
+        follow: Keep waiting for appended lines (like tail -f)
+        poll_interval: Seconds between checks for new lines when following
+
+    Yields:
+        dict: One reading per line
+    """
+    is_csv = os.path.splitext(path)[1].lower() == '.csv'
+    with open(path, newline='') as f:
+        header = next(csv.reader([f.readline()])) if is_csv else None
+        while True:
+            line = f.readline()
+            if not line:
+                if not follow:
+                    return
+                await asyncio.sleep(poll_interval)
+                continue
+            if not line.strip():
+                continue
+            yield dict(zip(header, next(csv.reader([line])))) if is_csv else json.loads(line)
+
+
+async def socket_source(host='127.0.0.1', port=8765, ready=None):
+    """
+    Accept newline-delimited JSON readings from TCP clients
+
+    Args:
+        host: Interface to listen on
+        port: TCP port
+        ready: Optional asyncio.Event set once the server is listening
+
+    Yields:
+        dict: One reading per line, from all connected clients
+    """
+    queue = asyncio.Queue(DEFAULT_QUEUE_SIZE)
+
+    async def handle(reader, writer):
+        try:
+            async for line in reader:
+                if line.strip():
+                    await queue.put(json.loads(line))
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    if ready is not None:
+        ready.set()
+    async with server:
+        while True:
+            yield await queue.get()
+
+
+def _series(target, source):
+    """Name of a window series"""
+    return f'{target}_{source}'
+
+
+def _timestamps(batch):
+    """Reading timestamps in epoch seconds (arrival time when missing)"""
+    now = time.time()
+    if 'timestamp' not in batch:
+        return np.full(len(batch), now)
+    raw = batch['timestamp']
+    numeric = pd.to_numeric(raw, errors='coerce')
+    parsed = pd.to_datetime(raw[numeric.isna()], errors='coerce', utc=True)
+    seconds = numeric.to_numpy(dtype=np.float64)
+    if len(parsed):
+        seconds[numeric.isna().to_numpy()] = (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+    return np.where(np.isfinite(seconds), seconds, now)
+
+
+def main():
+    """Run the monitor on a file or socket feed"""
+    parser = argparse.ArgumentParser(description='ICNIRP exceedance monitor')
+    feed = parser.add_mutually_exclusive_group(required=True)
+    feed.add_argument('--file', help='JSON-lines or CSV readings file')
+    feed.add_argument('--listen', help='host:port for newline-delimited JSON over TCP')
+    parser.add_argument('--follow', action='store_true', help='Keep reading appended lines')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW)
+    parser.add_argument('--limit', type=float, default=100.0, help='Exceedance level in %% of ICNIRP')
+    parser.add_argument('--warn', type=float, default=80.0, help='Approaching level in %% of ICNIRP')
+    args = parser.parse_args()
+
+    monitor = ExceedanceMonitor(EMFPredictor(version=args.version), window=args.window,
+                                limit_pct=args.limit, warn_pct=args.warn)
+    if args.file:
+        source = file_source(args.file, follow=args.follow)
+    else:
+        host, port = args.listen.rsplit(':', 1)
+        source = socket_source(host, int(port))
+    try:
+        asyncio.run(monitor.run(source))
+    except KeyboardInterrupt:
+        pass
+    print(f"Processed {monitor.readings:,} readings from {len(monitor.windows):,} sites "
+          f"in {monitor.batches:,} batches, {monitor.alerts:,} alerts")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Multi Target Module
+Joint models that predict E_ICNIRP and H_ICNIRP in one pass
+
+The separate best_model_E_ICNIRP / best_model_H_ICNIRP artifacts each run
+a full tree ensemble over the same features. A joint model shares one set
+of trees between both targets: XGBoost multi-output trees (one vector leaf
+per tree) or a multi-output Random Forest. Targets are standardized on the
+training split before fitting so that neither dominates the split
+criterion, and predictions are mapped back to % of the ICNIRP reference.
+
+Joint models are saved as joint_model_<version>.joblib next to the
+version's other artifacts and used through EMFPredictor(model='joint').
+
+Usage:
+    python -m emf_ml.multi_target --version 20251210_101547 --kind xgb
+"""
+
+import argparse
+
+import joblib
+import numpy as np
+
+from .features import TARGETS, engineer_feature_array, load_measurements, train_test_indices
+from .registry import ModelRegistry
+
+
+JOINT_KINDS = ['xgb', 'rf']
+
+# Parameters of the single-target models that do not carry over to a joint fit
+EXCLUDED_PARAMS = ['early_stopping_rounds', 'eval_metric', 'oob_score', 'n_jobs', 'multi_strategy', 'tree_method']
+
+
+class JointTargetModel:
+    """Shared-tree model for several targets with per-target standardization"""
+
+    # Trained on the raw engineered features (see registry.is_tree_model)
+    raw_features = True
+
+    def __init__(self, estimator, targets=TARGETS):
+        """
+        Initialize the model
+
+        Args:
+            estimator: Unfitted multi-output regressor on the raw features
+            targets: Target names, in output column order
+        """
+        self.estimator = estimator
+        self.targets = list(targets)
+        self.mean_ = None
+        self.scale_ = None
+
+    @property
+    def n_features_in_(self):
+        """Number of input features"""
+        return self.estimator.n_features_in_
+
+    def fit(self, X, Y):
+        """
+        Fit on raw features and a (n_rows, n_targets) target matrix
+
+        Returns:
+            self
+        """
+        Y = np.asarray(Y, dtype=np.float64)
+        self.mean_ = Y.mean(axis=0)
+        self.scale_ = Y.std(axis=0)
+        self.scale_[self.scale_ == 0] = 1.0
+        self.estimator.fit(X, (Y - self.mean_) / self.scale_)
+        return self
+
+    def predict(self, X):
+        """
+        Predict all targets
+
+        Returns:
+            ndarray of shape (n_rows, n_targets)
+        """
+        scaled = np.asarray(self.estimator.predict(X), dtype=np.float64).reshape(len(X), len(self.targets))
+        return scaled * self.scale_ + self.mean_
+
+    def predict_targets(self, X):
+        """
+        Predict all targets
+
+        Returns:
+            dict of target -> ndarray
+        """
+        Y = self.predict(X)
+        return {target: Y[:, i] for i, target in enumerate(self.targets)}
+
+
+def joint_estimator(kind, registry, version=None):
+    """
+    Build an unfitted joint estimator from the version's single-target hyperparameters
+
+    The E_ICNIRP model's settings are reused: it is the harder target and,
+    unlike the H_ICNIRP booster, was not cut short by early stopping.
+
+    Args:
+        kind: 'xgb' or 'rf'
+        registry: ModelRegistry
+        version: Artifact version
+
+    Returns:
+        Unfitted regressor
+    """
+    if kind not in JOINT_KINDS:
+        raise ValueError(f'kind must be one of {JOINT_KINDS}')
+    template = registry.load_model(f'{kind}_e', version)
+    params = {k: v for k, v in template.get_params().items() if k not in EXCLUDED_PARAMS}
+    if kind == 'xgb':
+        from xgboost import XGBRegressor
+
+        return XGBRegressor(**params, tree_method='hist', multi_strategy='multi_output_tree')
+    from sklearn.ensemble import RandomForestRegressor
+
+    return RandomForestRegressor(**params)
+
+
+def train_joint_model(registry=None, version=None, kind='xgb', targets=TARGETS, save=True):
+    """
+    Train a joint model on the training split of a version
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        kind: 'xgb' for multi-output trees or 'rf' for a multi-output forest
+        targets: Targets predicted jointly
+        save: Write joint_model_<version>.joblib next to the model artifacts
+
+    Returns:
+        JointTargetModel
+    """
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    df = load_measurements()
+    train_idx, _ = train_test_indices(len(df))
+    train = df.iloc[train_idx]
+    X = engineer_feature_array(train, registry.features(version))
+
+    model = JointTargetModel(joint_estimator(kind, registry, version), targets)
+    model.fit(X, train[list(targets)].to_numpy(dtype=np.float64))
+    if save:
+        joblib.dump(model, registry.path('joint_model', version))
+    return model
+
+
+def main():
+    """Train and save a joint model"""
+    from sklearn.metrics import r2_score
+
+    parser = argparse.ArgumentParser(description='Train a joint E_ICNIRP/H_ICNIRP model')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--kind', choices=JOINT_KINDS, default='xgb')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    model = train_joint_model(registry, args.version, args.kind)
+    df = load_measurements()
+    _, test_idx = train_test_indices(len(df))
+    test = df.iloc[test_idx]
+    predictions = model.predict_targets(engineer_feature_array(test, registry.features(args.version)))
+    for target in model.targets:
+        print(f"{target}: test R2 {r2_score(test[target], predictions[target]):.4f}")
+    print(f"Saved: {registry.path('joint_model', args.version)}")
+
+
+if __name__ == '__main__':
+    # Run through the package module so saved models pickle as emf_ml.multi_target.JointTargetModel
+    from emf_ml.multi_target import main as package_main
+
+    package_main()
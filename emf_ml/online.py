@@ -0,0 +1,361 @@
+"""
+Online Update Module
+Incremental model updates from new measurement batches without full retraining
+
+A full retrain repeats the hyperparameter search and cross-validation for
+every model. An update instead starts from an existing version and
+absorbs a new batch of readings:
+
+- XGBoost: boosting continues from the saved booster (cut at its best
+  iteration when early stopping was used) for a fixed number of rounds
+- Random Forest: new trees are grown on the batch and added to the forest
+- Stacked ensembles: their Random Forest / XGBoost members are extended
+  the same way, and the RidgeCV meta-learner is refit on out-of-fold
+  predictions of the updated members over the batch
+- SVR and MLP models are carried over unchanged
+
+The scaler and PCA of the parent version are kept, so every input
+transformation stays identical. The result is saved as a new registry
+version with the before/after metrics on a held-out set (a slice of the
+batch plus the original test split) recorded in its model_config.
+
+Usage:
+    python -m emf_ml.online --batch data/new_campaign.csv
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .features import TARGETS, engineer_feature_array, load_measurements, train_test_indices
+from .registry import MODEL_NAMES, TARGET_SUFFIXES, ModelRegistry
+
+
+DEFAULT_ROUNDS = 50
+DEFAULT_TREES = 50
+DEFAULT_FOLDS = 5
+DEFAULT_HOLDOUT = 0.2
+
+# Fewer update rows than this keep the parent meta-learner
+MIN_META_ROWS = 20
+
+# Artifacts written for a new version; text reports are not regenerated
+UPDATED_KINDS = ['all_models', 'best_model', 'stacked_ensemble']
+
+
+def is_booster(model):
+    """Return True for XGBoost sklearn models"""
+    return hasattr(model, 'get_booster')
+
+
+def is_forest(model):
+    """Return True for sklearn Random Forests"""
+    estimators = getattr(model, 'estimators_', None)
+    return estimators is not None and len(estimators) > 0 and hasattr(estimators[0], 'tree_')
+
+
+def is_stack(model):
+    """Return True for sklearn stacking ensembles"""
+    return hasattr(model, 'final_estimator_')
+
+
+def extend_booster(model, X, y, rounds=DEFAULT_ROUNDS):
+    """
+    Continue boosting an XGBoost model on new rows
+
+    Args:
+        model: Fitted XGBRegressor
+        X: New feature rows in the model's input space
+        y: New targets
+        rounds: Boosting rounds to add
+
+    Returns:
+        New XGBRegressor with the parent's trees plus `rounds` new ones
+    """
+    from xgboost import XGBRegressor
+
+    booster = model.get_booster()
+    try:
+        booster = booster[:model.best_iteration + 1]
+    except AttributeError:
+        pass
+    params = model.get_params()
+    params.update(n_estimators=rounds, early_stopping_rounds=None)
+    updated = XGBRegressor(**params)
+    updated.fit(X, y, xgb_model=booster)
+    return updated
+
+
+def extend_forest(model, X, y, trees=DEFAULT_TREES):
+    """
+    Grow additional Random Forest trees on new rows
+
+    Args:
+        model: Fitted RandomForestRegressor
+        X: New feature rows
+        y: New targets
+        trees: Trees to add
+
+    Returns:
+        Copy of the forest with `trees` more estimators
+    """
+    updated = copy.deepcopy(model)
+    # OOB scores of the existing trees refer to the parent's training rows
+    updated.set_params(warm_start=True, n_estimators=len(model.estimators_) + trees, oob_score=False)
+    for name in ['oob_score_', 'oob_prediction_']:
+        if hasattr(updated, name):
+            delattr(updated, name)
+    updated.fit(X, y)
+    updated.set_params(warm_start=False)
+    return updated
+
+
+def extend_model(model, X, y, rounds=DEFAULT_ROUNDS, trees=DEFAULT_TREES):
+    """Extend a tree model, returning other models unchanged"""
+    if is_booster(model):
+        return extend_booster(model, X, y, rounds)
+    if is_forest(model):
+        return extend_forest(model, X, y, trees)
+    return model
+
+
+def check_input_space(model, Z, X):
+    """
+    Refuse to extend a standalone tree model on transformed inputs
+
+    Random Forest and XGBoost models were trained on the raw engineered
+    features. Growing trees on scaled or PCA inputs would leave a model
+    whose old and new trees expect different input spaces.
+
+    Args:
+        model: Parent model about to be extended
+        Z: Rows prepared for the model (registry.prepare_input)
+        X: Raw engineered feature rows
+    """
+    if (is_booster(model) or is_forest(model)) and not np.array_equal(Z, X):
+        raise ValueError(f'{type(model).__name__} was trained on raw features but would be extended on '
+                         f'transformed inputs; check registry.is_tree_model')
+
+
+def update_stack(stack, X, y, rounds=DEFAULT_ROUNDS, trees=DEFAULT_TREES, folds=DEFAULT_FOLDS,
+                 random_state=42):
+    """
+    Update a stacking ensemble on new rows
+
+    The tree members are extended on all rows. The meta-learner is refit
+    on out-of-fold member predictions: for each fold the members are
+    extended on the other folds only and predict the held-out fold.
+
+    Args:
+        stack: Fitted StackingRegressor
+        X: New rows in the stack's input space
+        y: New targets
+        rounds: Boosting rounds added to XGBoost members
+        trees: Trees added to Random Forest members
+        folds: Folds of the out-of-fold predictions
+        random_state: Fold shuffling seed
+
+    Returns:
+        Updated copy of the stack
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import KFold
+
+    updated = copy.deepcopy(stack)
+    updated.estimators_ = [extend_model(m, X, y, rounds, trees) for m in stack.estimators_]
+    updated.named_estimators_ = type(stack.named_estimators_)(
+        **{name: m for (name, _), m in zip(stack.estimators, updated.estimators_)}
+    )
+    if len(y) < MIN_META_ROWS:
+        return updated
+
+    meta_X = np.empty((len(y), len(stack.estimators_)))
+    for fit_idx, pred_idx in KFold(min(folds, len(y)), shuffle=True, random_state=random_state).split(X):
+        for j, member in enumerate(stack.estimators_):
+            member = extend_model(member, X[fit_idx], y[fit_idx], rounds, trees)
+            meta_X[pred_idx, j] = member.predict(X[pred_idx])
+    updated.final_estimator_ = clone(stack.final_estimator).fit(meta_X, y)
+    return updated
+
+
+def holdout_metrics(predictions, y):
+    """R2, RMSE and MAE of predictions on held-out rows"""
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    return {
+        'r2': float(r2_score(y, predictions)),
+        'rmse': float(np.sqrt(mean_squared_error(y, predictions))),
+        'mae': float(mean_absolute_error(y, predictions)),
+    }
+
+
+def split_batch(batch, holdout=DEFAULT_HOLDOUT, random_state=42):
+    """
+    Split a batch into update rows and held-out rows
+
+    Returns:
+        tuple: (update DataFrame, held-out DataFrame)
+    """
+    if not holdout:
+        return batch, batch.iloc[:0]
+    rng = np.random.default_rng(random_state)
+    order = rng.permutation(len(batch))
+    n_holdout = int(round(holdout * len(batch)))
+    return batch.iloc[np.sort(order[n_holdout:])], batch.iloc[np.sort(order[:n_holdout])]
+
+
+def new_version(registry, parent):
+    """Return a fresh version stamp that sorts after the parent and all existing versions"""
+    stamp = datetime.now()
+    existing = set(registry.versions())
+    while stamp.strftime('%Y%m%d_%H%M%S') in existing or stamp.strftime('%Y%m%d_%H%M%S') <= parent:
+        stamp += timedelta(seconds=1)
+    return stamp.strftime('%Y%m%d_%H%M%S')
+
+
+def update_version(batch, registry=None, version=None, rounds=DEFAULT_ROUNDS, trees=DEFAULT_TREES,
+                   folds=DEFAULT_FOLDS, holdout=DEFAULT_HOLDOUT, save=True):
+    """
+    Create a new model version by updating a parent version with a batch
+
+    Args:
+        batch: DataFrame of raw measurements including the target columns
+        registry: ModelRegistry
+        version: Parent version (defaults to the latest)
+        rounds: Boosting rounds added to XGBoost models
+        trees: Trees added to Random Forest models
+        folds: Folds for the out-of-fold meta-learner refit
+        holdout: Fraction of the batch held out for the before/after metrics;
+            the original test split is always held out as well
+        save: Write the new version's artifacts to the models directory
+
+    Returns:
+        dict: version, parent, rows, seconds and metrics
+            (metrics[target][model] = {'before': {...}, 'after': {...}})
+    """
+    registry = registry or ModelRegistry()
+    parent = version or registry.latest_version()
+    features = registry.features(parent)
+    start = time.perf_counter()
+
+    update_rows, batch_holdout = split_batch(batch, holdout)
+    df = load_measurements()
+    _, test_idx = train_test_indices(len(df))
+    held_out = pd.concat([df.iloc[test_idx], batch_holdout], ignore_index=True)
+    X_update = engineer_feature_array(update_rows, features)
+    X_held = engineer_feature_array(held_out, features)
+
+    parents = {'all_models': registry.load_all_models(parent)}
+    for kind in UPDATED_KINDS[1:]:
+        for target in TARGETS:
+            if os.path.exists(registry.path(kind, parent, target)):
+                parents[(kind, target)] = registry.load(kind, parent, target)
+
+    updated = {'all_models': {}}
+    for key, model in parents['all_models'].items():
+        target = next(t for t, s in TARGET_SUFFIXES.items() if key.endswith(f'_{s}'))
+        y = update_rows[target].to_numpy(dtype=np.float64)
+        Z = registry.prepare_input(model, X_update, parent)
+        check_input_space(model, Z, X_update)
+        updated['all_models'][key] = extend_model(model, Z, y, rounds, trees)
+    for (kind, target), model in [(k, m) for k, m in parents.items() if k != 'all_models']:
+        Z = registry.prepare_input(model, X_update, parent)
+        y = update_rows[target].to_numpy(dtype=np.float64)
+        if is_stack(model):
+            # Stack members were trained in the stack's own (scaled and reduced) input space
+            updated[(kind, target)] = update_stack(model, Z, y, rounds, trees, folds)
+        else:
+            check_input_space(model, Z, X_update)
+            updated[(kind, target)] = extend_model(model, Z, y, rounds, trees)
+    seconds = time.perf_counter() - start
+
+    metrics = {target: {} for target in TARGETS}
+    for key, model in parents['all_models'].items():
+        target = next(t for t, s in TARGET_SUFFIXES.items() if key.endswith(f'_{s}'))
+        name = MODEL_NAMES[key.rsplit('_', 1)[0]]
+        metrics[target][name] = _before_after(registry, parent, model, updated['all_models'][key],
+                                              X_held, held_out[target])
+    for (kind, target), model in [(k, m) for k, m in parents.items() if k != 'all_models']:
+        metrics[target][kind] = _before_after(registry, parent, model, updated[(kind, target)],
+                                              X_held, held_out[target])
+
+    report = {
+        'version': new_version(registry, parent),
+        'parent_version': parent,
+        'update_rows': len(update_rows),
+        'holdout_rows': len(held_out),
+        'rounds': rounds,
+        'trees': trees,
+        'seconds': seconds,
+        'metrics': metrics,
+    }
+    if save:
+        save_version(registry, parent, report, updated)
+    return report
+
+
+def _before_after(registry, version, before, after, X, y):
+    """Held-out metrics of a parent model and its update"""
+    return {
+        'before': holdout_metrics(registry.predict(before, X, version), y),
+        'after': holdout_metrics(registry.predict(after, X, version), y),
+    }
+
+
+def save_version(registry, parent, report, updated):
+    """
+    Write the artifacts of an updated version
+
+    The parent's scaler is copied and its PCA saved, so the new version
+    prepares inputs exactly as the parent did.
+    """
+    version = report['version']
+    shutil.copyfile(registry.path('scaler', parent), registry.path('scaler', version))
+    joblib.dump(registry.load_pca(parent), registry.path('pca', version))
+    joblib.dump(updated['all_models'], registry.path('all_models', version))
+    for (kind, target), model in [(k, m) for k, m in updated.items() if k != 'all_models']:
+        joblib.dump(model, registry.path(kind, version, target))
+
+    config = dict(registry.load_config(parent))
+    config.update(
+        version=version,
+        created_date=datetime.now().isoformat(),
+        parent_version=parent,
+        update={k: v for k, v in report.items() if k not in ('version', 'parent_version')},
+    )
+    # model_config is written last: registry.versions() lists a version once it exists
+    joblib.dump(config, registry.path('model_config', version))
+
+
+def main():
+    """Update the latest models with a new measurement batch"""
+    parser = argparse.ArgumentParser(description='Incrementally update models with a new measurement batch')
+    parser.add_argument('--batch', required=True, help='CSV of new measurements including the targets')
+    parser.add_argument('--version', help='Parent model version (defaults to latest)')
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help='Boosting rounds to add')
+    parser.add_argument('--trees', type=int, default=DEFAULT_TREES, help='Random Forest trees to add')
+    parser.add_argument('--holdout', type=float, default=DEFAULT_HOLDOUT, help='Held-out fraction of the batch')
+    args = parser.parse_args()
+
+    batch = pd.read_csv(args.batch)
+    report = update_version(batch, version=args.version, rounds=args.rounds, trees=args.trees,
+                            holdout=args.holdout)
+    print(f"Updated {report['parent_version']} -> {report['version']} "
+          f"with {report['update_rows']} rows in {report['seconds']:.2f} s")
+    print(f"Held-out rows: {report['holdout_rows']}")
+    for target, models in report['metrics'].items():
+        print(f"\n{target}")
+        for name, m in models.items():
+            print(f"  {name:<18} R2 {m['before']['r2']:8.4f} -> {m['after']['r2']:8.4f}   "
+                  f"RMSE {m['before']['rmse']:7.3f} -> {m['after']['rmse']:7.3f}")
+
+
+if __name__ == '__main__':
+    main()
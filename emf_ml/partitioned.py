@@ -0,0 +1,328 @@
+"""
+Partitioned Module
+Per-site models keyed by City (optionally City and Circuit) with routed inference
+
+City has a large effect on H_ICNIRP (eta² = 0.180) and is perfectly
+associated with Circuit, so one global model has to learn both sites at
+once. A partitioned model trains a separate tree model of one family per
+partition key on that partition's rows of the training split. Partitions
+train in parallel on a joblib process pool, and partitions with too few
+rows are left to the global model.
+
+Partition sub-models are saved as their own artifacts,
+partition_<key>_<target>_<version>.joblib (e.g. partition_City-1_H_ICNIRP_...),
+next to a router partitioned_model_<target>_<version>.joblib that maps
+keys to those artifacts. The router names the version's global model of
+the same family (from all_models) as the fallback for unseen keys, and
+ModelRegistry.load resolves the sub-models and the fallback when the
+router is loaded.
+
+The model input is the engineered feature matrix with the key columns
+appended (partition_matrix). Prediction groups the rows of a batch by key
+and scores every partition, and all fallback rows, in one vectorized call
+each. Use it through EMFPredictor(model='partitioned').
+
+Usage:
+    python -m emf_ml.partitioned --version 20251210_101547 --kind xgb --by city --n-jobs -1
+"""
+
+import argparse
+import os
+import warnings
+
+import joblib
+import numpy as np
+
+from .features import TARGETS, engineer_feature_array, load_measurements, train_test_indices
+from .learning_curves import family_estimators
+from .registry import TARGET_SUFFIXES, ModelRegistry
+
+
+PARTITION_KINDS = ['xgb', 'rf']
+
+# Key columns of each partitioning scheme
+PARTITION_KEYS = {
+    'city': ['City'],
+    'circuit': ['City', 'Circuit'],
+}
+
+# Partitions with fewer training rows are routed to the global model
+MIN_PARTITION_ROWS = 10
+
+
+def partition_matrix(data, features, key_columns):
+    """
+    Engineered features with the partition key columns appended
+
+    Args:
+        data: DataFrame (or mapping of arrays) with the raw measurement columns
+        features: Engineered feature names
+        key_columns: Raw columns that form the partition key
+
+    Returns:
+        ndarray of shape (n_rows, len(features) + len(key_columns))
+    """
+    X = engineer_feature_array(data, features)
+    keys = np.column_stack([np.asarray(data[c], dtype=np.float64) for c in key_columns])
+    return np.hstack([X, keys])
+
+
+def partition_name(key_columns, key):
+    """Artifact kind of one partition, e.g. 'partition_City-0_Circuit-1'"""
+    parts = [f'{c}-{int(v) if float(v).is_integer() else v}' for c, v in zip(key_columns, key)]
+    return 'partition_' + '_'.join(parts)
+
+
+class PartitionedModel:
+    """Routes rows to per-partition models by key, with a global fallback"""
+
+    # Scores raw features plus key columns (see registry.is_tree_model)
+    raw_features = True
+
+    def __init__(self, estimator, key_columns, n_features, fallback=None, fallback_key=None):
+        """
+        Initialize the model
+
+        Args:
+            estimator: Unfitted tree estimator cloned for every partition
+            key_columns: Raw columns that form the partition key
+            n_features: Number of engineered features in front of the key columns
+            fallback: Fitted global model for keys without a partition model
+            fallback_key: all_models key of the fallback (e.g. 'xgb_h'), used
+                to reattach it when the router is loaded from the registry
+        """
+        self.estimator = estimator
+        self.key_columns = list(key_columns)
+        self.n_features = n_features
+        self.fallback = fallback
+        self.fallback_key = fallback_key
+        self.partitions = {}
+        self.partition_rows = {}
+
+    @property
+    def n_features_in_(self):
+        """Number of input columns (features plus key columns)"""
+        return self.n_features + len(self.key_columns)
+
+    def split(self, X):
+        """Split an input matrix into features and keys"""
+        X = np.asarray(X, dtype=np.float64)
+        return X[:, :self.n_features], X[:, self.n_features:]
+
+    def fit(self, X, y, n_jobs=1, min_rows=MIN_PARTITION_ROWS):
+        """
+        Fit one model per partition key in parallel
+
+        Args:
+            X: Matrix from partition_matrix()
+            y: Target values
+            n_jobs: Worker processes (joblib; -1 for all cores)
+            min_rows: Smallest partition that gets its own model
+
+        Returns:
+            self
+        """
+        from joblib import Parallel, delayed
+
+        features, keys = self.split(X)
+        y = np.asarray(y, dtype=np.float64)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        groups = [(tuple(float(v) for v in key), np.flatnonzero(inverse == i)) for i, key in enumerate(unique)]
+        groups = [(key, rows) for key, rows in groups if len(rows) >= min_rows]
+        fitted = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_partition)(self.estimator, features[rows], y[rows]) for _, rows in groups
+        )
+        self.partitions = {key: model for (key, _), model in zip(groups, fitted)}
+        self.partition_rows = {key: len(rows) for key, rows in groups}
+        return self
+
+    def predict(self, X):
+        """
+        Predict with the model of each row's partition
+
+        Rows are grouped by key so that every partition model, and the
+        fallback for unseen keys, predicts its rows in one call.
+
+        Args:
+            X: Matrix from partition_matrix()
+
+        Returns:
+            ndarray of predictions in row order
+        """
+        features, keys = self.split(X)
+        predictions = np.empty(len(features), dtype=np.float64)
+        if len(features) == 0:
+            return predictions
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(unique)))])
+        unrouted = []
+        for i, key in enumerate(unique):
+            rows = order[bounds[i]:bounds[i + 1]]
+            model = self.partitions.get(tuple(float(v) for v in key))
+            if model is None:
+                unrouted.append(rows)
+            else:
+                predictions[rows] = model.predict(features[rows])
+        if unrouted:
+            if self.fallback is None:
+                raise ValueError(f'No partition model or fallback for keys outside {sorted(self.partitions)}')
+            rows = np.concatenate(unrouted)
+            predictions[rows] = self.fallback.predict(features[rows])
+        return predictions
+
+    def __getstate__(self):
+        """Pickle the router only when partition artifacts are recorded"""
+        state = self.__dict__.copy()
+        if state.get('partition_artifacts'):
+            state['partitions'] = {}
+            if state.get('fallback_key'):
+                state['fallback'] = None
+        return state
+
+    def resolve_artifacts(self, registry, version):
+        """
+        Load the partition models and the fallback of a saved router
+
+        Args:
+            registry: ModelRegistry holding the artifacts
+            version: Artifact version
+        """
+        target = getattr(self, 'target', None)
+        for key, kind in getattr(self, 'partition_artifacts', {}).items():
+            self.partitions[key] = registry.load(kind, version, target)
+        if self.fallback is None and self.fallback_key:
+            self.fallback = registry.load_model(self.fallback_key, version)
+
+    def save(self, registry, target, version):
+        """
+        Save the partition models and the router as registry artifacts
+
+        Args:
+            registry: ModelRegistry
+            target: Target name
+            version: Artifact version
+
+        Returns:
+            list of written paths
+        """
+        self.target = target
+        self.partition_artifacts = {key: partition_name(self.key_columns, key) for key in self.partitions}
+        paths = []
+        for key, kind in self.partition_artifacts.items():
+            paths.append(registry.path(kind, version, target))
+            joblib.dump(self.partitions[key], paths[-1])
+        paths.append(registry.path('partitioned_model', version, target))
+        joblib.dump(self, paths[-1])
+        return paths
+
+
+def _fit_partition(estimator, X, y):
+    """Fit a clone of the estimator on one partition"""
+    from sklearn.base import clone
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return clone(estimator).fit(X, y)
+
+
+def train_partitioned_models(registry=None, version=None, kind='xgb', by='city', targets=TARGETS, n_jobs=1,
+                             min_rows=MIN_PARTITION_ROWS, save=True):
+    """
+    Train partitioned models on the training split of a version
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        kind: Tree family, 'xgb' or 'rf', with the version's hyperparameters
+        by: Partitioning scheme, 'city' or 'circuit' (City and Circuit)
+        targets: Targets to train
+        n_jobs: Worker processes for the partition fits
+        min_rows: Smallest partition that gets its own model
+        save: Write the partition and router artifacts next to the model artifacts
+
+    Returns:
+        dict of target -> PartitionedModel
+    """
+    if kind not in PARTITION_KINDS:
+        raise ValueError(f'kind must be one of {PARTITION_KINDS}')
+    if by not in PARTITION_KEYS:
+        raise ValueError(f'by must be one of {sorted(PARTITION_KEYS)}')
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    df = load_measurements()
+    train_idx, _ = train_test_indices(len(df))
+    train = df.iloc[train_idx]
+    features = registry.features(version)
+    X = partition_matrix(train, features, PARTITION_KEYS[by])
+    estimators = family_estimators(registry, version)
+
+    models = {}
+    for target in targets:
+        fallback_key = f'{kind}_{TARGET_SUFFIXES[target]}'
+        model = PartitionedModel(estimators[(kind, target)], PARTITION_KEYS[by], len(features),
+                                 registry.load_model(fallback_key, version), fallback_key)
+        model.fit(X, train[target].to_numpy(dtype=np.float64), n_jobs=n_jobs, min_rows=min_rows)
+        if save:
+            model.save(registry, target, version)
+        models[target] = model
+    return models
+
+
+def main():
+    """Train, evaluate and save partitioned models"""
+    import time
+
+    from sklearn.metrics import r2_score
+
+    from .features import synthetic_measurements
+
+    parser = argparse.ArgumentParser(description='Train per-site partitioned EMF models')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--kind', choices=PARTITION_KINDS, default='xgb')
+    parser.add_argument('--by', choices=sorted(PARTITION_KEYS), default='city')
+    parser.add_argument('--min-rows', type=int, default=MIN_PARTITION_ROWS)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Partitioned Models ({args.kind}, by {args.by})")
+    print("=" * 60)
+
+    registry = ModelRegistry()
+    version = args.version or registry.latest_version()
+    models = train_partitioned_models(registry, version, args.kind, args.by, n_jobs=args.n_jobs,
+                                      min_rows=args.min_rows, save=not args.no_save)
+
+    df = load_measurements()
+    _, test_idx = train_test_indices(len(df))
+    test = df.iloc[test_idx]
+    features = registry.features(version)
+    X_test = partition_matrix(test, features, PARTITION_KEYS[args.by])
+    batch = synthetic_measurements(100_000, df)
+    X_batch = partition_matrix(batch, features, PARTITION_KEYS[args.by])
+    for target, model in models.items():
+        print(f"\n{target}: partitions {model.partition_rows}")
+        for label, predictor in [('global', model.fallback), ('partitioned', model)]:
+            X = X_test if predictor is model else X_test[:, :len(features)]
+            score = r2_score(test[target], predictor.predict(X))
+            Xb = X_batch if predictor is model else X_batch[:, :len(features)]
+            start = time.perf_counter()
+            predictor.predict(Xb)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<12} test R2 {score:7.4f}   {len(Xb) / elapsed:>12,.0f} rows/s")
+        if not args.no_save:
+            sizes = [os.path.getsize(registry.path(partition_name(model.key_columns, key), version, target))
+                     for key in model.partitions]
+            print(f"  Saved: {registry.path('partitioned_model', version, target)} "
+                  f"(+{len(sizes)} partition artifacts, {sum(sizes) / 1024:,.0f} KB)")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    # Run through the package module so saved models pickle as emf_ml.partitioned.PartitionedModel
+    from emf_ml.partitioned import main as package_main
+
+    package_main()
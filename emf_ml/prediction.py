@@ -0,0 +1,166 @@
+"""
+Prediction Module
+Scoring path for E_ICNIRP and H_ICNIRP from raw measurement conditions
+"""
+
+import numpy as np
+import pandas as pd
+
+from .conformal import JOINT_MODEL_KINDS, MODEL_KINDS, PARTITIONED_MODEL_KINDS, load_calibration
+from .features import TARGETS, engineer_feature_array
+from .registry import ModelRegistry
+from .validation import InputValidator, load_profile
+
+
+class EMFPredictor:
+    """Predicts both targets from raw measurement rows with one model version"""
+
+    def __init__(self, registry=None, version=None, model='best', targets=TARGETS):
+        """
+        Initialize the predictor
+
+        Args:
+            registry: ModelRegistry (defaults to the models/ directory)
+            version: Artifact version (defaults to the latest)
+            model: 'best' for best_model_*, 'stacked' for stacked_ensemble_*,
+                'joint' for joint_model_* (both targets in one model) or
+                'partitioned' for partitioned_model_* (per-site models)
+            targets: Targets to predict
+        """
+        if model not in MODEL_KINDS:
+            raise ValueError(f"model must be one of {sorted(MODEL_KINDS)}")
+        self.registry = registry or ModelRegistry()
+        self.version = version or self.registry.latest_version()
+        self.model_kind = model
+        self.targets = list(targets)
+        self.features = self.registry.features(self.version)
+        if model in JOINT_MODEL_KINDS:
+            self.models = {'joint': self.registry.load(MODEL_KINDS[model], self.version)}
+        else:
+            self.models = {t: self.registry.load(MODEL_KINDS[model], self.version, t) for t in self.targets}
+        self.key_columns = None
+        if model in PARTITIONED_MODEL_KINDS:
+            self.key_columns = self.models[self.targets[0]].key_columns
+        self.calibrations = {t: load_calibration(self.registry, t, self.version, model) for t in self.targets}
+        self.validator = InputValidator(load_profile(self.registry, self.version))
+
+    def feature_matrix(self, data):
+        """
+        Engineer the model input features
+
+        Partitioned models also take the partition key columns, appended
+        after the features.
+
+        Args:
+            data: DataFrame (or mapping of arrays) with the raw measurement columns
+
+        Returns:
+            ndarray of shape (n_rows, n_features), plus one column per key
+            for partitioned models
+        """
+        if self.key_columns is not None:
+            from .partitioned import partition_matrix
+
+            return partition_matrix(data, self.features, self.key_columns)
+        return engineer_feature_array(data, self.features)
+
+    def validate(self, data):
+        """
+        Validate raw measurement rows against the training data profile
+
+        Args:
+            data: DataFrame with the raw measurement columns
+
+        Returns:
+            DataFrame of per-row validation flags (see InputValidator.validate)
+        """
+        return self.validator.validate(data)
+
+    def predict(self, data, validate=False):
+        """
+        Predict every target
+
+        Args:
+            data: DataFrame with the raw measurement columns
+            validate: Append validation flags and return NaN for invalid rows
+
+        Returns:
+            DataFrame with one column per target
+        """
+        if not validate:
+            X = self.feature_matrix(data)
+            return pd.DataFrame(self._predict_targets(X), index=_index(data))
+
+        columns = self.validator.check_schema(data)
+        X = self.feature_matrix(columns)
+        flags = self.validator.validate(columns, X[:, :len(self.features)])
+        invalid = ~flags['valid'].to_numpy()
+        # Invalid rows are not scored; zeros keep the models away from NaN/inf
+        X[invalid] = 0.0
+        result = pd.DataFrame(self._predict_targets(X))
+        result.loc[invalid, self.targets] = np.nan
+        result = pd.concat([result, flags], axis=1)
+        result.index = flags.index if _index(data) is None else data.index
+        return result
+
+    def predict_intervals(self, data, alpha=0.1):
+        """
+        Predict every target with split-conformal intervals
+
+        Args:
+            data: DataFrame with the raw measurement columns
+            alpha: Allowed miscoverage (0.1 for 90% intervals)
+
+        Returns:
+            DataFrame with <target>, <target>_lower and <target>_upper columns
+        """
+        X = self.feature_matrix(data)
+        predictions = self._predict_targets(X)
+        result = {}
+        for target in self.targets:
+            calibration = self.calibrations[target]
+            if calibration is None:
+                raise FileNotFoundError(
+                    f'No conformal calibration for {target} (version {self.version}); '
+                    f'run python -m emf_ml.conformal --version {self.version}'
+                )
+            result[target] = predictions[target]
+            result[f'{target}_lower'], result[f'{target}_upper'] = calibration.interval(predictions[target], alpha)
+        return pd.DataFrame(result, index=_index(data))
+
+    def explain(self, data, target):
+        """
+        Per-row TreeSHAP contributions of a target's tree model
+
+        Args:
+            data: DataFrame with the raw measurement columns
+            target: Target name
+
+        Returns:
+            DataFrame with one contribution column per feature plus Base_Value
+            and Prediction (see attribution.explain)
+        """
+        from .attribution import explain
+
+        if target not in self.models or self.model_kind in PARTITIONED_MODEL_KINDS:
+            raise ValueError(f'No single-target {self.model_kind} model for {target}')
+        return explain(data, target, self.registry, self.version, self.models[target])
+
+    def _predict_targets(self, X):
+        """Predict every target from the engineered feature matrix"""
+        if 'joint' in self.models:
+            joint = self.models['joint']
+            predictions = joint.predict_targets(self.registry.prepare_input(joint, X, self.version))
+            return {t: predictions[t] for t in self.targets}
+        if self.model_kind in PARTITIONED_MODEL_KINDS:
+            # Routers take the raw features plus key columns, whatever their sub-model family
+            return {t: np.asarray(self.models[t].predict(X), dtype=np.float64) for t in self.targets}
+        return {
+            t: np.asarray(self.registry.predict(self.models[t], X, self.version), dtype=np.float64)
+            for t in self.targets
+        }
+
+
+def _index(data):
+    """Return the row index of a DataFrame input, or None"""
+    return data.index if isinstance(data, pd.DataFrame) else None
@@ -0,0 +1,607 @@
+"""
+Quality Module
+Chunked, parallel data quality profiling of the EMF measurements
+
+One pass over the measurement data (a CSV read in chunks, or any iterable
+of DataFrame chunks) collects, per column:
+
+    - null counts, overall and per row block (for the missing-values heatmap)
+    - a KLL quantile sketch, from which quartiles, IQR fences, the median
+      absolute deviation and the IQR / robust z-score outlier counts are
+      derived, plus the TAIL_SIZE smallest and largest values kept exactly
+    - category cardinalities and value counts (up to MAX_CATEGORIES values)
+
+and, per row, a 64-bit hash for duplicate detection. Row hashes are held in
+memory up to MEMORY_HASHES and then spilled to hash-partitioned files, so the
+exact duplicate count of a 100M-row archive needs bounded memory.
+
+Column work is fanned out across a thread pool (the NumPy and pandas
+kernels release the GIL) while the next chunk is being read.
+
+The result is a compact DataQualityProfile: JSON-serializable, consumed by
+save_missing_values_heatmap / save_boxplots (01_missing_values_heatmap.png,
+04_boxplots_numerical.png) and by the report text (profile.to_dict()).
+Quartiles and the MAD are exact while a column holds fewer values than the
+sketch size, and otherwise carry the sketch's rank error of roughly
+1.7 / sketch_size of the row count. Outlier counts are exact whenever the
+outliers on each side fit in the exact tails (at most TAIL_SIZE), which
+covers the rare outliers a quality check looks for.
+
+Usage:
+    python -m emf_ml.quality data/emf-data-sipc-ibri.csv --output outputs/tables/data_quality_profile.json
+    python -m emf_ml.quality archive.csv --chunksize 1000000 --workers 8 --plots-dir outputs/plots
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .streaming_stats import QuantileSketch
+
+
+DEFAULT_CHUNKSIZE = 1_000_000
+DEFAULT_SKETCH_SIZE = 2000
+
+# Value counts are kept for columns with at most this many distinct values
+MAX_CATEGORIES = 1000
+
+# Rows of the missing-values heatmap; blocks double in size to stay below this
+MAX_NULL_BLOCKS = 200
+
+# Row hashes kept in memory before spilling to partition files (8 bytes each)
+MEMORY_HASHES = 1 << 23
+HASH_PARTITIONS = 64
+
+# Tukey fences and the Iglewicz-Hoaglin modified z-score
+IQR_FACTOR = 1.5
+ROBUST_Z_THRESHOLD = 3.5
+MAD_SCALE = 0.6745
+
+# Smallest and largest values kept exactly per column; outlier counts, whiskers
+# and fliers are exact whenever the outliers on a side fit in this tail
+TAIL_SIZE = 10_000
+
+PROFILE_QUANTILES = [0.0, 0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99, 1.0]
+MAX_FLIERS = 100
+
+
+class ColumnAccumulator:
+    """Null count, quantile sketch and category counts of one column"""
+
+    def __init__(self, name, k=DEFAULT_SKETCH_SIZE):
+        """
+        Initialize an empty accumulator
+
+        Args:
+            name: Column name
+            k: Quantile sketch size
+        """
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.numeric = True
+        self.sketch = QuantileSketch(k, seed=0)
+        self.low_tail = np.empty(0)
+        self.high_tail = np.empty(0)
+        self.categories = {}
+
+    def update(self, series):
+        """
+        Add a chunk of the column
+
+        Args:
+            series: pandas Series
+        """
+        missing = series.isna().to_numpy()
+        self.count += len(series)
+        self.nulls += int(missing.sum())
+        if self.numeric and not pd.api.types.is_numeric_dtype(series.dtype):
+            self.numeric = False
+            self.sketch = None
+        if self.numeric:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.sketch.update(values)
+            self.low_tail = _tail(np.concatenate([self.low_tail, values]), TAIL_SIZE)
+            self.high_tail = -_tail(-np.concatenate([self.high_tail, values]), TAIL_SIZE)
+        if self.categories is not None:
+            # value_counts, unlike np.unique, does not sort, so mixed-type object columns work
+            for value, count in series.value_counts(dropna=True, sort=False).items():
+                value = value.item() if isinstance(value, np.generic) else value
+                self.categories[value] = self.categories.get(value, 0) + int(count)
+            if len(self.categories) > MAX_CATEGORIES:
+                self.categories = None
+        return self
+
+    def summary(self):
+        """Compact, JSON-serializable column profile"""
+        summary = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'numeric': self.numeric,
+            'cardinality': len(self.categories) if self.categories is not None else None,
+            'categories': ({str(k): v for k, v in sorted(self.categories.items(), key=lambda kv: -kv[1])}
+                           if self.categories is not None else None),
+        }
+        if self.numeric and self.sketch.n:
+            summary.update(numeric_summary(self.sketch, self.low_tail, self.high_tail))
+        return summary
+
+
+def _tail(values, size):
+    """The `size` smallest values"""
+    if len(values) <= size:
+        return values
+    return np.partition(values, size - 1)[:size]
+
+
+def _sketch_items(sketch):
+    """Sorted sketch items and their weights"""
+    items = np.concatenate(sketch.levels)
+    weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(sketch.levels)])
+    order = np.argsort(items, kind='stable')
+    return items[order], weights[order]
+
+
+def numeric_summary(sketch, low_tail, high_tail):
+    """
+    Quantiles, fences and outlier counts from a column's quantile sketch and exact tails
+
+    Counts beyond a fence come from the exact tail on that side when the tail
+    reaches past the fence (so it holds every value beyond it), and are
+    estimated from the sketch otherwise.
+
+    Args:
+        sketch: QuantileSketch with at least one value
+        low_tail: Smallest values of the column
+        high_tail: Largest values of the column
+
+    Returns:
+        dict of profile values (see DataQualityProfile.to_frame)
+    """
+    items, weights = _sketch_items(sketch)
+    quantiles = np.atleast_1d(sketch.quantile(PROFILE_QUANTILES))
+    q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    low, high = q1 - IQR_FACTOR * iqr, q3 + IQR_FACTOR * iqr
+
+    # Median absolute deviation (weighted over the sketch items once compacted)
+    deviations = np.abs(items - median)
+    if sketch.is_exact:
+        mad = float(np.median(deviations))
+    else:
+        order = np.argsort(deviations, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        mad = float(deviations[order][np.searchsorted(cumulative, 0.5 * cumulative[-1])])
+
+    # Exact extremes replace the sketch's min and max
+    quantiles[0], quantiles[-1] = low_tail.min(), high_tail.max()
+    complete = sketch.n <= len(low_tail)
+    low_exact = complete or low_tail.max() >= low
+    high_exact = complete or high_tail.min() <= high
+
+    exact_counts = []
+
+    def count_outside(lower, upper):
+        below_exact = complete or low_tail.max() >= lower
+        above_exact = complete or high_tail.min() <= upper
+        below = (low_tail < lower).sum() if below_exact else weights[items < lower].sum()
+        above = (high_tail > upper).sum() if above_exact else weights[items > upper].sum()
+        exact_counts.append(below_exact and above_exact)
+        return int(round(below + above))
+
+    iqr_outliers = count_outside(low, high)
+    robust_outliers = None
+    if mad > 0:
+        spread = ROBUST_Z_THRESHOLD * mad / MAD_SCALE
+        robust_outliers = count_outside(median - spread, median + spread)
+
+    low_values = low_tail if low_exact else items
+    high_values = high_tail if high_exact else items
+    inside = np.concatenate([low_values[low_values >= low], high_values[high_values <= high]])
+    fliers = np.unique(np.concatenate([low_values[low_values < low], high_values[high_values > high]]))
+    if len(fliers) > MAX_FLIERS:
+        fliers = fliers[np.linspace(0, len(fliers) - 1, MAX_FLIERS).astype(int)]
+    return {
+        'quantiles': dict(zip([str(q) for q in PROFILE_QUANTILES], quantiles.tolist())),
+        'iqr': float(iqr),
+        'mad': mad,
+        'iqr_outliers': iqr_outliers,
+        'robust_z_outliers': robust_outliers,
+        'whiskers': [float(inside.min()), float(inside.max())] if len(inside) else [float(q1), float(q3)],
+        'fliers': fliers.tolist(),
+        'exact': bool(sketch.is_exact),
+        'outliers_exact': bool(all(exact_counts)),
+    }
+
+
+class RowHashSet:
+    """Exact count of distinct 64-bit row hashes with bounded memory"""
+
+    def __init__(self, memory_hashes=MEMORY_HASHES, partitions=HASH_PARTITIONS):
+        """
+        Initialize an empty set
+
+        Args:
+            memory_hashes: Hashes held in memory before spilling to disk
+            partitions: Spill files, selected by the top hash bits
+        """
+        self.memory_hashes = memory_hashes
+        self.partitions = partitions
+        self.n = 0
+        self._buffer = []
+        self._buffered = 0
+        self._spill_dir = None
+
+    def update(self, hashes):
+        """Add an array of uint64 row hashes"""
+        self.n += len(hashes)
+        self._buffer.append(np.asarray(hashes, dtype=np.uint64))
+        self._buffered += len(hashes)
+        if self._buffered > self.memory_hashes:
+            self._spill()
+        return self
+
+    def n_unique(self):
+        """Number of distinct hashes added"""
+        if self._spill_dir is None:
+            return int(len(np.unique(np.concatenate(self._buffer)))) if self._buffer else 0
+        self._spill()
+        total = 0
+        for name in os.listdir(self._spill_dir):
+            total += len(np.unique(np.fromfile(os.path.join(self._spill_dir, name), dtype=np.uint64)))
+        return total
+
+    def close(self):
+        """Remove spill files"""
+        if self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _spill(self):
+        """Append the (deduplicated) buffer to the partition files"""
+        if not self._buffer:
+            return
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='row_hashes_')
+        hashes = np.unique(np.concatenate(self._buffer))
+        shift = np.uint64(64 - int(np.log2(self.partitions)))
+        partition = (hashes >> shift).astype(np.int64)
+        bounds = np.searchsorted(partition, np.arange(self.partitions + 1))
+        for p in range(self.partitions):
+            if bounds[p] < bounds[p + 1]:
+                with open(os.path.join(self._spill_dir, f'{p:03d}.bin'), 'ab') as f:
+                    hashes[bounds[p]:bounds[p + 1]].tofile(f)
+        self._buffer, self._buffered = [], 0
+
+
+class NullBlocks:
+    """Null counts per column over consecutive row blocks"""
+
+    def __init__(self, n_columns, max_blocks=MAX_NULL_BLOCKS):
+        self.block_rows = 1
+        self.max_blocks = max_blocks
+        self.rows = 0
+        self.counts = np.zeros((0, n_columns), dtype=np.int64)
+
+    def update(self, missing):
+        """
+        Add the null mask of a chunk
+
+        Args:
+            missing: bool array of shape (n_rows, n_columns)
+        """
+        n = len(missing)
+        if n == 0:
+            return self
+        while (self.rows + n - 1) // self.block_rows >= self.max_blocks:
+            self._coarsen()
+        block = (self.rows + np.arange(n)) // self.block_rows
+        starts = np.flatnonzero(np.r_[True, block[1:] != block[:-1]])
+        sums = np.add.reduceat(missing.astype(np.int64), starts, axis=0)
+        needed = block[-1] + 1
+        if needed > len(self.counts):
+            self.counts = np.vstack([self.counts, np.zeros((needed - len(self.counts), self.counts.shape[1]),
+                                                           dtype=np.int64)])
+        self.counts[block[starts]] += sums
+        self.rows += n
+        return self
+
+    def fractions(self):
+        """Null fraction per block and column"""
+        sizes = np.minimum(self.block_rows, self.rows - np.arange(len(self.counts)) * self.block_rows)
+        return self.counts / np.maximum(sizes, 1)[:, None]
+
+    def _coarsen(self):
+        """Merge adjacent blocks, doubling the block size"""
+        if len(self.counts) % 2:
+            self.counts = np.vstack([self.counts, np.zeros((1, self.counts.shape[1]), dtype=np.int64)])
+        self.counts = self.counts[0::2] + self.counts[1::2]
+        self.block_rows *= 2
+
+
+class DataQualityProfile:
+    """Compact data quality profile of a measurement table"""
+
+    def __init__(self, rows, unique_rows, columns, null_block_rows, null_fractions, elapsed=None):
+        """
+        Initialize the profile
+
+        Args:
+            rows: Row count
+            unique_rows: Distinct row count (by row hash)
+            columns: Dict of column name -> ColumnAccumulator.summary() dict
+            null_block_rows: Rows per null block
+            null_fractions: Array (n_blocks, n_columns) of null fractions
+            elapsed: Profiling time in seconds
+        """
+        self.rows = rows
+        self.unique_rows = unique_rows
+        self.columns = columns
+        self.null_block_rows = null_block_rows
+        self.null_fractions = np.asarray(null_fractions, dtype=np.float64)
+        self.elapsed = elapsed
+
+    @property
+    def duplicate_rows(self):
+        """Rows identical to an earlier row (as DataFrame.duplicated().sum())"""
+        return self.rows - self.unique_rows
+
+    def to_frame(self):
+        """
+        Per-column summary table
+
+        Returns:
+            DataFrame indexed by column with Count, Missing, Missing_Pct,
+            Min, Q1, Median, Q3, Max, IQR, MAD, IQR_Outliers,
+            Robust_Z_Outliers, Cardinality, Exact (quantiles) and
+            Outliers_Exact
+        """
+        records = []
+        for name, c in self.columns.items():
+            q = c.get('quantiles', {})
+            records.append({
+                'Column': name,
+                'Count': c['count'],
+                'Missing': c['nulls'],
+                'Missing_Pct': 100.0 * c['nulls'] / c['count'] if c['count'] else np.nan,
+                'Min': q.get('0.0', np.nan),
+                'Q1': q.get('0.25', np.nan),
+                'Median': q.get('0.5', np.nan),
+                'Q3': q.get('0.75', np.nan),
+                'Max': q.get('1.0', np.nan),
+                'IQR': c.get('iqr', np.nan),
+                'MAD': c.get('mad', np.nan),
+                'IQR_Outliers': c.get('iqr_outliers', np.nan),
+                'Robust_Z_Outliers': c.get('robust_z_outliers', np.nan),
+                'Cardinality': c['cardinality'],
+                'Exact': c.get('exact', True),
+                'Outliers_Exact': c.get('outliers_exact', True),
+            })
+        return pd.DataFrame(records).set_index('Column')
+
+    def to_dict(self):
+        """Return a JSON-serializable state"""
+        return {
+            'rows': self.rows,
+            'unique_rows': self.unique_rows,
+            'duplicate_rows': self.duplicate_rows,
+            'columns': self.columns,
+            'null_block_rows': self.null_block_rows,
+            'null_fractions': self.null_fractions.tolist(),
+            'elapsed': self.elapsed,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a profile saved with to_dict()"""
+        return cls(state['rows'], state['unique_rows'], state['columns'], state['null_block_rows'],
+                   state['null_fractions'], state.get('elapsed'))
+
+    def save(self, path):
+        """Write the profile as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Load a profile saved with save()"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def row_hashes(chunk):
+    """
+    64-bit hash of every row, independent of the dtypes inferred for the chunk
+
+    Numeric columns are hashed as float64, so a row hashes the same in a
+    chunk where a column parsed as int64 and in one where it holds NaN.
+
+    Args:
+        chunk: DataFrame
+
+    Returns:
+        ndarray of uint64
+    """
+    numeric = [c for c in chunk.columns if pd.api.types.is_numeric_dtype(chunk[c].dtype)]
+    if numeric:
+        chunk = chunk.astype({c: np.float64 for c in numeric})
+    return pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+
+
+def profile_chunks(chunks, columns=None, workers=None, k=DEFAULT_SKETCH_SIZE, memory_hashes=MEMORY_HASHES):
+    """
+    Profile data quality in one pass over DataFrame chunks
+
+    Args:
+        chunks: Iterable of DataFrames
+        columns: Columns to profile (defaults to all columns of the first chunk)
+        workers: Thread pool size (defaults to os.cpu_count())
+        k: Quantile sketch size
+        memory_hashes: Row hashes held in memory before spilling to disk
+
+    Returns:
+        DataQualityProfile
+    """
+    start = time.perf_counter()
+    accumulators, nulls, hashes = None, None, RowHashSet(memory_hashes)
+    iterator = iter(chunks)
+    try:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            chunk = next(iterator, None)
+            while chunk is not None:
+                if accumulators is None:
+                    columns = list(columns or chunk.columns)
+                    accumulators = [ColumnAccumulator(c, k) for c in columns]
+                    nulls = NullBlocks(len(columns))
+                chunk = chunk[columns]
+                futures = [pool.submit(a.update, chunk[a.name]) for a in accumulators]
+                futures.append(pool.submit(lambda c: hashes.update(row_hashes(c)), chunk))
+                futures.append(pool.submit(lambda c: nulls.update(c.isna().to_numpy()), chunk))
+                # Read the next chunk while the current one is processed
+                chunk = next(iterator, None)
+                for future in futures:
+                    future.result()
+        if accumulators is None:
+            return DataQualityProfile(0, 0, {}, 1, np.zeros((0, 0)), time.perf_counter() - start)
+        return DataQualityProfile(nulls.rows, hashes.n_unique(), {a.name: a.summary() for a in accumulators},
+                                  nulls.block_rows, nulls.fractions(), time.perf_counter() - start)
+    finally:
+        hashes.close()
+
+
+def profile_csv(path, columns=None, chunksize=DEFAULT_CHUNKSIZE, workers=None, k=DEFAULT_SKETCH_SIZE):
+    """
+    Profile a CSV file without loading it whole
+
+    Args:
+        path: CSV file path
+        columns: Columns to profile
+        chunksize: Rows read per chunk
+        workers: Thread pool size
+        k: Quantile sketch size
+
+    Returns:
+        DataQualityProfile
+    """
+    return profile_chunks(pd.read_csv(path, usecols=columns, chunksize=chunksize), columns, workers, k)
+
+
+def save_missing_values_heatmap(profile, path, title='Missing Values Heatmap'):
+    """
+    Save the null fractions per row block as a heatmap (as 01_missing_values_heatmap.png)
+
+    Args:
+        profile: DataQualityProfile
+        path: Output image path
+        title: Figure title
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    image = ax.imshow(profile.null_fractions, aspect='auto', cmap='viridis', interpolation='nearest',
+                      vmin=0, vmax=max(float(profile.null_fractions.max(initial=0)), 0.1))
+    ax.set_xticks(range(len(profile.columns)), list(profile.columns))
+    ax.set_yticks([])
+    if profile.null_block_rows > 1:
+        ax.set_ylabel(f'Row blocks of {profile.null_block_rows:,} rows')
+    fig.colorbar(image, ax=ax, label='Missing fraction')
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def save_boxplots(profile, path, columns=None, title='Box Plots for Numerical Features'):
+    """
+    Save box plots drawn from the profile's quartiles, whiskers and fliers (as 04_boxplots_numerical.png)
+
+    Args:
+        profile: DataQualityProfile
+        path: Output image path
+        columns: Columns to plot (defaults to every numeric column)
+        title: Figure title
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    columns = columns or [c for c, s in profile.columns.items() if 'quantiles' in s]
+    n_cols = 4
+    n_rows = max(1, int(np.ceil(len(columns) / n_cols)))
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(4 * n_cols, 3.6 * n_rows), squeeze=False)
+    for ax, column in zip(axes.flat, columns):
+        summary = profile.columns[column]
+        q = summary['quantiles']
+        ax.bxp([{'med': q['0.5'], 'q1': q['0.25'], 'q3': q['0.75'], 'whislo': summary['whiskers'][0],
+                 'whishi': summary['whiskers'][1], 'fliers': summary['fliers']}],
+               showfliers=True, patch_artist=True, widths=0.8,
+               boxprops={'facecolor': '#2E93A5', 'edgecolor': '#333333'},
+               medianprops={'color': '#333333'}, flierprops={'marker': 'o', 'markersize': 4})
+        ax.set_title(column, fontsize=10)
+        ax.set_ylabel(column)
+        ax.set_xticks([])
+        ax.grid(axis='y', alpha=0.5)
+    for ax in list(axes.flat)[len(columns):]:
+        ax.set_visible(False)
+    fig.suptitle(title, fontsize=12, fontweight='bold')
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def main():
+    """Profile a measurement CSV and write the profile, summary table and figures"""
+    parser = argparse.ArgumentParser(description='Chunked data quality profile of measurement data')
+    parser.add_argument('path', help='Measurement CSV file')
+    parser.add_argument('--output', help='Profile JSON to write')
+    parser.add_argument('--table', help='Per-column summary CSV to write')
+    parser.add_argument('--plots-dir', help='Write the missing-values heatmap and box plots here')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sketch-size', type=int, default=DEFAULT_SKETCH_SIZE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Data Quality Profile")
+    print("=" * 60)
+
+    profile = profile_csv(args.path, chunksize=args.chunksize, workers=args.workers, k=args.sketch_size)
+    print(f"\nRows: {profile.rows:,} ({profile.duplicate_rows:,} duplicate) in {profile.elapsed:.2f} s\n")
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(profile.to_frame().drop(columns=['Exact', 'Outliers_Exact']).round(3))
+
+    if args.output:
+        profile.save(args.output)
+        print(f"\nSaved: {args.output}")
+    if args.table:
+        profile.to_frame().to_csv(args.table)
+        print(f"Saved: {args.table}")
+    if args.plots_dir:
+        os.makedirs(args.plots_dir, exist_ok=True)
+        for path in [save_missing_values_heatmap(profile, os.path.join(args.plots_dir, '01_missing_values_heatmap.png')),
+                     save_boxplots(profile, os.path.join(args.plots_dir, '04_boxplots_numerical.png'))]:
+            print(f"Saved: {path}")
+
+    print("\n" + "=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+Registry Module
+Access to the timestamped model artifacts in the models/ directory
+"""
+
+import os
+import re
+import warnings
+
+import joblib
+import numpy as np
+
+from .features import BASE_DIR, FEATURE_FORMULAS, engineer_feature_array, load_measurements, train_test_indices
+
+
+MODELS_DIR = os.path.join(BASE_DIR, 'models')
+
+VERSION_PATTERN = re.compile(r'_(\d{8}_\d{6})\.joblib$')
+
+# Keys used in all_models_*.joblib and their display names in the report tables
+MODEL_NAMES = {
+    'svr': 'SVR',
+    'rf': 'Random Forest',
+    'xgb': 'XGBoost',
+    'mlp': 'Neural Network',
+}
+
+# Variance retained by the PCA step in front of SVR, MLP and the stacked ensembles
+PCA_VARIANCE = 0.95
+
+TARGET_SUFFIXES = {
+    'E_ICNIRP': 'e',
+    'H_ICNIRP': 'h',
+}
+
+
+class ModelRegistry:
+    """Loads and caches model artifacts by version"""
+
+    def __init__(self, models_dir=None, artifact_store=None):
+        """
+        Initialize the registry
+
+        Args:
+            models_dir: Directory containing the *.joblib artifacts
+            artifact_store: Optional ArtifactStore; artifacts converted into
+                it are loaded from the store instead of their joblib files
+        """
+        self.models_dir = models_dir or MODELS_DIR
+        self.artifact_store = artifact_store
+        self._cache = {}
+
+    def versions(self):
+        """Return all artifact versions, oldest first"""
+        found = set()
+        for filename in os.listdir(self.models_dir):
+            match = VERSION_PATTERN.search(filename)
+            if match and filename.startswith('model_config_'):
+                found.add(match.group(1))
+        return sorted(found)
+
+    def supported_versions(self):
+        """Return the versions whose features can be engineered from raw measurements, oldest first"""
+        return [v for v in self.versions() if not self.unsupported_features(v)]
+
+    def latest_version(self):
+        """Return the newest artifact version"""
+        versions = self.versions()
+        if not versions:
+            raise FileNotFoundError(f'No model artifacts found in {self.models_dir}')
+        return versions[-1]
+
+    def path(self, kind, version=None, target=None):
+        """
+        Build the file path of an artifact
+
+        Args:
+            kind: Artifact prefix (e.g. 'best_model', 'scaler', 'all_models')
+            version: Artifact version (defaults to the latest)
+            target: Target name for per-target artifacts (e.g. 'E_ICNIRP')
+
+        Returns:
+            str: Absolute artifact path
+        """
+        version = version or self.latest_version()
+        name = f'{kind}_{target}_{version}.joblib' if target else f'{kind}_{version}.joblib'
+        return os.path.join(self.models_dir, name)
+
+    def load(self, kind, version=None, target=None):
+        """Load an artifact, reusing previously loaded objects"""
+        path = self.path(kind, version, target)
+        if path not in self._cache:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if self.artifact_store is not None and self.artifact_store.has(name):
+                self._cache[path] = self.artifact_store.load(name)
+            else:
+                self._cache[path] = joblib.load(path)
+            # Routers of partitioned models reference their partition artifacts
+            if hasattr(self._cache[path], 'resolve_artifacts'):
+                self._cache[path].resolve_artifacts(self, VERSION_PATTERN.search(path).group(1))
+        return self._cache[path]
+
+    def load_config(self, version=None):
+        """Load the model configuration dictionary"""
+        return self.load('model_config', version)
+
+    def load_scaler(self, version=None):
+        """Load the fitted RobustScaler"""
+        return self.load('scaler', version)
+
+    def load_all_models(self, version=None):
+        """Load the dictionary of all trained base models"""
+        return self.load('all_models', version)
+
+    def load_best_model(self, target, version=None):
+        """Load the best model for a target"""
+        return self.load('best_model', version, target)
+
+    def load_stacked_ensemble(self, target, version=None):
+        """Load the stacked ensemble for a target"""
+        return self.load('stacked_ensemble', version, target)
+
+    def load_model(self, key, version=None):
+        """
+        Load a single base model from all_models by key
+
+        Args:
+            key: Model key such as 'xgb_e' or 'rf_h'
+            version: Artifact version
+        """
+        return self.load_all_models(version)[key]
+
+    def unsupported_features(self, version=None):
+        """Return the features of a version that have no formula in FEATURE_FORMULAS"""
+        return [f for f in self.load_config(version)['features'] if f not in FEATURE_FORMULAS]
+
+    def features(self, version=None):
+        """
+        Return the input feature names of a version
+
+        Raises:
+            ValueError: For versions that cannot be scored from raw
+                measurements. The first version (20251209_225730) built its
+                features, including Distance_x_Temp, from standardized
+                columns, so no raw-column formula reproduces its inputs.
+        """
+        unsupported = self.unsupported_features(version)
+        if unsupported:
+            raise ValueError(f'Model version {version or self.latest_version()} uses features that are not '
+                             f'engineered from raw measurements: {unsupported}; use one of '
+                             f'{self.supported_versions()}')
+        return self.load_config(version)['features']
+
+    def load_pca(self, version=None):
+        """
+        Rebuild the PCA used in front of SVR, MLP and the stacked ensembles
+
+        The fitted PCA was not saved with the original artifacts. It was
+        refit on the scaled training split of the original 66-row
+        data/emf-data-sipc-ibri.csv, which reproduces the original
+        components and the reported test metrics, and saved as
+        pca_<version>.joblib so that later changes to the measurements
+        cannot alter a published version. Versions without that file are
+        refit from the current training split (see save_pca).
+        """
+        from sklearn.decomposition import PCA
+
+        version = version or self.latest_version()
+        key = ('pca', version)
+        if key not in self._cache and os.path.exists(self.path('pca', version)):
+            self._cache[key] = joblib.load(self.path('pca', version))
+        if key not in self._cache:
+            df = load_measurements()
+            train_idx, _ = train_test_indices(len(df))
+            X = engineer_feature_array(df.iloc[train_idx], self.features(version))
+            self._cache[key] = PCA(n_components=PCA_VARIANCE).fit(self.scale(X, version))
+        return self._cache[key]
+
+    def save_pca(self, version=None):
+        """Persist the PCA of a version as pca_<version>.joblib and return the path"""
+        path = self.path('pca', version)
+        if not os.path.exists(path):
+            joblib.dump(self.load_pca(version), path)
+        return path
+
+    def scale(self, X, version=None):
+        """
+        Apply the version's scaler to raw engineered features
+
+        The scalers were fitted on DataFrames. Their feature names are
+        checked once against features(version), the column order of X, and
+        the array is then transformed directly: building a DataFrame per call
+        costs about 1 ms, five times a single-row SVR prediction.
+        """
+        scaler = self.load_scaler(version)
+        names = getattr(scaler, 'feature_names_in_', None)
+        if names is not None:
+            key = ('scaler_names', version)
+            if key not in self._cache:
+                if list(names) != list(self.features(version)):
+                    raise ValueError(f'Scaler of version {version or self.latest_version()} was fitted on '
+                                     f'{list(names)}, not on the version features {self.features(version)}')
+                self._cache[key] = True
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', message='X does not have valid feature names')
+                return scaler.transform(X)
+        return scaler.transform(X)
+
+    def prepare_input(self, model, X, version=None):
+        """
+        Transform raw engineered features into the input space of a model
+
+        Tree models (Random Forest, XGBoost) were trained on the raw
+        features; SVR and MLP on RobustScaler output, reduced with PCA when
+        they expect fewer columns than there are features (as do the
+        stacked ensembles).
+
+        Args:
+            model: Fitted estimator from this version
+            X: Array of shape (n_rows, n_features) in features(version) order
+            version: Artifact version
+
+        Returns:
+            ndarray ready for model.predict
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if is_tree_model(model):
+            return X
+        scaled = self.scale(X, version)
+        if getattr(model, 'n_features_in_', scaled.shape[1]) < scaled.shape[1]:
+            return self.load_pca(version).transform(scaled)
+        return scaled
+
+    def predict(self, model, X, version=None):
+        """Predict with any model of a version from raw engineered features"""
+        return model.predict(self.prepare_input(model, X, version))
+
+
+def is_tree_model(model):
+    """
+    Return True for Random Forest / XGBoost style tree models
+
+    Wrappers trained on the raw features (such as JointTargetModel) mark
+    themselves with raw_features = True. Fitted scikit-learn ensembles also
+    carry an `estimator` attribute, but it is the unfitted template, so it
+    is not inspected.
+    """
+    if getattr(model, 'raw_features', False):
+        return True
+    if hasattr(model, 'get_booster') or hasattr(model, 'tree_'):
+        return True
+    estimators = getattr(model, 'estimators_', None)
+    return estimators is not None and len(estimators) > 0 and hasattr(estimators[0], 'tree_')
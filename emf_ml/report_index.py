@@ -0,0 +1,481 @@
+"""
+Report Index Module
+SQLite FTS5 index over generated reports, model cards and executive summaries
+
+Every EMF_ML_ANALYSIS_REPORT*.docx, PDF, MODEL_CARD_*.txt and
+EXECUTIVE_SUMMARY_*.txt file is recorded once with its full text (FTS5
+table) and the structured values it contains:
+
+    documents   path, kind, version, mtime, size and SHA-1 of every file
+    metrics     (target, model, metric, value) rows, e.g.
+                ('H_ICNIRP', 'XGBoost', 'Test_R²', 0.535)
+    attributes  (key, value) rows, e.g. ('scaler', 'RobustScaler')
+
+Metric names follow the 07_model_results_comparison.csv columns. Updates
+are incremental: files whose size and mtime are unchanged are skipped
+without being read, files whose content hash is unchanged only get their
+mtime refreshed, and entries of deleted files are pruned. PDF files are
+indexed for full-text search only.
+
+The DOCX body is stream-parsed from word/document.xml (see docx_reader),
+so indexing does not build the python-docx object model.
+
+Usage:
+    python -m emf_ml.report_index update outputs models
+    python -m emf_ml.report_index search --metric "H_ICNIRP/XGBoost/Test_R2<0.5"
+    python -m emf_ml.report_index search --text RobustScaler
+"""
+
+import argparse
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+import zipfile
+import zlib
+from xml.etree import ElementTree
+
+import pandas as pd
+
+from .docx_reader import docx_blocks, parse_blocks
+from .features import BASE_DIR
+
+
+INDEX_PATH = os.path.join(BASE_DIR, 'outputs', 'index', 'reports.sqlite')
+DEFAULT_ROOTS = [os.path.join(BASE_DIR, 'outputs'), os.path.join(BASE_DIR, 'models')]
+
+# File name patterns of the indexed document kinds, checked in order
+DOCUMENT_KINDS = [
+    ('model_card', re.compile(r'^MODEL_CARD_.*\.txt$')),
+    ('executive_summary', re.compile(r'^EXECUTIVE_SUMMARY_.*\.txt$')),
+    ('report', re.compile(r'^(?!~\$).*\.docx$')),
+    ('pdf', re.compile(r'^.*\.pdf$')),
+]
+VERSION_PATTERN = re.compile(r'(\d{8}_\d{6})')
+
+FILTER_OPS = ['==', '!=', '<', '<=', '>', '>=']
+METRIC_FILTER_PATTERN = re.compile(r'^([^/]+)/([^/]+)/([^<>=!]+?)\s*(==|!=|<=|>=|<|>)\s*(\S+)$')
+
+HASH_BLOCK_BYTES = 1 << 20
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    version TEXT,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_kind ON documents (kind);
+CREATE TABLE IF NOT EXISTS metrics (
+    doc_id INTEGER NOT NULL,
+    target TEXT,
+    model TEXT,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_lookup ON metrics (metric, target, model, value);
+CREATE INDEX IF NOT EXISTS metrics_document ON metrics (doc_id);
+CREATE TABLE IF NOT EXISTS attributes (
+    doc_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attributes_lookup ON attributes (key, value);
+CREATE INDEX IF NOT EXISTS attributes_document ON attributes (doc_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5 (text);
+'''
+
+def document_kind(path):
+    """Return the document kind of a file name, or None if it is not indexed"""
+    name = os.path.basename(path)
+    for kind, pattern in DOCUMENT_KINDS:
+        if pattern.match(name):
+            return kind
+    return None
+
+
+def file_sha1(path):
+    """SHA-1 of a file's content"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_report(path):
+    """
+    Text, results-table metrics and caption attributes of a DOCX report
+
+    Returns:
+        (text, metrics, attributes) with metrics as (target, model, metric,
+        value) tuples and attributes as (key, value) tuples
+    """
+    blocks = list(docx_blocks(path))
+    lines = []
+    for kind, block in blocks:
+        lines.extend([block] if kind == 'paragraph' else ['\t'.join(row) for row in block])
+
+    results = parse_blocks(blocks)['model_results_comparison']
+    long = results.melt(id_vars=['Target', 'Model'], var_name='Metric', value_name='Value').dropna()
+    metrics = list(long[['Target', 'Model', 'Metric', 'Value']].itertuples(index=False, name=None))
+    attributes = [('caption', line.strip()) for line in lines if re.match(r'^(Table|Figure) \d+:', line)]
+    return '\n'.join(lines), metrics, attributes
+
+
+def extract_model_card(path):
+    """
+    Text, metrics and attributes of a MODEL_CARD_<version>.txt file
+
+    Returns:
+        (text, metrics, attributes), see extract_report()
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    lines = [line.strip(' ║\t').rstrip() for line in raw.splitlines()]
+    text = '\n'.join(lines)
+    metrics, attributes = [], []
+
+    best = {}
+    for target, model, r2 in re.findall(r'•\s*(\w+_ICNIRP):\s*(.+?)\s*\(R² = (-?[\d.]+)\)', text):
+        best[target] = model
+        attributes.append((f'best_model_{target}', model))
+        metrics.append((target, model, 'Test_R²', float(r2)))
+
+    target = None
+    for line in lines:
+        heading = re.match(r'^(\w+_ICNIRP):$', line)
+        if heading:
+            target = heading.group(1)
+            continue
+        value = re.match(r'^•\s*(RMSE|MAE):\s*(-?[\d.]+)', line)
+        if target and value:
+            metrics.append((target, best.get(target), f'Test_{value.group(1)}', float(value.group(2))))
+
+    for key, pattern in [('version', r'Version:\s*(\S+)'), ('created', r'Created:\s*(\d[\d\- :]+\d)'),
+                         ('scaler', r'Scaler:\s*(\w+)'), ('n_features', r'INPUT FEATURES \((\d+) total\)')]:
+        match = re.search(pattern, text)
+        if match:
+            attributes.append((key, match.group(1)))
+    return text, metrics, attributes
+
+
+def extract_executive_summary(path):
+    """
+    Text, metrics and attributes of an EXECUTIVE_SUMMARY_<version>.txt file
+
+    Returns:
+        (text, metrics, attributes), see extract_report()
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    metrics, attributes = [], []
+    for model, target, r2, rmse in re.findall(
+            r'│\s*([^│]+?)\s*│\s*(\w+_ICNIRP)\s*│\s*(-?[\d.]+)\s*│\s*(-?[\d.]+)\s*│', text):
+        metrics.append((target, model, 'Test_R²', float(r2)))
+        metrics.append((target, model, 'Test_RMSE', float(rmse)))
+    for target, model in re.findall(r'🏆\s*(\w+_ICNIRP):\s*(.+?)\s*\(', text):
+        attributes.append((f'best_model_{target}', model))
+    for key, pattern in [('scaler', r'Implement (\w+Scaler)'), ('n_samples', r'Total Samples:\s*(\d+)'),
+                         ('n_features', r'Features:\s*(\d+)')]:
+        match = re.search(pattern, text)
+        if match:
+            attributes.append((key, match.group(1)))
+    return text, metrics, attributes
+
+
+def extract_pdf(path):
+    """
+    Text of a PDF written by convert_to_pdf.py (Flate-compressed Tj/TJ operators)
+
+    Returns:
+        (text, [], [])
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    lines = []
+    for stream in re.findall(rb'stream\r?\n(.*?)\r?\nendstream', data, re.S):
+        try:
+            content = zlib.decompress(stream)
+        except zlib.error:
+            content = stream
+        for literal in re.findall(rb'\(((?:\\.|[^\\)])*)\)\s*Tj', content):
+            lines.append(_pdf_string(literal))
+    return '\n'.join(lines), [], []
+
+
+def _pdf_string(literal):
+    """Decode the escapes of a PDF literal string"""
+    escapes = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+    decoded = re.sub(rb'\\([0-7]{1,3}|.)', lambda m: (
+        bytes([int(m.group(1), 8) & 0xFF]) if m.group(1)[:1].isdigit() else escapes.get(m.group(1), m.group(1))
+    ), literal, flags=re.S)
+    return decoded.decode('latin-1')
+
+
+EXTRACTORS = {
+    'report': extract_report,
+    'model_card': extract_model_card,
+    'executive_summary': extract_executive_summary,
+    'pdf': extract_pdf,
+}
+
+
+def parse_metric_filter(expression):
+    """
+    Parse a 'TARGET/MODEL/METRIC<op>VALUE' filter (e.g. 'H_ICNIRP/XGBoost/Test_R2<0.5')
+
+    '*' matches any target or model and R2 is accepted for R².
+
+    Returns:
+        (target, model, metric, op, value) tuple
+    """
+    match = METRIC_FILTER_PATTERN.match(expression.strip())
+    if not match:
+        raise ValueError(f'Invalid metric filter {expression!r}; expected TARGET/MODEL/METRIC<op>VALUE')
+    target, model, metric, op, value = match.groups()
+    return (None if target == '*' else target, None if model == '*' else model,
+            metric.strip().replace('R2', 'R²'), op, float(value))
+
+
+class ReportIndex:
+    """Incremental SQLite FTS5 index of reports and model cards"""
+
+    def __init__(self, path=INDEX_PATH):
+        """
+        Open (or create) the index
+
+        Args:
+            path: SQLite database file, or ':memory:'
+        """
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def update(self, paths=None, prune=True):
+        """
+        Index new and changed documents
+
+        Args:
+            paths: Files or directories (searched recursively); defaults to
+                outputs/ and models/
+            prune: Drop entries of files under the given directories that no
+                longer exist
+
+        Returns:
+            dict of counts: added, updated, touched (hash unchanged),
+            unchanged and removed
+        """
+        files, roots, named = [], [], set()
+        for path in paths or DEFAULT_ROOTS:
+            path = os.path.abspath(path)
+            if os.path.isdir(path):
+                roots.append(path)
+                for directory, _, names in os.walk(path):
+                    files.extend(os.path.join(directory, n) for n in sorted(names) if document_kind(n))
+            else:
+                named.add(path)
+                if os.path.exists(path) and document_kind(path):
+                    files.append(path)
+
+        known = {row[0]: row[1:] for row in self.connection.execute(
+            'SELECT path, id, mtime_ns, size, sha1 FROM documents')}
+        counts = dict.fromkeys(['added', 'updated', 'touched', 'unchanged', 'removed'], 0)
+        with self.connection:
+            for path in files:
+                stat = os.stat(path)
+                entry = known.get(path)
+                if entry and entry[1:3] == (stat.st_mtime_ns, stat.st_size):
+                    counts['unchanged'] += 1
+                    continue
+                sha1 = file_sha1(path)
+                if entry and entry[3] == sha1:
+                    self.connection.execute('UPDATE documents SET mtime_ns = ?, size = ? WHERE id = ?',
+                                            (stat.st_mtime_ns, stat.st_size, entry[0]))
+                    counts['touched'] += 1
+                    continue
+                self._index_file(path, stat, sha1, entry[0] if entry else None)
+                counts['updated' if entry else 'added'] += 1
+
+            if prune:
+                for path, (doc_id, *_) in known.items():
+                    in_scope = path in named or any(path.startswith(root + os.sep) for root in roots)
+                    if in_scope and not os.path.exists(path):
+                        self._delete(doc_id)
+                        counts['removed'] += 1
+        return counts
+
+    def _index_file(self, path, stat, sha1, doc_id=None):
+        """Extract one file and replace its rows"""
+        kind = document_kind(path)
+        try:
+            text, metrics, attributes = EXTRACTORS[kind](path)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError, UnicodeDecodeError) as e:
+            text, metrics, attributes = '', [], [('error', f'{type(e).__name__}: {e}')]
+        version = VERSION_PATTERN.search(os.path.basename(path))
+        version = dict(attributes).get('version') or (version.group(1) if version else None)
+        row = (path, kind, version, stat.st_mtime_ns, stat.st_size, sha1,
+               datetime.datetime.now().isoformat(timespec='seconds'))
+        if doc_id is None:
+            doc_id = self.connection.execute(
+                'INSERT INTO documents (path, kind, version, mtime_ns, size, sha1, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)', row).lastrowid
+        else:
+            self._delete(doc_id, keep_document=True)
+            self.connection.execute(
+                'UPDATE documents SET path = ?, kind = ?, version = ?, mtime_ns = ?, size = ?, sha1 = ?, '
+                'indexed_at = ? WHERE id = ?', row + (doc_id,))
+        self.connection.executemany('INSERT INTO metrics VALUES (?, ?, ?, ?, ?)',
+                                    [(doc_id,) + tuple(m) for m in metrics])
+        self.connection.executemany('INSERT INTO attributes VALUES (?, ?, ?)',
+                                    [(doc_id, k, str(v)) for k, v in attributes])
+        self.connection.execute('INSERT INTO document_text (rowid, text) VALUES (?, ?)', (doc_id, text))
+        return doc_id
+
+    def _delete(self, doc_id, keep_document=False):
+        """Remove the rows of one document"""
+        self.connection.execute('DELETE FROM metrics WHERE doc_id = ?', (doc_id,))
+        self.connection.execute('DELETE FROM attributes WHERE doc_id = ?', (doc_id,))
+        self.connection.execute('DELETE FROM document_text WHERE rowid = ?', (doc_id,))
+        if not keep_document:
+            self.connection.execute('DELETE FROM documents WHERE id = ?', (doc_id,))
+
+    def search(self, text=None, metrics=None, attributes=None, kind=None, limit=100):
+        """
+        Find documents by full text, metric filters and attributes (combined with AND)
+
+        Args:
+            text: FTS5 query (e.g. 'RobustScaler' or '"stacked ensemble" NEAR/5 ridge')
+            metrics: List of (target, model, metric, op, value) filters; None
+                target/model match any (see parse_metric_filter())
+            attributes: Dict of attribute key -> value
+            kind: Document kind ('report', 'pdf', 'model_card', 'executive_summary')
+            limit: Maximum number of documents
+
+        Returns:
+            DataFrame with path, kind, version, indexed_at (and snippet for
+            text queries), ordered by text rank or path
+        """
+        clauses, params = [], []
+        if kind:
+            clauses.append('d.kind = ?')
+            params.append(kind)
+        for target, model, metric, op, value in metrics or []:
+            if op not in FILTER_OPS:
+                raise ValueError(f'Unsupported operator {op!r}')
+            # IN subqueries are answered from the metrics_lookup index
+            condition = ['metric = ?', f'value {"=" if op == "==" else op} ?']
+            condition_params = [metric, value]
+            for column, wanted in (('target', target), ('model', model)):
+                if wanted is not None:
+                    condition.append(f'{column} = ?')
+                    condition_params.append(wanted)
+            clauses.append(f'd.id IN (SELECT doc_id FROM metrics WHERE {" AND ".join(condition)})')
+            params.extend(condition_params)
+        for key, value in (attributes or {}).items():
+            clauses.append('d.id IN (SELECT doc_id FROM attributes WHERE key = ? AND value = ?)')
+            params.extend([key, str(value)])
+
+        if text:
+            sql = ("SELECT d.path, d.kind, d.version, d.indexed_at, "
+                   "snippet(document_text, 0, '[', ']', '...', 12) AS snippet "
+                   "FROM document_text JOIN documents d ON d.id = document_text.rowid "
+                   "WHERE document_text MATCH ?")
+            params.insert(0, text)
+            order = 'ORDER BY rank'
+        else:
+            sql = 'SELECT d.path, d.kind, d.version, d.indexed_at FROM documents d WHERE 1'
+            order = 'ORDER BY d.path'
+        for clause in clauses:
+            sql += f' AND {clause}'
+        sql += f' {order} LIMIT ?'
+        params.append(limit)
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def metrics(self, path=None):
+        """
+        Indexed metric rows
+
+        Args:
+            path: Restrict to one document
+
+        Returns:
+            DataFrame with path, kind, version, target, model, metric, value
+        """
+        sql = ('SELECT d.path, d.kind, d.version, m.target, m.model, m.metric, m.value '
+               'FROM metrics m JOIN documents d ON d.id = m.doc_id')
+        params = []
+        if path:
+            sql += ' WHERE d.path = ?'
+            params.append(os.path.abspath(path))
+        return pd.read_sql_query(sql + ' ORDER BY d.path, m.target, m.model, m.metric', self.connection,
+                                 params=params)
+
+    def stats(self):
+        """Document counts by kind"""
+        return pd.read_sql_query('SELECT kind, COUNT(*) AS documents FROM documents GROUP BY kind ORDER BY kind',
+                                 self.connection)
+
+
+def main():
+    """Update or query the report index"""
+    import time
+
+    parser = argparse.ArgumentParser(description='SQLite FTS5 index of reports and model cards')
+    parser.add_argument('--index', default=INDEX_PATH, help='Index database (defaults to outputs/index/)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    update = commands.add_parser('update', help='Index new and changed files')
+    update.add_argument('paths', nargs='*', help='Files or directories (defaults to outputs/ and models/)')
+    update.add_argument('--no-prune', action='store_true', help='Keep entries of deleted files')
+
+    search = commands.add_parser('search', help='Query the index')
+    search.add_argument('--text', help='FTS5 full-text query')
+    search.add_argument('--metric', action='append', default=[],
+                        help='TARGET/MODEL/METRIC<op>VALUE, e.g. "H_ICNIRP/XGBoost/Test_R2<0.5" (repeatable)')
+    search.add_argument('--attribute', action='append', default=[], help='KEY=VALUE, e.g. scaler=RobustScaler')
+    search.add_argument('--kind', choices=[k for k, _ in DOCUMENT_KINDS])
+    search.add_argument('--limit', type=int, default=100)
+
+    commands.add_parser('stats', help='Document counts by kind')
+    args = parser.parse_args()
+
+    with ReportIndex(args.index) as index:
+        start = time.perf_counter()
+        if args.command == 'update':
+            counts = index.update(args.paths or None, prune=not args.no_prune)
+            print(', '.join(f'{k}: {v}' for k, v in counts.items()))
+        elif args.command == 'search':
+            result = index.search(
+                text=args.text,
+                metrics=[parse_metric_filter(m) for m in args.metric],
+                attributes=dict(a.split('=', 1) for a in args.attribute),
+                kind=args.kind,
+                limit=args.limit,
+            )
+            print(result.to_string(index=False) if len(result) else 'No matching documents')
+        else:
+            print(index.stats().to_string(index=False))
+        print(f"({(time.perf_counter() - start) * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Scenarios Module
+Vectorized what-if evaluation and safe-distance solving on the trained EMF models
+
+A scenario is one combination of measurement conditions (Temp_C,
+Humidity_Pct, Time_Hour, Circuit, Profile_Type; City follows from the
+circuit). The engine scores whole grids of scenarios x distances in large
+batches and answers the field question "from what Distance_m on does
+E_ICNIRP / H_ICNIRP stay below X% of the ICNIRP reference?".
+
+The solver first scans every scenario over a coarse distance grid in one
+batch, takes the last grid distance still at or above the limit, and then
+refines the crossing just beyond it with batched bisection across all
+unresolved scenarios at once. Because the models are not monotone in
+distance, the result is the distance beyond which the scanned predictions
+stay compliant, not merely the first crossing.
+"""
+
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .features import CIRCUIT_CITY, TARGETS, engineer_feature_array
+from .registry import ModelRegistry
+
+
+SCENARIO_COLUMNS = ['City', 'Profile_Type', 'Time_Hour', 'Temp_C', 'Humidity_Pct', 'Circuit']
+
+DEFAULT_DISTANCE_RANGE = (0.0, 400.0)
+DEFAULT_BATCH_ROWS = 1_000_000
+
+
+def scenario_grid(temps, humidities, hours, circuits, profile_types=(0, 1)):
+    """
+    Build the Cartesian product of measurement conditions
+
+    Args:
+        temps: Temp_C values
+        humidities: Humidity_Pct values
+        hours: Time_Hour values
+        circuits: Circuit codes (City is derived from the circuit)
+        profile_types: Profile_Type codes
+
+    Returns:
+        DataFrame with one row per scenario and SCENARIO_COLUMNS
+    """
+    mesh = np.meshgrid(
+        np.asarray(profile_types, dtype=np.float64),
+        np.asarray(hours, dtype=np.float64),
+        np.asarray(temps, dtype=np.float64),
+        np.asarray(humidities, dtype=np.float64),
+        np.asarray(circuits, dtype=np.float64),
+        indexing='ij',
+    )
+    grid = pd.DataFrame({
+        'Profile_Type': mesh[0].ravel(),
+        'Time_Hour': mesh[1].ravel(),
+        'Temp_C': mesh[2].ravel(),
+        'Humidity_Pct': mesh[3].ravel(),
+        'Circuit': mesh[4].ravel(),
+    })
+    grid['City'] = grid['Circuit'].map(CIRCUIT_CITY).astype(np.float64)
+    return grid[SCENARIO_COLUMNS]
+
+
+class ScenarioEngine:
+    """Batched scenario scoring and minimum compliant distance solver"""
+
+    def __init__(self, registry=None, version=None, model='best', batch_rows=DEFAULT_BATCH_ROWS,
+                 cache_dir=None):
+        """
+        Initialize the engine
+
+        Args:
+            registry: ModelRegistry (defaults to the models/ directory)
+            version: Artifact version (defaults to the latest)
+            model: 'best' for best_model_* or 'stacked' for stacked_ensemble_*
+            batch_rows: Rows per predict call
+            cache_dir: Optional directory for on-disk solver results
+        """
+        if model not in ('best', 'stacked'):
+            raise ValueError("model must be 'best' or 'stacked'")
+        self.registry = registry or ModelRegistry()
+        self.version = version or self.registry.latest_version()
+        self.model_kind = model
+        self.batch_rows = batch_rows
+        self.cache_dir = cache_dir
+        self._cache = {}
+
+    def model(self, target):
+        """Return the model used for a target"""
+        if self.model_kind == 'stacked':
+            return self.registry.load_stacked_ensemble(target, self.version)
+        return self.registry.load_best_model(target, self.version)
+
+    def predict(self, scenarios, distances, target):
+        """
+        Predict a target for scenarios at per-scenario distances
+
+        Args:
+            scenarios: DataFrame with SCENARIO_COLUMNS
+            distances: Distance_m per scenario row (array of len(scenarios))
+            target: 'E_ICNIRP' or 'H_ICNIRP'
+
+        Returns:
+            ndarray of predictions
+        """
+        columns = {name: scenarios[name].to_numpy(dtype=np.float64) for name in SCENARIO_COLUMNS}
+        columns['Distance_m'] = np.broadcast_to(np.asarray(distances, dtype=np.float64), len(scenarios))
+        return self._predict_columns(columns, target)
+
+    def evaluate_grid(self, scenarios, distances, targets=TARGETS):
+        """
+        Score every scenario at every distance
+
+        Args:
+            scenarios: DataFrame with SCENARIO_COLUMNS
+            distances: Distance_m values
+            targets: Targets to predict
+
+        Returns:
+            DataFrame in long format: scenario index, scenario columns,
+            Distance_m and one prediction column per target
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        n, g = len(scenarios), len(distances)
+        columns = {name: np.repeat(scenarios[name].to_numpy(dtype=np.float64), g) for name in SCENARIO_COLUMNS}
+        columns['Distance_m'] = np.tile(distances, n)
+
+        result = pd.DataFrame({'scenario': np.repeat(np.arange(n), g), **columns})
+        for target in targets:
+            result[target] = self._predict_columns(columns, target)
+        return result
+
+    def min_compliant_distance(self, scenarios, limit_pct, targets=TARGETS,
+                               distance_range=DEFAULT_DISTANCE_RANGE, scan_step=2.0, tol=0.1):
+        """
+        Solve for the distance beyond which predictions stay below a limit
+
+        Args:
+            scenarios: DataFrame with SCENARIO_COLUMNS
+            limit_pct: Limit as % of the ICNIRP reference (same unit as the targets)
+            targets: Targets to solve for
+            distance_range: (min, max) Distance_m searched
+            scan_step: Coarse scan spacing in metres
+            tol: Bisection tolerance in metres
+
+        Returns:
+            DataFrame of the scenarios with a min_distance_<target> column per
+            target; the minimum distance when compliant everywhere, NaN when
+            not compliant within the range
+        """
+        result = scenarios[SCENARIO_COLUMNS].copy()
+        for target in targets:
+            key = self._cache_key(scenarios, target, limit_pct, distance_range, scan_step, tol)
+            distances = self._cached(key)
+            if distances is None:
+                distances = self._solve(scenarios, target, limit_pct, distance_range, scan_step, tol)
+                self._store(key, distances)
+            result[f'min_distance_{target}'] = distances
+        return result
+
+    def _solve(self, scenarios, target, limit_pct, distance_range, scan_step, tol):
+        """Coarse scan followed by batched bisection"""
+        lo_d, hi_d = distance_range
+        grid = np.arange(lo_d, hi_d + scan_step / 2, scan_step)
+        grid[-1] = min(grid[-1], hi_d)
+        n, g = len(scenarios), len(grid)
+
+        predictions = self.evaluate_grid(scenarios, grid, [target])[target].to_numpy().reshape(n, g)
+        exceeds = predictions >= limit_pct
+        last = np.where(exceeds.any(axis=1), g - 1 - np.argmax(exceeds[:, ::-1], axis=1), -1)
+
+        distances = np.full(n, np.nan)
+        distances[last == -1] = lo_d
+
+        # Bracket [exceeding grid point, next compliant grid point] per scenario
+        active = np.flatnonzero((last >= 0) & (last < g - 1))
+        lo = grid[last[active]]
+        hi = grid[last[active] + 1]
+        subset = scenarios.iloc[active]
+        while len(active) and np.max(hi - lo) > tol:
+            mid = (lo + hi) / 2
+            exceeded = self.predict(subset, mid, target) >= limit_pct
+            lo = np.where(exceeded, mid, lo)
+            hi = np.where(exceeded, hi, mid)
+        distances[active] = hi
+        return distances
+
+    def _predict_columns(self, columns, target):
+        """Engineer features and predict in batches"""
+        model = self.model(target)
+        features = self.registry.features(self.version)
+        n = len(columns['Distance_m'])
+        out = np.empty(n)
+        for start in range(0, n, self.batch_rows):
+            stop = min(start + self.batch_rows, n)
+            batch = {name: values[start:stop] for name, values in columns.items()}
+            X = engineer_feature_array(batch, features)
+            out[start:stop] = self.registry.predict(model, X, self.version)
+        return out
+
+    def _cache_key(self, scenarios, target, limit_pct, distance_range, scan_step, tol):
+        """Hash of everything that determines a solver result"""
+        digest = hashlib.sha256()
+        digest.update(repr((self.version, self.model_kind, target, float(limit_pct),
+                            tuple(map(float, distance_range)), float(scan_step), float(tol))).encode())
+        digest.update(np.ascontiguousarray(scenarios[SCENARIO_COLUMNS].to_numpy(dtype=np.float64)).tobytes())
+        return digest.hexdigest()
+
+    def _cache_path(self, key):
+        """On-disk location of a cached result, grouped by model version"""
+        return os.path.join(self.cache_dir, self.version, f'{key}.joblib')
+
+    def _cached(self, key):
+        """Return a cached result from memory or disk"""
+        if key in self._cache:
+            return self._cache[key]
+        if self.cache_dir and os.path.exists(self._cache_path(key)):
+            self._cache[key] = joblib.load(self._cache_path(key))
+            return self._cache[key]
+        return None
+
+    def _store(self, key, distances):
+        """Cache a result in memory and, if configured, on disk"""
+        self._cache[key] = distances
+        if self.cache_dir:
+            os.makedirs(os.path.dirname(self._cache_path(key)), exist_ok=True)
+            joblib.dump(distances, self._cache_path(key))
@@ -0,0 +1,316 @@
+"""
+Sensitivity Module
+Variance-based global sensitivity analysis (Sobol indices) of the EMF models
+
+The raw measurement inputs are treated as independent random variables
+over their observed ranges: Distance_m, Temp_C, Humidity_Pct and
+Time_Hour uniform, Profile_Type and Circuit uniform over their codes (City
+follows from the circuit). Saltelli's scheme draws two scrambled Sobol'
+matrices A and B and, for every input i, the matrix AB_i (A with column i
+taken from B); the model is evaluated on all N x (d + 2) rows in large
+batches, optionally split across a process pool.
+
+First-order indices use the Saltelli (2010) estimator and total indices
+the Jansen estimator; confidence intervals come from a percentile
+bootstrap over the N sample rows.
+
+The module writes outputs/tables/sobol_indices.csv and
+outputs/plots/15_sobol_indices.png.
+
+Usage:
+    python -m emf_ml.sensitivity --samples 65536 --n-jobs -1
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from .conformal import MODEL_KINDS
+from .features import BASE_DIR, CIRCUIT_CITY, TARGETS, engineer_feature_array, load_measurements
+from .registry import ModelRegistry
+
+
+# Inputs varied by the analysis; categorical inputs take their listed codes
+SOBOL_INPUTS = ['Distance_m', 'Temp_C', 'Humidity_Pct', 'Time_Hour', 'Profile_Type', 'Circuit']
+CATEGORICAL_CODES = {'Profile_Type': [0, 1], 'Circuit': [0, 1, 2]}
+
+DEFAULT_SAMPLES = 1 << 16
+DEFAULT_BOOTSTRAP = 500
+CONFIDENCE = 0.95
+
+# Rows engineered and scored per predict call
+BATCH_ROWS = 1 << 18
+
+SOBOL_TABLE = 'sobol_indices.csv'
+SOBOL_FIGURE = '15_sobol_indices.png'
+
+# Models loaded in pool workers, keyed by (version, kind, target)
+_WORKER_MODELS = {}
+
+
+def input_ranges(data=None):
+    """
+    Observed ranges of the continuous inputs
+
+    Args:
+        data: DataFrame with the raw measurement columns (defaults to load_measurements())
+
+    Returns:
+        dict of input name -> (low, high)
+    """
+    data = load_measurements() if data is None else data
+    return {name: (float(data[name].min()), float(data[name].max()))
+            for name in SOBOL_INPUTS if name not in CATEGORICAL_CODES}
+
+
+def saltelli_matrices(n_samples, ranges, random_state=42):
+    """
+    Draw the Saltelli A, B and AB_i sample matrices
+
+    Args:
+        n_samples: Base sample size N (a power of two keeps the Sobol' sequence balanced)
+        ranges: Continuous input ranges from input_ranges()
+        random_state: Scrambling seed
+
+    Returns:
+        ndarray of shape (d + 2, N, d) in SOBOL_INPUTS column order:
+        A, B, then AB_1 ... AB_d
+    """
+    from scipy.stats import qmc
+
+    d = len(SOBOL_INPUTS)
+    unit = qmc.Sobol(2 * d, scramble=True, seed=random_state).random(n_samples)
+    values = np.empty_like(unit)
+    for i, name in enumerate(SOBOL_INPUTS):
+        for column in (i, i + d):
+            if name in CATEGORICAL_CODES:
+                codes = np.asarray(CATEGORICAL_CODES[name], dtype=np.float64)
+                values[:, column] = codes[np.minimum((unit[:, column] * len(codes)).astype(int), len(codes) - 1)]
+            else:
+                low, high = ranges[name]
+                values[:, column] = low + unit[:, column] * (high - low)
+
+    A, B = values[:, :d], values[:, d:]
+    matrices = np.empty((d + 2, n_samples, d))
+    matrices[0], matrices[1] = A, B
+    for i in range(d):
+        matrices[i + 2] = A
+        matrices[i + 2, :, i] = B[:, i]
+    return matrices
+
+
+def sample_columns(rows):
+    """Raw measurement columns of sample rows in SOBOL_INPUTS order (City from Circuit)"""
+    columns = {name: rows[:, i] for i, name in enumerate(SOBOL_INPUTS)}
+    city = np.array([CIRCUIT_CITY[c] for c in sorted(CIRCUIT_CITY)], dtype=np.float64)
+    columns['City'] = city[columns['Circuit'].astype(np.intp)]
+    return columns
+
+
+def evaluate(rows, target, version, model='best', registry=None, batch_rows=BATCH_ROWS):
+    """
+    Predict a target for raw sample rows in batches
+
+    Args:
+        rows: Array of shape (n_rows, d) in SOBOL_INPUTS order
+        target: Target name
+        version: Artifact version
+        model: 'best' or 'stacked'
+        registry: ModelRegistry (a per-process one is used when omitted)
+        batch_rows: Rows per predict call
+
+    Returns:
+        ndarray of predictions
+    """
+    registry = registry or _worker_registry()
+    key = (version, model, target)
+    if key not in _WORKER_MODELS:
+        _WORKER_MODELS[key] = registry.load(MODEL_KINDS[model], version, target)
+    estimator = _WORKER_MODELS[key]
+    features = registry.features(version)
+
+    out = np.empty(len(rows))
+    for start in range(0, len(rows), batch_rows):
+        chunk = rows[start:start + batch_rows]
+        X = engineer_feature_array(sample_columns(chunk), features)
+        out[start:start + len(chunk)] = registry.predict(estimator, X, version)
+    return out
+
+
+def _worker_registry():
+    """Registry shared by all evaluations in one process"""
+    if 'registry' not in _WORKER_MODELS:
+        _WORKER_MODELS['registry'] = ModelRegistry()
+    return _WORKER_MODELS['registry']
+
+
+def sobol_indices(outputs, n_bootstrap=DEFAULT_BOOTSTRAP, confidence=CONFIDENCE, random_state=0):
+    """
+    First-order and total Sobol indices with bootstrap confidence intervals
+
+    Args:
+        outputs: Model outputs of shape (d + 2, N) for A, B, AB_1 ... AB_d
+        n_bootstrap: Bootstrap resamples of the N rows
+        confidence: Confidence level of the percentile intervals
+        random_state: Bootstrap seed
+
+    Returns:
+        dict of 'S1', 'ST' (arrays of length d) and 'S1_conf', 'ST_conf'
+        (arrays of shape (2, d) with the lower and upper bounds)
+    """
+    f_A, f_B, f_AB = outputs[0], outputs[1], outputs[2:]
+    first, total = _estimators(f_A, f_B, f_AB)
+
+    rng = np.random.default_rng(random_state)
+    n_samples = len(f_A)
+    boot_first = np.empty((n_bootstrap, len(f_AB)))
+    boot_total = np.empty((n_bootstrap, len(f_AB)))
+    per_batch = max(1, (1 << 22) // (n_samples * (len(f_AB) + 2)))
+    for start in range(0, n_bootstrap, per_batch):
+        stop = min(start + per_batch, n_bootstrap)
+        idx = rng.integers(0, n_samples, (stop - start, n_samples))
+        boot_first[start:stop], boot_total[start:stop] = _estimators(f_A[idx], f_B[idx], f_AB[:, idx])
+
+    tail = 50 * (1 - confidence)
+    bounds = [tail, 100 - tail]
+    return {
+        'S1': first,
+        'ST': total,
+        'S1_conf': np.percentile(boot_first, bounds, axis=0),
+        'ST_conf': np.percentile(boot_total, bounds, axis=0),
+    }
+
+
+def _estimators(f_A, f_B, f_AB):
+    """
+    Saltelli first-order and Jansen total-effect estimators
+
+    Arrays may carry leading bootstrap dimensions: f_A and f_B have shape
+    (..., N) and f_AB (d, ..., N).
+    """
+    variance = np.var(np.concatenate([f_A, f_B], axis=-1), axis=-1)
+    first = np.mean(f_B * (f_AB - f_A), axis=-1) / variance
+    total = 0.5 * np.mean((f_A - f_AB) ** 2, axis=-1) / variance
+    return np.moveaxis(first, 0, -1), np.moveaxis(total, 0, -1)
+
+
+def analyze(registry=None, version=None, model='best', n_samples=DEFAULT_SAMPLES,
+            n_bootstrap=DEFAULT_BOOTSTRAP, n_jobs=1, random_state=42):
+    """
+    Sobol indices of every target
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        model: 'best' or 'stacked'
+        n_samples: Base sample size N; the models are evaluated N x (d + 2) times per target
+        n_bootstrap: Bootstrap resamples for the confidence intervals
+        n_jobs: Worker processes for the model evaluations (joblib)
+        random_state: Sampling seed
+
+    Returns:
+        DataFrame with Target, Input, S1, S1_Low, S1_High, ST, ST_Low, ST_High
+    """
+    from joblib import Parallel, delayed
+
+    if model not in ('best', 'stacked'):
+        raise ValueError("model must be 'best' or 'stacked'")
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    matrices = saltelli_matrices(n_samples, input_ranges(), random_state)
+    rows = matrices.reshape(-1, len(SOBOL_INPUTS))
+    parallel = Parallel(n_jobs=n_jobs)
+    n_chunks = max(1, min(len(rows) // BATCH_ROWS, 4 * (parallel.n_jobs if parallel.n_jobs > 0 else os.cpu_count())))
+    chunks = np.array_split(rows, n_chunks) if parallel.n_jobs != 1 else [rows]
+
+    tables = []
+    for target in TARGETS:
+        if len(chunks) == 1:
+            outputs = evaluate(rows, target, version, model, registry)
+        else:
+            outputs = np.concatenate(parallel(delayed(evaluate)(c, target, version, model) for c in chunks))
+        result = sobol_indices(outputs.reshape(len(matrices), n_samples), n_bootstrap)
+        tables.append(pd.DataFrame({
+            'Target': target,
+            'Input': SOBOL_INPUTS,
+            'S1': result['S1'],
+            'S1_Low': result['S1_conf'][0],
+            'S1_High': result['S1_conf'][1],
+            'ST': result['ST'],
+            'ST_Low': result['ST_conf'][0],
+            'ST_High': result['ST_conf'][1],
+        }))
+    return pd.concat(tables, ignore_index=True)
+
+
+def save_sobol_figure(table, path):
+    """
+    Plot first-order and total indices with confidence intervals, one panel per target
+
+    Args:
+        table: DataFrame from analyze()
+        path: Output image path
+
+    Returns:
+        str: The image path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    targets = list(dict.fromkeys(table['Target']))
+    fig, axes = plt.subplots(1, len(targets), figsize=(6 * len(targets), 4), squeeze=False)
+    width = 0.38
+    for ax, target in zip(axes[0], targets):
+        part = table[table['Target'] == target]
+        x = np.arange(len(part))
+        for offset, column, label in [(-width / 2, 'S1', 'First order (S1)'), (width / 2, 'ST', 'Total (ST)')]:
+            errors = np.clip([part[column] - part[f'{column}_Low'], part[f'{column}_High'] - part[column]], 0, None)
+            ax.bar(x + offset, part[column], width, yerr=errors, capsize=3, label=label)
+        ax.set_xticks(x, part['Input'], rotation=30, ha='right')
+        ax.set_ylabel('Sobol index')
+        ax.set_title(target)
+        ax.grid(axis='y', alpha=0.3)
+    axes[0, 0].legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(path, dpi=150)
+    plt.close(fig)
+    return path
+
+
+def main():
+    """Write the Sobol index table and figure"""
+    import time
+
+    from .export import TABLES_DIR
+
+    parser = argparse.ArgumentParser(description='Sobol global sensitivity analysis of the EMF models')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    parser.add_argument('--model', choices=['best', 'stacked'], default='best')
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES, help='Base sample size N')
+    parser.add_argument('--bootstrap', type=int, default=DEFAULT_BOOTSTRAP)
+    parser.add_argument('--n-jobs', type=int, default=1)
+    parser.add_argument('--tables-dir', default=TABLES_DIR)
+    parser.add_argument('--plots-dir', default=os.path.join(BASE_DIR, 'outputs', 'plots'))
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = analyze(version=args.version, model=args.model, n_samples=args.samples,
+                    n_bootstrap=args.bootstrap, n_jobs=args.n_jobs)
+    elapsed = time.perf_counter() - start
+    evaluations = args.samples * (len(SOBOL_INPUTS) + 2) * len(TARGETS)
+    print(f"{evaluations:,} model evaluations in {elapsed:.1f} s ({evaluations / elapsed:,.0f}/s)")
+    print(table.round(3).to_string(index=False))
+
+    os.makedirs(args.tables_dir, exist_ok=True)
+    os.makedirs(args.plots_dir, exist_ok=True)
+    path = os.path.join(args.tables_dir, SOBOL_TABLE)
+    table.to_csv(path, index=False)
+    print(f"Saved: {path}")
+    print(f"Saved: {save_sobol_figure(table, os.path.join(args.plots_dir, SOBOL_FIGURE))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,708 @@
+"""
+Store Module
+Typed, columnar, memory-mapped storage of the EMF measurements
+
+Measurement CSVs are ingested once into a directory tree partitioned by
+City and measurement campaign date:
+
+    data/store/
+        _schema.json                                  column dtypes, decimals, category labels, sources
+        City=1/Campaign_Date=2025-12-01/_partition.json   row count and per-column min/max
+        City=1/Campaign_Date=2025-12-01/Temp_C.bin        one raw little-endian array per column
+
+Categorical codes (Profile_Type, Circuit) are stored as int8, integer
+columns in the narrowest integer type and decimal columns as float32 when
+every value has at most a few decimals and float32 can hold the scaled
+value exactly. The decimal count is recorded in the schema, so decoding
+with `exact=True` rounds back to the float64 values a CSV parser produces
+and widens the integer columns to int64, as pandas would parse them (the
+compact types overflow in feature arithmetic such as Distance_m ** 2).
+Partition keys are stored in the directory names only.
+
+Loads memory-map the column files, read only the projected columns and
+skip whole partitions using the partition keys and the per-partition
+min/max statistics before filtering rows.
+
+Every ingested CSV is recorded as a source with its range of row numbers,
+so one source can be loaded on its own (source_filter) or replaced when
+the file changes (remove_source) without touching the other campaigns.
+open_store() keeps the default data set current this way, holding a lock
+file next to the store while it rebuilds so that concurrent processes
+(such as joblib workers) do not ingest it twice.
+
+Usage:
+    python -m emf_ml.store ingest data/emf-data-sipc-ibri.csv --campaign-date 2025-12-01
+    python -m emf_ml.store info
+"""
+
+import argparse
+import datetime
+import json
+import contextlib
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from .features import BASE_DIR, CITY_NAMES, DATA_PATH
+
+
+STORE_DIR = os.path.join(BASE_DIR, 'data', 'store')
+
+PARTITION_COLUMNS = ['City', 'Campaign_Date']
+
+# Integer-coded categorical columns and their labels
+CATEGORY_LABELS = {
+    'City': CITY_NAMES,
+    'Profile_Type': {0: 'Profile 0', 1: 'Profile 1'},
+    'Circuit': {0: 'Circuit 0', 1: 'Circuit 1', 2: 'Circuit 2'},
+}
+
+# Original row number, used to return rows in ingestion order
+ROW_COLUMN = '_row'
+
+MAX_DECIMALS = 6
+FLOAT32_EXACT = 2 ** 24
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Seconds to wait for another process's rebuild; older lock files are stale
+LOCK_TIMEOUT = 600
+
+FILTER_OPS = {
+    '==': np.equal,
+    '!=': np.not_equal,
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+
+class MeasurementStore:
+    """Partitioned columnar measurement store with memory-mapped loads"""
+
+    def __init__(self, root=None):
+        """
+        Initialize the store
+
+        Args:
+            root: Store directory (defaults to data/store)
+        """
+        self.root = root or STORE_DIR
+        self.schema = self._read_json(self._schema_path()) if self.exists() else None
+        if self.schema is not None:
+            # Sources recorded without a row range were appended in order
+            start = 0
+            for source in self.schema['sources']:
+                source.setdefault('start', start)
+                start = source['start'] + source['rows']
+
+    def exists(self):
+        """Return True when the store has been created"""
+        return os.path.exists(self._schema_path())
+
+    @property
+    def columns(self):
+        """Stored column names in ingestion order (partition keys included)"""
+        return list(self.schema['columns']) if self.schema else []
+
+    @property
+    def n_rows(self):
+        """Total number of stored rows"""
+        return sum(meta['rows'] for meta in self.partitions())
+
+    def ingest_csv(self, path, campaign_date=None, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Append a measurement CSV to the store
+
+        Args:
+            path: CSV file path
+            campaign_date: Campaign date for rows without a Campaign_Date column
+                (date, 'YYYY-MM-DD' string; defaults to the file modification date)
+            chunksize: Rows parsed per chunk
+
+        Returns:
+            int: Number of rows ingested
+        """
+        if campaign_date is None:
+            campaign_date = datetime.date.fromtimestamp(os.path.getmtime(path))
+        stat = os.stat(path)
+        start = self.schema['rows'] if self.schema else 0
+        n_rows = self.ingest_chunks(pd.read_csv(path, chunksize=chunksize), campaign_date)
+        self.schema['sources'].append({
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'start': start,
+            'rows': n_rows,
+        })
+        self._write_json(self._schema_path(), self.schema)
+        return n_rows
+
+    def ingest_chunks(self, chunks, campaign_date=None):
+        """
+        Append DataFrame chunks to the store
+
+        Args:
+            chunks: Iterable of DataFrames with the measurement columns
+            campaign_date: Campaign date for rows without a Campaign_Date column
+
+        Returns:
+            int: Number of rows ingested
+        """
+        total = 0
+        for chunk in chunks:
+            chunk = chunk.loc[:, ~chunk.columns.str.startswith('Unnamed')]
+            if 'Campaign_Date' not in chunk:
+                if campaign_date is None:
+                    raise ValueError('campaign_date is required for data without a Campaign_Date column')
+                chunk = chunk.assign(Campaign_Date=_to_date(campaign_date))
+            if self.schema is None:
+                self.schema = infer_schema(chunk)
+                os.makedirs(self.root, exist_ok=True)
+            self._append(chunk)
+            total += len(chunk)
+        if self.schema is not None:
+            self._write_json(self._schema_path(), self.schema)
+        return total
+
+    def partitions(self, filters=None):
+        """
+        List partitions that can contain rows matching the filters
+
+        Args:
+            filters: List of (column, op, value) predicates, see load()
+
+        Returns:
+            list of dict: Partition metadata with 'path', 'rows', 'keys' and 'stats'
+        """
+        if not self.exists():
+            return []
+        filters = self._normalize_filters(filters)
+        found = []
+        for city_dir in sorted(os.listdir(self.root)):
+            if not city_dir.startswith('City='):
+                continue
+            for date_dir in sorted(os.listdir(os.path.join(self.root, city_dir))):
+                path = os.path.join(self.root, city_dir, date_dir)
+                meta = self._read_json(os.path.join(path, '_partition.json'))
+                meta['path'] = path
+                if all(_may_match(meta, column, op, value) for column, op, value in filters):
+                    found.append(meta)
+        return found
+
+    def load(self, columns=None, filters=None, exact=True, ordered=True):
+        """
+        Load measurements with column projection and predicate pushdown
+
+        Args:
+            columns: Columns to return (defaults to all stored columns)
+            filters: List of (column, op, value) predicates combined with AND;
+                op is one of == != < <= > >= in. City accepts names ('Suhar'),
+                Campaign_Date accepts dates or 'YYYY-MM-DD' strings.
+            exact: Decode columns to the int64/float64 values of the source
+                CSV; False returns the compact stored types
+            ordered: Return rows in ingestion order
+
+        Returns:
+            DataFrame
+        """
+        if not self.exists():
+            raise FileNotFoundError(f'No measurement store at {self.root}')
+        columns = list(columns or [c for c in self.columns if c != ROW_COLUMN])
+        filters = self._normalize_filters(filters)
+        # Evaluate predicates on the filter columns only
+        parts = []
+        for meta in self.partitions(filters):
+            mask = None
+            for column, op, value in filters:
+                hit = _apply_filter(self._read_column(meta, column), op, value)
+                mask = hit if mask is None else mask & hit
+            rows = meta['rows'] if mask is None else int(np.count_nonzero(mask))
+            if rows:
+                parts.append((meta, mask, rows))
+
+        # Output position of every selected row
+        offsets = np.cumsum([0] + [rows for _, _, rows in parts])
+        positions = None
+        if ordered and len(parts) > 1:
+            row_ids = np.concatenate([_select(self._read_column(meta, ROW_COLUMN), mask) for meta, mask, _ in parts])
+            positions = np.empty(len(row_ids), dtype=np.intp)
+            positions[np.argsort(row_ids, kind='stable')] = np.arange(len(row_ids))
+            del row_ids
+
+        result = {}
+        for name in columns:
+            out = None
+            for (meta, mask, _), lo, hi in zip(parts, offsets[:-1], offsets[1:]):
+                values = _select(self._read_column(meta, name), mask)
+                values = self._decode(name, values) if exact else values
+                if out is None:
+                    out = np.empty(offsets[-1], dtype=values.dtype)
+                if positions is None:
+                    out[lo:hi] = values
+                else:
+                    out[positions[lo:hi]] = values
+            if out is None:
+                out = self._decode(name, self._empty(name)) if exact else self._empty(name)
+            result[name] = out
+        return pd.DataFrame(result, columns=columns, copy=False)
+
+    def iter_chunks(self, columns=None, filters=None, exact=True):
+        """
+        Yield one DataFrame per matching partition
+
+        Args:
+            columns: Columns to return
+            filters: Predicates, see load()
+            exact: See load()
+
+        Yields:
+            DataFrame
+        """
+        filters = self._normalize_filters(filters)
+        for meta in self.partitions(filters):
+            store_filter = filters + [('City', '==', meta['keys']['City']),
+                                      ('Campaign_Date', '==', np.datetime64(meta['keys']['Campaign_Date'], 'D'))]
+            yield self.load(columns, store_filter, exact=exact, ordered=False)
+
+    def latest_date(self):
+        """Return the newest campaign date in the store"""
+        dates = [meta['keys']['Campaign_Date'] for meta in self.partitions()]
+        return np.datetime64(max(dates), 'D') if dates else None
+
+    def last_days(self, days):
+        """
+        Filter for the last N days of campaigns, counted back from the newest date
+
+        Args:
+            days: Number of days including the newest campaign date
+
+        Returns:
+            tuple: ('Campaign_Date', '>=', first_date) predicate
+        """
+        return ('Campaign_Date', '>=', self.latest_date() - np.timedelta64(days - 1, 'D'))
+
+    def source(self, path):
+        """Return the source record of the current version of a CSV, or None"""
+        if not self.exists() or not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        for source in self.schema['sources']:
+            if source['path'] == os.path.abspath(path) and source['size'] == stat.st_size \
+                    and source['mtime'] == stat.st_mtime:
+                return source
+        return None
+
+    def is_current(self, path):
+        """Return True when the store holds the current version of a CSV"""
+        return self.source(path) is not None
+
+    def source_filter(self, path):
+        """
+        Predicates selecting the rows ingested from a CSV
+
+        Args:
+            path: CSV file path
+
+        Returns:
+            list of (column, op, value) predicates for load()
+        """
+        source = self.source(path)
+        if source is None:
+            raise KeyError(f'{path} is not in the store or has changed since it was ingested')
+        return [(ROW_COLUMN, '>=', source['start']), (ROW_COLUMN, '<', source['start'] + source['rows'])]
+
+    def remove_source(self, path):
+        """
+        Delete the rows ingested from every version of a CSV
+
+        Partitions holding rows of other sources are rewritten without the
+        removed rows; partitions left empty are deleted.
+
+        Args:
+            path: CSV file path
+
+        Returns:
+            int: Number of rows removed
+        """
+        path = os.path.abspath(path)
+        removed = [s for s in self.schema['sources'] if s['path'] == path] if self.exists() else []
+        if not removed:
+            return 0
+        for meta in self.partitions():
+            row_ids = self._read_column(meta, ROW_COLUMN)
+            drop = np.zeros(meta['rows'], dtype=bool)
+            for source in removed:
+                drop |= (row_ids >= source['start']) & (row_ids < source['start'] + source['rows'])
+            del row_ids
+            if drop.any():
+                self._rewrite_partition(meta, ~drop)
+        self.schema['sources'] = [s for s in self.schema['sources'] if s['path'] != path]
+        self._write_json(self._schema_path(), self.schema)
+        return sum(source['rows'] for source in removed)
+
+    def clear(self):
+        """Delete the store"""
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
+        self.schema = None
+
+    def _append(self, chunk):
+        """Append one chunk to its partitions"""
+        schema = self.schema['columns']
+        missing = [c for c in schema if c != ROW_COLUMN and c not in chunk]
+        if missing:
+            raise ValueError(f'Missing columns: {missing}')
+
+        start = self.schema['rows']
+        encoded = {ROW_COLUMN: np.arange(start, start + len(chunk), dtype=np.int64)}
+        for name, spec in schema.items():
+            if name != ROW_COLUMN and name not in PARTITION_COLUMNS:
+                encoded[name] = _encode(name, chunk[name].to_numpy(), spec)
+
+        cities = chunk['City'].to_numpy(dtype=np.int64)
+        dates = pd.to_datetime(chunk['Campaign_Date']).to_numpy().astype('datetime64[D]')
+        keys = cities * 1_000_000 + dates.astype(np.int64)
+        for key in np.unique(keys):
+            rows = np.flatnonzero(keys == key)
+            city = int(cities[rows[0]])
+            date = str(dates[rows[0]])
+            path = os.path.join(self.root, f'City={city}', f'Campaign_Date={date}')
+            os.makedirs(path, exist_ok=True)
+            meta_path = os.path.join(path, '_partition.json')
+            meta = self._read_json(meta_path) if os.path.exists(meta_path) else {
+                'keys': {'City': city, 'Campaign_Date': date}, 'rows': 0, 'stats': {},
+            }
+            for name, values in encoded.items():
+                part = values[rows]
+                with open(os.path.join(path, f'{name}.bin'), 'ab') as f:
+                    part.tofile(f)
+                lo, hi = part.min().item(), part.max().item()
+                if name in meta['stats']:
+                    lo, hi = min(lo, meta['stats'][name][0]), max(hi, meta['stats'][name][1])
+                meta['stats'][name] = [lo, hi]
+            meta['rows'] += len(rows)
+            self._write_json(meta_path, meta)
+        self.schema['rows'] += len(chunk)
+
+    def _rewrite_partition(self, meta, keep):
+        """Rewrite a partition with the rows of a boolean mask"""
+        if not keep.any():
+            shutil.rmtree(meta['path'])
+            city_dir = os.path.dirname(meta['path'])
+            if not os.listdir(city_dir):
+                os.rmdir(city_dir)
+            return
+        stats = {}
+        for name in self.schema['columns']:
+            if name in PARTITION_COLUMNS:
+                continue
+            values = np.array(self._read_column(meta, name)[keep])
+            path = os.path.join(meta['path'], f'{name}.bin')
+            values.tofile(path + '.tmp')
+            os.replace(path + '.tmp', path)
+            stats[name] = [values.min().item(), values.max().item()]
+        self._write_json(os.path.join(meta['path'], '_partition.json'),
+                         {'keys': meta['keys'], 'rows': int(np.count_nonzero(keep)), 'stats': stats})
+
+    def _read_column(self, meta, name):
+        """Memory-map one column of a partition (partition keys are materialized)"""
+        if name == 'City':
+            return np.full(meta['rows'], meta['keys']['City'], dtype=np.int8)
+        if name == 'Campaign_Date':
+            return np.full(meta['rows'], np.datetime64(meta['keys']['Campaign_Date'], 'D'))
+        dtype = np.dtype(self.schema['columns'][name]['dtype'])
+        if meta['rows'] == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(meta['path'], f'{name}.bin'), dtype=dtype, mode='r', shape=(meta['rows'],))
+
+    def _decode(self, name, values):
+        """Convert stored values to their in-memory representation"""
+        spec = self.schema['columns'].get(name, {})
+        if spec.get('decimals') is not None and values.dtype == np.float32:
+            decoded = values.astype(np.float64)
+            return np.round(decoded, spec['decimals'], out=decoded)
+        if np.issubdtype(values.dtype, np.integer):
+            return values.astype(np.int64)
+        if np.issubdtype(values.dtype, np.floating):
+            return values.astype(np.float64)
+        return np.asarray(values)
+
+    def _empty(self, name):
+        """Empty array of a column's stored dtype"""
+        if name == 'Campaign_Date':
+            return np.empty(0, dtype='datetime64[D]')
+        return np.empty(0, dtype=self.schema['columns'][name]['dtype'])
+
+    def _normalize_filters(self, filters):
+        """Validate predicates and convert labels and dates to stored values"""
+        normalized = []
+        for column, op, value in filters or []:
+            if op != 'in' and op not in FILTER_OPS:
+                raise ValueError(f'Unsupported filter operator: {op}')
+            if self.schema is not None and column not in self.schema['columns']:
+                raise KeyError(f'Unknown column: {column}')
+            values = value if op == 'in' else [value]
+            values = [_stored_value(column, v) for v in values]
+            normalized.append((column, op, values if op == 'in' else values[0]))
+        return normalized
+
+    def _schema_path(self):
+        """Location of the schema file"""
+        return os.path.join(self.root, '_schema.json')
+
+    @staticmethod
+    def _read_json(path):
+        """Read a JSON metadata file"""
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path, data):
+        """Write a JSON metadata file"""
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+def infer_schema(df):
+    """
+    Derive compact column types from a sample of measurements
+
+    Args:
+        df: DataFrame chunk including Campaign_Date
+
+    Returns:
+        dict: Store schema
+    """
+    columns = {}
+    for name in df.columns:
+        if name == 'Campaign_Date':
+            columns[name] = {'dtype': 'datetime64[D]', 'partition': True}
+            continue
+        values = df[name].to_numpy()
+        spec = {'partition': name in PARTITION_COLUMNS}
+        if name in CATEGORY_LABELS:
+            spec['dtype'] = 'int8'
+            spec['categories'] = {str(code): label for code, label in CATEGORY_LABELS[name].items()}
+        elif np.issubdtype(values.dtype, np.integer):
+            spec['dtype'] = _integer_dtype(values)
+        elif np.issubdtype(values.dtype, np.floating):
+            decimals = _decimals(values)
+            spec['dtype'] = 'float32' if decimals is not None else 'float64'
+            spec['decimals'] = decimals
+        else:
+            raise TypeError(f'Unsupported column type for {name}: {values.dtype}')
+        columns[name] = spec
+    columns[ROW_COLUMN] = {'dtype': 'int64', 'partition': False}
+    return {'columns': columns, 'partition_columns': PARTITION_COLUMNS, 'rows': 0, 'sources': []}
+
+
+def open_store(csv_path=None, root=None, campaign_date=None):
+    """
+    Open the measurement store, ingesting the CSV when it is missing or stale
+
+    Rows of an older version of the CSV are removed before the current
+    version is ingested; rows of other sources are kept. Use
+    store.source_filter(csv_path) to load the CSV's rows only.
+
+    Args:
+        csv_path: Source CSV (defaults to data/emf-data-sipc-ibri.csv)
+        root: Store directory (defaults to data/store)
+        campaign_date: Campaign date used when (re)ingesting
+
+    Returns:
+        MeasurementStore
+    """
+    csv_path = csv_path or DATA_PATH
+    store = MeasurementStore(root)
+    if store.is_current(csv_path):
+        return store
+    with _rebuild_lock(store.root):
+        # Another process may have ingested the CSV while this one waited
+        store = MeasurementStore(root)
+        if not store.is_current(csv_path):
+            store.remove_source(csv_path)
+            if store.exists() and not store.partitions():
+                # Nothing else is stored: start over so the schema fits the new CSV
+                store.clear()
+            store.ingest_csv(csv_path, campaign_date)
+    return store
+
+
+@contextlib.contextmanager
+def _rebuild_lock(root, timeout=LOCK_TIMEOUT, poll=0.05):
+    """Hold an exclusive lock file next to the store directory"""
+    path = os.path.abspath(root) + '.lock'
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > timeout:
+                    # Left behind by a process that died during a rebuild
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'Timed out waiting for {path}')
+            time.sleep(poll)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def _integer_dtype(values):
+    """Narrowest signed integer type holding all values"""
+    lo, hi = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for dtype in ('int8', 'int16', 'int32'):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return dtype
+    return 'int64'
+
+
+def _decimals(values):
+    """Smallest decimal count that float32 stores exactly, or None"""
+    finite = values[np.isfinite(values)]
+    if len(finite) == 0:
+        return None
+    peak = np.abs(finite).max()
+    for decimals in range(MAX_DECIMALS + 1):
+        if peak * 10 ** decimals >= FLOAT32_EXACT:
+            return None
+        if np.array_equal(np.round(finite, decimals), finite):
+            return decimals
+    return None
+
+
+def _encode(name, values, spec):
+    """Convert a column chunk to its stored dtype, checking it still fits"""
+    dtype = np.dtype(spec['dtype'])
+    if np.issubdtype(dtype, np.integer):
+        if len(values) and not np.array_equal(values.astype(dtype).astype(np.float64), values.astype(np.float64)):
+            raise ValueError(f'{name} no longer fits {dtype}; rebuild the store')
+        return values.astype(dtype)
+    values = values.astype(np.float64)
+    if dtype == np.float32 and np.isfinite(values).any():
+        decimals = _decimals(values)
+        if decimals is None or decimals > spec['decimals']:
+            raise ValueError(f"{name} needs more than {spec['decimals']} decimals; rebuild the store")
+    return values.astype(dtype)
+
+
+def _to_date(value):
+    """Convert a date, datetime64 or 'YYYY-MM-DD' string to datetime64[D]"""
+    if isinstance(value, (datetime.date, np.datetime64, str)):
+        return np.datetime64(value, 'D')
+    return np.datetime64(pd.Timestamp(value).date(), 'D')
+
+
+def _stored_value(column, value):
+    """Map a filter value to the stored representation"""
+    if column == 'Campaign_Date':
+        return _to_date(value)
+    if column in CATEGORY_LABELS and isinstance(value, str):
+        codes = {label: code for code, label in CATEGORY_LABELS[column].items()}
+        if value not in codes:
+            raise KeyError(f'Unknown {column} label: {value}')
+        return codes[value]
+    return value
+
+
+def _may_match(meta, column, op, value):
+    """Return False when partition keys or min/max prove no row can match"""
+    if column == 'Campaign_Date':
+        lo = hi = np.datetime64(meta['keys']['Campaign_Date'], 'D')
+    elif column == 'City':
+        lo = hi = meta['keys']['City']
+    elif column in meta['stats']:
+        lo, hi = meta['stats'][column]
+    else:
+        return True
+    if op == 'in':
+        return any(lo <= v <= hi for v in value)
+    if op == '==':
+        return lo <= value <= hi
+    if op == '!=':
+        return not (lo == hi == value)
+    if op == '<':
+        return lo < value
+    if op == '<=':
+        return lo <= value
+    if op == '>':
+        return hi > value
+    return hi >= value
+
+
+def filter_frame(df, filters):
+    """
+    Apply load() predicates to a DataFrame of measurements
+
+    Args:
+        df: DataFrame, e.g. parsed from a CSV
+        filters: List of (column, op, value) predicates, see MeasurementStore.load()
+
+    Returns:
+        DataFrame of the matching rows with a fresh index
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in filters or []:
+        if op != 'in' and op not in FILTER_OPS:
+            raise ValueError(f'Unsupported filter operator: {op}')
+        if column not in df:
+            raise KeyError(f'Unknown column: {column}')
+        values = [_stored_value(column, v) for v in (value if op == 'in' else [value])]
+        mask &= _apply_filter(df[column].to_numpy(), op, values if op == 'in' else values[0])
+    return df[mask].reset_index(drop=True)
+
+
+def _select(values, mask):
+    """Apply an optional row mask"""
+    return values if mask is None else values[mask]
+
+
+def _apply_filter(values, op, value):
+    """Row mask of one predicate"""
+    if op == 'in':
+        return np.isin(values, value)
+    return FILTER_OPS[op](values, value)
+
+
+def main():
+    """Ingest measurement CSVs or describe the store"""
+    parser = argparse.ArgumentParser(description='EMF measurement store')
+    parser.add_argument('--root', help='Store directory (defaults to data/store)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help='Append measurement CSVs')
+    ingest.add_argument('inputs', nargs='+')
+    ingest.add_argument('--campaign-date', help='YYYY-MM-DD (defaults to the file modification date)')
+    ingest.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    commands.add_parser('info', help='List columns and partitions')
+    args = parser.parse_args()
+
+    store = MeasurementStore(args.root)
+    if args.command == 'ingest':
+        for path in args.inputs:
+            rows = store.ingest_csv(path, args.campaign_date, args.chunksize)
+            print(f"Ingested {rows:,} rows from {path}")
+        return
+
+    for name, spec in store.schema['columns'].items():
+        decimals = f", {spec['decimals']} decimals" if spec.get('decimals') is not None else ''
+        print(f"{name:15s} {spec['dtype']}{decimals}")
+    for meta in store.partitions():
+        print(f"City={meta['keys']['City']} Campaign_Date={meta['keys']['Campaign_Date']}: {meta['rows']:,} rows")
+
+
+if __name__ == '__main__':
+    main()
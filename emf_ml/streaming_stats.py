@@ -0,0 +1,453 @@
+"""
+Streaming Statistics Module
+One-pass, mergeable descriptive statistics for the Descriptive Statistics table
+
+Moments (count, mean, M2, M3, M4) are accumulated per column with the
+pairwise update of Chan et al., so chunk results are exact and merge in any
+order. Median and quartiles come from a KLL quantile sketch; while a column
+has fewer values than the sketch capacity the quantiles are exact and match
+pandas.
+
+Typical daily refresh:
+    stats = StreamingDescriptiveStats.load('stats_state.json')
+    stats.update(new_readings)
+    stats.save('stats_state.json')
+    stats.to_frame().to_csv('outputs/tables/01_descriptive_statistics.csv')
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Columns and order of outputs/tables/01_descriptive_statistics.csv
+STATS_COLUMNS = [
+    'count', 'mean', 'median', 'std', 'variance', 'min', '25%', '50%', '75%',
+    'max', 'range', 'IQR', 'skewness', 'kurtosis'
+]
+
+DEFAULT_SKETCH_SIZE = 200
+
+
+class MomentAccumulator:
+    """Exact per-column count, mean and central moment sums up to order 4"""
+
+    def __init__(self, n_columns):
+        """
+        Initialize empty moments
+
+        Args:
+            n_columns: Number of columns tracked
+        """
+        self.n = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.m3 = np.zeros(n_columns)
+        self.m4 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, values):
+        """
+        Add a chunk of rows
+
+        Args:
+            values: float array of shape (n_rows, n_columns); NaN values are skipped
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        n = valid.sum(axis=0).astype(np.float64)
+        safe_n = np.maximum(n, 1)
+        filled = np.where(valid, values, 0.0)
+        mean = filled.sum(axis=0) / safe_n
+        dev = np.where(valid, values - mean, 0.0)
+        dev2 = dev * dev
+
+        chunk = MomentAccumulator(values.shape[1])
+        chunk.n = n
+        chunk.mean = mean
+        chunk.m2 = dev2.sum(axis=0)
+        chunk.m3 = (dev2 * dev).sum(axis=0)
+        chunk.m4 = (dev2 * dev2).sum(axis=0)
+        chunk.min = np.where(valid, values, np.inf).min(axis=0)
+        chunk.max = np.where(valid, values, -np.inf).max(axis=0)
+        return self.merge(chunk)
+
+    def merge(self, other):
+        """
+        Combine with another accumulator in place
+
+        Args:
+            other: MomentAccumulator over the same columns
+
+        Returns:
+            self
+        """
+        na, nb = self.n, other.n
+        n = na + nb
+        safe_n = np.where(n > 0, n, 1)
+        delta = other.mean - self.mean
+        delta2 = delta * delta
+
+        mean = self.mean + delta * nb / safe_n
+        m2 = self.m2 + other.m2 + delta2 * na * nb / safe_n
+        m3 = (self.m3 + other.m3
+              + delta2 * delta * na * nb * (na - nb) / safe_n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / safe_n)
+        m4 = (self.m4 + other.m4
+              + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / safe_n ** 3
+              + 6 * delta2 * (na * na * other.m2 + nb * nb * self.m2) / safe_n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / safe_n)
+
+        # An empty side contributes nothing; keep the other side's values exactly
+        self.mean = np.where(nb == 0, self.mean, np.where(na == 0, other.mean, mean))
+        self.m2 = np.where(nb == 0, self.m2, np.where(na == 0, other.m2, m2))
+        self.m3 = np.where(nb == 0, self.m3, np.where(na == 0, other.m3, m3))
+        self.m4 = np.where(nb == 0, self.m4, np.where(na == 0, other.m4, m4))
+        self.n = n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def variance(self):
+        """Sample variance (ddof=1)"""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.n > 1, self.m2 / (self.n - 1), np.nan)
+
+    def skewness(self):
+        """Adjusted Fisher-Pearson sample skewness, as in pandas"""
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g1 = np.sqrt(n) * self.m3 / self.m2 ** 1.5
+            skew = g1 * np.sqrt(n * (n - 1)) / (n - 2)
+            return np.where((n > 2) & (self.m2 > 0), skew, np.where(n > 2, 0.0, np.nan))
+
+    def kurtosis(self):
+        """Bias-corrected sample excess kurtosis, as in pandas"""
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            g2 = n * self.m4 / self.m2 ** 2 - 3
+            kurt = ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+            return np.where((n > 3) & (self.m2 > 0), kurt, np.where(n > 3, 0.0, np.nan))
+
+    def to_dict(self):
+        """Return a JSON-serializable state"""
+        return {key: getattr(self, key).tolist() for key in ['n', 'mean', 'm2', 'm3', 'm4', 'min', 'max']}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore an accumulator saved with to_dict()"""
+        acc = cls(len(state['n']))
+        for key, values in state.items():
+            setattr(acc, key, np.asarray(values, dtype=np.float64))
+        return acc
+
+
+class QuantileSketch:
+    """Mergeable KLL quantile sketch for one column"""
+
+    def __init__(self, k=DEFAULT_SKETCH_SIZE, seed=None):
+        """
+        Initialize an empty sketch
+
+        Args:
+            k: Capacity of the top compactor; rank error is roughly 1.7 / k
+            seed: Seed for the compaction coin flips
+        """
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def is_exact(self):
+        """True while no compaction has happened"""
+        return len(self.levels) == 1
+
+    def update(self, values):
+        """
+        Add values to the sketch
+
+        Args:
+            values: 1-D array; NaN values are skipped
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Combine with another sketch in place
+
+        Args:
+            other: QuantileSketch
+
+        Returns:
+            self
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Estimate quantiles
+
+        Args:
+            q: Quantile or array of quantiles in [0, 1]
+
+        Returns:
+            float or ndarray of estimates (exact, linearly interpolated,
+            while is_exact is True)
+        """
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        if self.is_exact:
+            return np.quantile(self.levels[0], q)
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        ranks = np.asarray(q, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks, side='left'), len(items) - 1)
+        return items[positions]
+
+    def cdf(self, values):
+        """
+        Estimate mid-rank CDF positions, (count(< v) + count(<= v)) / (2 n)
+
+        Ties share their average rank, as in Spearman correlation. Exact
+        while is_exact is True.
+
+        Args:
+            values: Array of values
+
+        Returns:
+            ndarray of positions in [0, 1]
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.n == 0:
+            return np.full(values.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.concatenate([[0.0], np.cumsum(weights[order])])
+        below = cumulative[np.searchsorted(items, values, side='left')]
+        at_or_below = cumulative[np.searchsorted(items, values, side='right')]
+        return (below + at_or_below) / (2 * cumulative[-1])
+
+    def _capacity(self, level):
+        """Compactor capacity, shrinking geometrically below the top level"""
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        """Compact every level that is over capacity"""
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                keep = items[len(items) - len(items) % 2:]  # Odd item stays at this level
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def to_dict(self):
+        """Return a JSON-serializable state"""
+        return {'k': self.k, 'n': self.n, 'levels': [items.tolist() for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a sketch saved with to_dict()"""
+        sketch = cls(state['k'])
+        sketch.n = state['n']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        return sketch
+
+
+class StreamingDescriptiveStats:
+    """Chunked, mergeable version of the descriptive statistics table"""
+
+    def __init__(self, columns, k=DEFAULT_SKETCH_SIZE):
+        """
+        Initialize empty statistics
+
+        Args:
+            columns: Column names to track
+            k: Quantile sketch size
+        """
+        self.columns = list(columns)
+        self.moments = MomentAccumulator(len(self.columns))
+        self.sketches = [QuantileSketch(k) for _ in self.columns]
+
+    def update(self, chunk):
+        """
+        Add a chunk of measurements
+
+        Args:
+            chunk: DataFrame containing the tracked columns
+
+        Returns:
+            self
+        """
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        self.moments.update(values)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(values[:, i])
+        return self
+
+    def merge(self, other):
+        """
+        Combine with statistics computed on other chunks, workers or days
+
+        Args:
+            other: StreamingDescriptiveStats over the same columns
+
+        Returns:
+            self
+        """
+        if other.columns != self.columns:
+            raise ValueError('Cannot merge statistics over different columns')
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def to_frame(self):
+        """
+        Return the statistics in the 01_descriptive_statistics.csv layout
+
+        Returns:
+            DataFrame indexed by column name
+        """
+        m = self.moments
+        quartiles = np.array([sketch.quantile([0.25, 0.5, 0.75]) for sketch in self.sketches])
+        variance = m.variance()
+        with np.errstate(invalid='ignore'):
+            stats = {
+                'count': m.n,
+                'mean': np.where(m.n > 0, m.mean, np.nan),
+                'median': quartiles[:, 1],
+                'std': np.sqrt(variance),
+                'variance': variance,
+                'min': np.where(m.n > 0, m.min, np.nan),
+                '25%': quartiles[:, 0],
+                '50%': quartiles[:, 1],
+                '75%': quartiles[:, 2],
+                'max': np.where(m.n > 0, m.max, np.nan),
+                'range': np.where(m.n > 0, m.max - m.min, np.nan),
+                'IQR': quartiles[:, 2] - quartiles[:, 0],
+                'skewness': m.skewness(),
+                'kurtosis': m.kurtosis(),
+            }
+        return pd.DataFrame(stats, index=self.columns, columns=STATS_COLUMNS)
+
+    def to_dict(self):
+        """Return a JSON-serializable state"""
+        return {
+            'columns': self.columns,
+            'moments': self.moments.to_dict(),
+            'sketches': [sketch.to_dict() for sketch in self.sketches],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore statistics saved with to_dict()"""
+        stats = cls(state['columns'])
+        stats.moments = MomentAccumulator.from_dict(state['moments'])
+        stats.sketches = [QuantileSketch.from_dict(s) for s in state['sketches']]
+        return stats
+
+    def save(self, path):
+        """Save the accumulator state as JSON"""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Load an accumulator state saved with save()"""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def describe_chunks(chunks, columns=None, k=DEFAULT_SKETCH_SIZE):
+    """
+    Compute descriptive statistics in one pass over DataFrame chunks
+
+    Args:
+        chunks: Iterable of DataFrames
+        columns: Columns to track (defaults to the numeric columns of the first chunk)
+        k: Quantile sketch size
+
+    Returns:
+        StreamingDescriptiveStats
+    """
+    stats = None
+    for chunk in chunks:
+        if stats is None:
+            columns = columns or list(chunk.select_dtypes('number').columns)
+            stats = StreamingDescriptiveStats(columns, k)
+        stats.update(chunk)
+    if stats is None:
+        stats = StreamingDescriptiveStats(columns or [], k)
+    return stats
+
+
+def describe_csv(path, columns=None, chunksize=100_000, k=DEFAULT_SKETCH_SIZE):
+    """
+    Compute descriptive statistics of a CSV file without loading it whole
+
+    Args:
+        path: CSV file path
+        columns: Columns to track
+        chunksize: Rows read per chunk
+        k: Quantile sketch size
+
+    Returns:
+        StreamingDescriptiveStats
+    """
+    return describe_chunks(pd.read_csv(path, chunksize=chunksize), columns, k)
+
+
+def main():
+    """Refresh the descriptive statistics table from new measurement files"""
+    parser = argparse.ArgumentParser(description='Update streaming descriptive statistics')
+    parser.add_argument('inputs', nargs='+', help='New measurement CSV files')
+    parser.add_argument('--state', required=True, help='Accumulator state JSON (created if missing)')
+    parser.add_argument('--output', help='Descriptive statistics CSV to write')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    stats = StreamingDescriptiveStats.load(args.state) if os.path.exists(args.state) else None
+    for path in args.inputs:
+        new = describe_csv(path, stats.columns if stats else None, args.chunksize)
+        stats = new if stats is None else stats.merge(new)
+        print(f"Added {path}")
+
+    stats.save(args.state)
+    print(f"State saved: {args.state}")
+    if args.output:
+        stats.to_frame().to_csv(args.output)
+        print(f"Table saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
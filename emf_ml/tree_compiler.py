@@ -0,0 +1,433 @@
+"""
+Tree Compiler Module
+Compiles fitted tree ensembles (XGBoost, Random Forest) into flat NumPy node arrays
+
+The compiled form holds one contiguous array per node attribute across all
+trees. Nodes are laid out breadth-first with siblings adjacent, so the right
+child of a node is always `left + 1` and a step down the tree is a single
+gather plus the comparison result. Leaves point to themselves and never move.
+
+Predictions are bit-for-bit identical to the original models:
+• Inputs are cast to float32, as both XGBoost and scikit-learn do
+• XGBoost splits use `x < threshold`; scikit-learn `x <= threshold` splits
+  are rewritten as `x < next_float32(threshold)`, which is equivalent for
+  every float32 input
+• Leaf values are accumulated sequentially in tree order, in float32 for
+  XGBoost and float64 for scikit-learn, then averaged for forests
+
+Random Forest predictions match `predict` exactly when the forest runs with
+n_jobs=1; with threaded prediction scikit-learn's own summation order (and
+so the last bit) can vary between calls.
+
+Compiled models are saved as .npz files that load with NumPy alone.
+"""
+
+import json
+
+import numpy as np
+
+
+# Batches up to this size advance all trees at once (lowest per-call overhead);
+# larger batches are scored tree by tree over cache-sized row chunks
+SMALL_BATCH_ROWS = 64
+CHUNK_ROWS = 16384
+
+# Objectives whose prediction is the raw margin (identity link)
+IDENTITY_OBJECTIVES = (
+    'reg:squarederror',
+    'reg:absoluteerror',
+    'reg:pseudohubererror',
+    'reg:quantileerror',
+)
+
+
+class CompiledTreeEnsemble:
+    """Array-based tree ensemble predictor"""
+
+    def __init__(self, feature, threshold, left, default_left, value, roots, depths,
+                 base_score=0.0, average=False, n_features=None, source='', cover=None):
+        """
+        Initialize the compiled ensemble
+
+        Args:
+            feature: Split feature per node (0 for leaves)
+            threshold: float32 split threshold per node; rows go left when
+                x < threshold (NaN for leaves)
+            left: Global index of the left child; the right child is left + 1
+                and leaves point to themselves
+            default_left: Direction taken for missing (NaN) values
+            value: Leaf values of shape (n_nodes, n_outputs); the dtype is the
+                accumulation dtype
+            roots: Global index of each tree's root node
+            depths: Depth of each tree
+            base_score: Initial value of the accumulated prediction
+            average: Divide the accumulated sum by the number of trees
+            n_features: Number of input features
+            source: Name of the original estimator class
+            cover: Optional training weight (sample count or hessian sum) per
+                node, needed for TreeSHAP attributions
+        """
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=np.float32)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value = np.ascontiguousarray(value)
+        if self.value.ndim == 1:
+            self.value = self.value[:, None]
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.depths = np.ascontiguousarray(depths, dtype=np.int32)
+        self.base_score = self.value.dtype.type(base_score)
+        self.average = bool(average)
+        self.n_features = n_features
+        self.source = source
+        self.cover = None if cover is None else np.ascontiguousarray(cover, dtype=np.float64)
+
+    @property
+    def n_trees(self):
+        """Number of trees"""
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        """Total number of nodes across all trees"""
+        return len(self.feature)
+
+    @property
+    def n_outputs(self):
+        """Number of predicted outputs"""
+        return self.value.shape[1]
+
+    @property
+    def max_depth(self):
+        """Maximum depth over all trees"""
+        return int(self.depths.max()) if len(self.depths) else 0
+
+    @property
+    def right(self):
+        """Global index of the right child (self for leaves)"""
+        is_leaf = self.left == np.arange(self.n_nodes)
+        return np.where(is_leaf, self.left, self.left + 1)
+
+    def apply(self, X):
+        """
+        Return the leaf index reached in every tree
+
+        Args:
+            X: Array-like of shape (n_rows, n_features)
+
+        Returns:
+            ndarray of shape (n_rows, n_trees) with global leaf indices
+        """
+        X = self._validate(X)
+        offset = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+        idx = np.tile(self.roots, (X.shape[0], 1))
+        has_missing = bool(np.isnan(X).any())
+        for _ in range(self.max_depth):
+            idx = self._step(X.ravel(), offset, idx, has_missing)
+        return idx
+
+    def predict(self, X, chunk_size=CHUNK_ROWS):
+        """
+        Predict a batch of rows
+
+        Args:
+            X: Array-like of shape (n_rows, n_features)
+            chunk_size: Rows scored together on the tree-by-tree path
+
+        Returns:
+            ndarray of shape (n_rows,) or (n_rows, n_outputs)
+        """
+        X = self._validate(X)
+        if X.shape[0] <= SMALL_BATCH_ROWS:
+            out = self._predict_all_trees(X)
+        else:
+            out = np.empty((X.shape[0], self.n_outputs), dtype=self.value.dtype)
+            for start in range(0, X.shape[0], chunk_size):
+                stop = min(start + chunk_size, X.shape[0])
+                out[start:stop] = self._predict_by_tree(np.ascontiguousarray(X[start:stop]))
+        if self.average:
+            out /= self.n_trees
+        return out[:, 0] if self.n_outputs == 1 else out
+
+    def _validate(self, X):
+        """Convert input to a C-contiguous float32 matrix"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.n_features is not None and X.shape[1] != self.n_features:
+            raise ValueError(f'X has {X.shape[1]} features, but the model expects {self.n_features}')
+        return X
+
+    def _step(self, X_flat, offset, idx, has_missing):
+        """Move every index one level down its tree"""
+        x = np.take(X_flat, np.take(self.feature, idx) + offset)
+        go_right = x >= np.take(self.threshold, idx)
+        if has_missing:
+            go_right = np.where(np.isnan(x), ~np.take(self.default_left, idx), go_right)
+        next_idx = np.take(self.left, idx)
+        next_idx += go_right
+        return next_idx
+
+    def _predict_all_trees(self, X):
+        """Advance all trees together; used for small batches"""
+        leaves = np.take(self.value, self.apply(X), axis=0)  # (rows, trees, outputs)
+        # cumsum adds strictly in tree order, matching the original accumulation
+        terms = np.empty((X.shape[0], self.n_trees + 1, self.n_outputs), dtype=self.value.dtype)
+        terms[:, 0] = self.base_score
+        terms[:, 1:] = leaves
+        return np.cumsum(terms, axis=1, dtype=self.value.dtype)[:, -1]
+
+    def _predict_by_tree(self, X):
+        """Score one row chunk tree by tree; used for large batches"""
+        X_flat = X.ravel()
+        offset = np.arange(X.shape[0], dtype=np.intp) * X.shape[1]
+        has_missing = bool(np.isnan(X).any())
+        out = np.full((X.shape[0], self.n_outputs), self.base_score, dtype=self.value.dtype)
+        for root, depth in zip(self.roots, self.depths):
+            idx = np.full(X.shape[0], root, dtype=np.intp)
+            for _ in range(depth):
+                idx = self._step(X_flat, offset, idx, has_missing)
+            out += np.take(self.value, idx, axis=0)
+        return out
+
+    def save(self, path):
+        """
+        Save the compiled model as a standalone .npz file
+
+        Args:
+            path: Destination file path
+        """
+        meta = {
+            'base_score': float(self.base_score),
+            'average': self.average,
+            'n_features': self.n_features,
+            'source': self.source,
+        }
+        extra = {} if self.cover is None else {'cover': self.cover}
+        np.savez_compressed(
+            path,
+            feature=self.feature.astype(np.int32),
+            threshold=self.threshold,
+            left=self.left.astype(np.int32),
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots.astype(np.int32),
+            depths=self.depths,
+            meta=np.array(json.dumps(meta)),
+            **extra,
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a compiled model saved with save()
+
+        Args:
+            path: .npz file path
+
+        Returns:
+            CompiledTreeEnsemble
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            cover = data['cover'] if 'cover' in data.files else None
+            return cls(
+                data['feature'], data['threshold'], data['left'], data['default_left'],
+                data['value'], data['roots'], data['depths'], cover=cover, **meta
+            )
+
+
+def compile_model(model):
+    """
+    Compile a fitted tree model
+
+    Args:
+        model: XGBRegressor/Booster, RandomForestRegressor, ExtraTreesRegressor
+            or DecisionTreeRegressor
+
+    Returns:
+        CompiledTreeEnsemble
+    """
+    if hasattr(model, 'get_booster') or type(model).__name__ == 'Booster':
+        return compile_xgboost(model)
+    if hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+        return compile_sklearn_forest(model)
+    raise TypeError(f'Cannot compile model of type {type(model).__name__}')
+
+
+def compile_xgboost(model):
+    """
+    Compile an XGBoost regressor
+
+    Args:
+        model: XGBRegressor or xgboost.Booster
+
+    Returns:
+        CompiledTreeEnsemble with float32 accumulation
+    """
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    model_json = json.loads(booster.save_raw(raw_format='json'))
+    learner = model_json['learner']
+    objective = learner['objective']['name']
+    if objective not in IDENTITY_OBJECTIVES:
+        raise ValueError(f'Unsupported XGBoost objective: {objective}')
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError(f"Unsupported XGBoost booster: {learner['gradient_booster']['name']}")
+
+    model_param = learner['learner_model_param']
+    if int(model_param.get('num_target', 1)) > 1:
+        raise ValueError('Multi-target XGBoost models are not supported')
+    base_score = np.float32(model_param['base_score'].strip('[]'))
+
+    gbtree = learner['gradient_booster']['model']
+    trees = gbtree['trees']
+    # XGBRegressor.predict stops at best_iteration when early stopping was used
+    if hasattr(model, 'get_booster'):
+        best_iteration = getattr(booster, 'best_iteration', None)
+        indptr = gbtree.get('iteration_indptr')
+        if best_iteration is not None and indptr:
+            trees = trees[:indptr[int(best_iteration) + 1]]
+
+    builder = _ArrayBuilder()
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError('Categorical splits are not supported')
+        builder.add_tree(
+            feature=np.asarray(tree['split_indices']),
+            threshold=np.asarray(tree['split_conditions'], dtype=np.float32),
+            left=np.asarray(tree['left_children']),
+            right=np.asarray(tree['right_children']),
+            default_left=np.asarray(tree['default_left'], dtype=bool),
+            value=np.asarray(tree['split_conditions'], dtype=np.float32),
+            cover=np.asarray(tree['sum_hessian'], dtype=np.float64),
+        )
+
+    return builder.build(np.float32, base_score, average=False,
+                         n_features=int(model_param['num_feature']), source=type(model).__name__)
+
+
+def compile_sklearn_forest(model):
+    """
+    Compile a scikit-learn tree regressor or forest of trees
+
+    Args:
+        model: RandomForestRegressor, ExtraTreesRegressor or DecisionTreeRegressor
+
+    Returns:
+        CompiledTreeEnsemble with float64 accumulation
+    """
+    estimators = model.estimators_ if hasattr(model, 'estimators_') else [model]
+
+    builder = _ArrayBuilder()
+    for estimator in estimators:
+        tree = estimator.tree_
+        missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+        builder.add_tree(
+            feature=tree.feature,
+            threshold=float32_strict_threshold(tree.threshold),
+            left=tree.children_left,
+            right=tree.children_right,
+            default_left=np.asarray(missing_left, dtype=bool),
+            value=tree.value[:, :, 0],
+            cover=tree.weighted_n_node_samples,
+        )
+
+    return builder.build(np.float64, 0.0, average=hasattr(model, 'estimators_'),
+                         n_features=int(model.n_features_in_), source=type(model).__name__)
+
+
+def float32_strict_threshold(threshold):
+    """
+    Convert float64 `x <= t` thresholds into float32 `x < t'` thresholds
+
+    For float32 x, `x <= t` holds exactly when x is at most the largest
+    float32 not above t, i.e. when x is below the next float32 after it.
+
+    Args:
+        threshold: float64 array of thresholds
+
+    Returns:
+        float32 array of strict thresholds
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    below = threshold.astype(np.float32)
+    rounded_up = below.astype(np.float64) > threshold
+    below[rounded_up] = np.nextafter(below[rounded_up], np.float32(-np.inf))
+    return np.nextafter(below, np.float32(np.inf))
+
+
+def load_compiled(path):
+    """Load a compiled model saved with CompiledTreeEnsemble.save()"""
+    return CompiledTreeEnsemble.load(path)
+
+
+class _ArrayBuilder:
+    """Collects trees in sibling-adjacent breadth-first layout"""
+
+    def __init__(self):
+        self.parts = {key: [] for key in ['feature', 'threshold', 'left', 'default_left', 'value', 'cover']}
+        self.roots = []
+        self.depths = []
+        self.n_nodes = 0
+
+    def add_tree(self, feature, threshold, left, right, default_left, value, cover=None):
+        """
+        Append one tree given in its native node order
+
+        Args:
+            feature: Split feature per node
+            threshold: float32 strict (x < threshold) split threshold per node
+            left: Left child per node (-1 for leaves)
+            right: Right child per node (-1 for leaves)
+            default_left: Missing-value direction per node
+            value: Node values, shape (n_nodes,) or (n_nodes, n_outputs)
+            cover: Optional training weight per node
+        """
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        is_leaf = left == -1
+
+        # Breadth-first renumbering that gives every sibling pair adjacent slots
+        order = [0]
+        depth = {0: 0}
+        for node in order:
+            if not is_leaf[node]:
+                order.extend((left[node], right[node]))
+                depth[left[node]] = depth[right[node]] = depth[node] + 1
+        order = np.asarray(order)
+        new_id = np.empty(len(left), dtype=np.int64)
+        new_id[order] = np.arange(len(order))
+
+        leaf = is_leaf[order]
+        self.parts['feature'].append(np.where(leaf, 0, np.asarray(feature)[order]))
+        self.parts['threshold'].append(np.where(leaf, np.float32(np.nan), np.asarray(threshold)[order]))
+        self.parts['left'].append(np.where(leaf, np.arange(len(order)), new_id[left[order]]) + self.n_nodes)
+        self.parts['default_left'].append(np.where(leaf, True, np.asarray(default_left)[order]))
+        value = np.asarray(value)[order]
+        self.parts['value'].append(np.where(leaf.reshape((-1,) + (1,) * (value.ndim - 1)), value, 0))
+        self.parts['cover'].append(None if cover is None else np.asarray(cover)[order])
+
+        self.roots.append(self.n_nodes)
+        self.depths.append(max(depth.values()))
+        self.n_nodes += len(order)
+
+    def build(self, value_dtype, base_score, average, n_features, source):
+        """Concatenate the collected trees into a CompiledTreeEnsemble"""
+        values = [np.asarray(v, dtype=value_dtype).reshape(len(v), -1) for v in self.parts['value']]
+        covers = self.parts['cover']
+        cover = None if any(c is None for c in covers) else np.concatenate(covers)
+        return CompiledTreeEnsemble(
+            feature=np.concatenate(self.parts['feature']),
+            threshold=np.concatenate(self.parts['threshold']),
+            left=np.concatenate(self.parts['left']),
+            default_left=np.concatenate(self.parts['default_left']),
+            value=np.concatenate(values),
+            roots=self.roots,
+            depths=self.depths,
+            base_score=base_score,
+            average=average,
+            n_features=n_features,
+            source=source,
+            cover=cover,
+        )
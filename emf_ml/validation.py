@@ -0,0 +1,301 @@
+"""
+Validation Module
+Input validation and out-of-distribution scoring in front of the EMF models
+
+An input profile is derived once per model version from the training split
+and saved next to the model artifacts as input_profile_<version>.joblib:
+
+- allowed category codes for City, Profile_Type and Circuit, and the
+  City / Circuit pairing (each circuit belongs to one city)
+- per-column ranges: the training min/max widened by RANGE_MARGIN of the span
+- a Mahalanobis metric on the RobustScaler-scaled engineered features,
+  folded into a single projection so that the distance of a batch is one
+  matrix product. With about 50 training rows the in-sample distances
+  understate those of new rows, so the out-of-distribution threshold is
+  the largest leave-one-out distance of the training rows (each scored
+  against the mean and covariance of the others) widened by OOD_MARGIN
+
+Validation is whole-batch: every check is a NumPy mask over all rows.
+
+Usage:
+    python -m emf_ml.validation --version 20251210_101547
+"""
+
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .features import CIRCUIT_CITY, RAW_COLUMNS, engineer_feature_array, load_measurements, train_test_indices
+from .registry import ModelRegistry
+
+
+INPUT_COLUMNS = RAW_COLUMNS[:7]
+
+CATEGORY_CODES = {
+    'City': (0, 1),
+    'Profile_Type': (0, 1),
+    'Circuit': (0, 1, 2),
+}
+
+# Ranges accept values up to this fraction of the training span outside it
+RANGE_MARGIN = 0.1
+
+# Eigenvalues below this fraction of the largest are treated as exact collinearity
+EIGEN_TOLERANCE = 1e-10
+
+# The OOD threshold is the largest leave-one-out training distance widened by this fraction
+OOD_MARGIN = 0.25
+
+FLAG_COLUMNS = [
+    'missing_values', 'invalid_category', 'city_circuit_mismatch',
+    'out_of_range', 'ood_score', 'out_of_distribution', 'valid'
+]
+
+
+class InputProfile:
+    """Training-data ranges and Mahalanobis metric of one model version"""
+
+    def __init__(self, ranges, projection, offset, threshold, features, version=None):
+        """
+        Initialize the profile
+
+        Args:
+            ranges: Dict of column -> (low, high) accepted range
+            projection: Matrix mapping engineered features to whitened space
+            offset: Whitened training mean
+            threshold: Mahalanobis distance above which a row is out of distribution
+            features: Engineered feature names, in model order
+            version: Artifact version
+        """
+        self.ranges = ranges
+        self.projection = np.asarray(projection, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.threshold = float(threshold)
+        self.features = list(features)
+        self.version = version
+
+    @classmethod
+    def fit(cls, data, scaler, features, version=None):
+        """
+        Derive a profile from training measurements
+
+        Args:
+            data: Training DataFrame with the raw measurement columns
+            scaler: Fitted scaler of the version (center_ and scale_ attributes)
+            features: Engineered feature names
+            version: Artifact version
+
+        Returns:
+            InputProfile
+        """
+        ranges = {}
+        for col in INPUT_COLUMNS:
+            if col in CATEGORY_CODES:
+                continue
+            lo, hi = float(data[col].min()), float(data[col].max())
+            margin = RANGE_MARGIN * (hi - lo)
+            ranges[col] = (lo - margin, hi + margin)
+
+        # Whitening of the scaled features; collinear directions are dropped
+        X = engineer_feature_array(data, features)
+        center = getattr(scaler, 'center_', np.zeros(X.shape[1]))
+        scale = getattr(scaler, 'scale_', np.ones(X.shape[1]))
+        Z = (X - center) / scale
+        mean = Z.mean(axis=0)
+        eigvals, eigvecs = np.linalg.eigh(np.cov(Z, rowvar=False))
+        keep = eigvals > EIGEN_TOLERANCE * eigvals.max()
+        whiten = eigvecs[:, keep] / np.sqrt(eigvals[keep])
+
+        # ((X - c) / s - mean) @ whiten == X @ projection - offset
+        projection = whiten / scale[:, None]
+        offset = (center / scale + mean) @ whiten
+        # Leave-one-out squared distances in closed form from the in-sample ones
+        # (covariance with n - 1 degrees of freedom)
+        n = len(X)
+        inside = ((X @ projection - offset) ** 2).sum(axis=1)
+        loo = n ** 2 * (n - 2) * inside / ((n - 1) * np.maximum((n - 1) ** 2 - n * inside, np.finfo(float).tiny))
+        threshold = (1 + OOD_MARGIN) * np.sqrt(loo.max())
+        return cls(ranges, projection, offset, threshold, features, version)
+
+    def mahalanobis(self, X):
+        """
+        Distance of engineered feature rows from the training distribution
+
+        Args:
+            X: Array of shape (n_rows, n_features) in self.features order
+
+        Returns:
+            ndarray of distances
+        """
+        W = X @ self.projection
+        W -= self.offset
+        return np.sqrt(np.einsum('ij,ij->i', W, W))
+
+    def to_dict(self):
+        """Return the saved representation"""
+        return {
+            'ranges': self.ranges,
+            'projection': self.projection,
+            'offset': self.offset,
+            'threshold': self.threshold,
+            'features': self.features,
+            'version': self.version,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """Restore a profile saved with to_dict()"""
+        return cls(state['ranges'], state['projection'], state['offset'], state['threshold'],
+                   state['features'], state['version'])
+
+
+class InputValidator:
+    """Checks batches of raw measurement rows against an input profile"""
+
+    def __init__(self, profile):
+        """
+        Initialize the validator
+
+        Args:
+            profile: InputProfile of the model version being scored
+        """
+        self.profile = profile
+
+    def check_schema(self, data):
+        """
+        Check required columns and convert them to float arrays
+
+        Non-numeric values become NaN and are reported as missing.
+
+        Args:
+            data: DataFrame or mapping of raw measurement columns
+
+        Returns:
+            dict of column -> float64 array
+
+        Raises:
+            ValueError: If a required column is missing
+        """
+        missing = [col for col in INPUT_COLUMNS if col not in data]
+        if missing:
+            raise ValueError(f'Missing input columns: {missing}')
+        columns = {}
+        for col in INPUT_COLUMNS:
+            values = np.asarray(data[col])
+            if values.dtype.kind not in 'biuf':
+                values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy()
+            columns[col] = values.astype(np.float64, copy=False)
+        return columns
+
+    def validate(self, data, X=None):
+        """
+        Validate a batch of rows
+
+        Args:
+            data: DataFrame or mapping of raw measurement columns
+            X: Engineered feature matrix of the batch, if already built
+
+        Returns:
+            DataFrame with one row per input row and FLAG_COLUMNS; valid is
+            False for missing values, unknown category codes and City/Circuit
+            mismatches, while the range and distribution flags are advisory
+        """
+        columns = self.check_schema(data)
+        n = len(columns['Distance_m'])
+
+        missing = np.zeros(n, dtype=bool)
+        for values in columns.values():
+            missing |= ~np.isfinite(values)
+
+        invalid_category = np.zeros(n, dtype=bool)
+        for col, codes in CATEGORY_CODES.items():
+            invalid_category |= ~np.isin(columns[col], codes) & np.isfinite(columns[col])
+
+        circuits = np.array(sorted(CIRCUIT_CITY))
+        expected_city = np.array([CIRCUIT_CITY[c] for c in circuits], dtype=np.float64)
+        known = np.isin(columns['Circuit'], circuits)
+        positions = np.searchsorted(circuits, np.where(known, columns['Circuit'], circuits[0]))
+        mismatch = known & np.isfinite(columns['City']) & (expected_city[positions] != columns['City'])
+
+        out_of_range = np.zeros(n, dtype=bool)
+        for col, (lo, hi) in self.profile.ranges.items():
+            out_of_range |= (columns[col] < lo) | (columns[col] > hi)
+
+        if X is None:
+            X = engineer_feature_array(columns, self.profile.features)
+        with np.errstate(invalid='ignore', over='ignore'):
+            score = self.profile.mahalanobis(X)
+        ood = ~(score <= self.profile.threshold)
+
+        flags = pd.DataFrame({
+            'missing_values': missing,
+            'invalid_category': invalid_category,
+            'city_circuit_mismatch': mismatch,
+            'out_of_range': out_of_range,
+            'ood_score': score,
+            'out_of_distribution': ood,
+            'valid': ~(missing | invalid_category | mismatch),
+        })
+        if isinstance(data, pd.DataFrame):
+            flags.index = data.index
+        return flags
+
+
+def profile_path(registry, version=None):
+    """Return the artifact path of an input profile"""
+    return registry.path('input_profile', version)
+
+
+def build_profile(registry=None, version=None, save=True):
+    """
+    Derive and save the input profile of a model version from its training split
+
+    Args:
+        registry: ModelRegistry
+        version: Artifact version (defaults to the latest)
+        save: Write input_profile_<version>.joblib next to the model artifacts
+
+    Returns:
+        InputProfile
+    """
+    registry = registry or ModelRegistry()
+    version = version or registry.latest_version()
+    df = load_measurements()
+    train_idx, _ = train_test_indices(len(df))
+    profile = InputProfile.fit(df.iloc[train_idx], registry.load_scaler(version), registry.features(version), version)
+    if save:
+        joblib.dump(profile.to_dict(), profile_path(registry, version))
+    return profile
+
+
+def load_profile(registry, version=None):
+    """
+    Load the saved input profile, deriving it when the version has none
+
+    Returns:
+        InputProfile
+    """
+    if not os.path.exists(profile_path(registry, version)):
+        return build_profile(registry, version, save=False)
+    return InputProfile.from_dict(registry.load('input_profile', version))
+
+
+def main():
+    """Derive input profiles for saved models"""
+    parser = argparse.ArgumentParser(description='Derive input validation profiles')
+    parser.add_argument('--version', help='Model version (defaults to latest)')
+    args = parser.parse_args()
+
+    registry = ModelRegistry()
+    profile = build_profile(registry, args.version)
+    for col, (lo, hi) in profile.ranges.items():
+        print(f"{col:15s} [{lo:.3f}, {hi:.3f}]")
+    print(f"Mahalanobis rank {profile.projection.shape[1]}, threshold {profile.threshold:.3f}")
+    print(f"Saved: {profile_path(registry, profile.version)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,17 @@ Generate EMF ML Analysis Word Document
 Main script to generate the Word document from scratch
 """
 
+import json
 import os
 import sys
 
+import pandas as pd
+
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from word_generator.document_builder import DocumentBuilder
+from emf_ml.report_index import ReportIndex
 
 
 def main():
@@ -39,8 +43,24 @@ def main():
     print("\nGenerating document...")
     print("-" * 40)
     
+    # Data quality profile written by `python -m emf_ml.quality`, if present
+    results = {}
+    profile_path = os.path.join(output_dir, 'tables', 'data_quality_profile.json')
+    if os.path.exists(profile_path):
+        with open(profile_path) as f:
+            results['data_quality'] = json.load(f)
+        print(f"Data quality profile: {profile_path}")
+    
+    # Tables written by `python -m emf_ml.learning_curves` and
+    # `python -m emf_ml.model_comparison`, if present
+    for key in ['sample_size_estimates', 'repeated_cv_summary', 'model_comparisons']:
+        table_path = os.path.join(output_dir, 'tables', f'{key}.csv')
+        if os.path.exists(table_path):
+            results[key] = pd.read_csv(table_path)
+            print(f"Loaded table: {table_path}")
+    
     # Create document builder
-    builder = DocumentBuilder(output_file, plots_dir)
+    builder = DocumentBuilder(output_file, plots_dir, results)
     
     # Build the document
     try:
@@ -57,6 +77,15 @@ def main():
         print(f"\n✗ Error generating document: {e}")
         raise
     
+    # Record the report in the search index (plus any new model cards); the
+    # document is already saved, so an indexing failure is only a warning
+    try:
+        with ReportIndex() as index:
+            counts = index.update([output_path, os.path.join(base_dir, 'models')], prune=False)
+        print(f"  Indexed: {counts['added'] + counts['updated']} new or changed document(s)")
+    except Exception as e:
+        print(f"  Warning: report index not updated: {e}")
+    
     print("\n" + "=" * 60)
     return output_path
 
@@ -4,7 +4,7 @@
 from .document_builder import DocumentBuilder
 from .styles import apply_styles
 from .tables import create_table, create_results_table
-from .content import get_methodology_content, get_results_content, get_discussion_content
+from .content import get_methodology_content, get_results_content, get_discussion_content, get_quality_summary
 
 __all__ = [
     'DocumentBuilder',
@@ -13,5 +13,6 @@ __all__ = [
     'create_results_table',
     'get_methodology_content',
     'get_results_content',
-    'get_discussion_content'
+    'get_discussion_content',
+    'get_quality_summary'
 ]
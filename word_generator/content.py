@@ -160,6 +160,41 @@ Hyperparameter Optimization:
     }
 
 
+def get_quality_summary(profile):
+    """
+    Return data quality findings text from a data quality profile
+
+    Args:
+        profile: Dict in the DataQualityProfile.to_dict() layout
+
+    Returns:
+        str: Paragraph text
+    """
+    columns = profile['columns']
+    missing = sum(c['nulls'] for c in columns.values())
+    cells = profile['rows'] * max(len(columns), 1)
+    lines = [
+        'Data Quality Findings:',
+        f"• Records: {profile['rows']:,} across {len(columns)} columns",
+        f"• Missing Values: {missing:,} ({100.0 * missing / cells if cells else 0.0:.2f}% of all cells)",
+        f"• Duplicate Records: {profile['duplicate_rows']:,}",
+    ]
+    for name, c in columns.items():
+        if c['nulls']:
+            lines.append(f"  - {name}: {c['nulls']:,} missing ({100.0 * c['nulls'] / c['count']:.2f}%)")
+    iqr = {n: c['iqr_outliers'] for n, c in columns.items() if c.get('iqr_outliers')}
+    robust = {n: c['robust_z_outliers'] for n, c in columns.items() if c.get('robust_z_outliers')}
+    lines.append('• IQR Outliers (1.5 × IQR): '
+                 + (', '.join(f'{n} ({v:,})' for n, v in iqr.items()) if iqr else 'none'))
+    lines.append('• Robust Z-score Outliers (|z| > 3.5): '
+                 + (', '.join(f'{n} ({v:,})' for n, v in robust.items()) if robust else 'none'))
+    categorical = [f"{n} ({c['cardinality']})" for n, c in columns.items()
+                   if c['cardinality'] is not None and c['cardinality'] <= 10]
+    if categorical:
+        lines.append('• Categorical Cardinality: ' + ', '.join(categorical))
+    return '\n'.join(lines)
+
+
 def get_results_content():
     """Return results section content"""
     return {
@@ -189,6 +224,21 @@ Key Findings:
 • Random Forest shows good generalization for H_ICNIRP
 • Neural Network struggles with limited data (overfitting tendency)
 • SVR shows high variance across cross-validation folds'''
+        },
+        'repeated_cv': {
+            'title': 'Repeated Cross-Validation',
+            'content': '''A single 5-fold run cannot separate the model families: its fold
+scores vary by more than the differences between models. The families
+were therefore re-evaluated with 10 repeats of 5-fold cross-validation on
+the training split, every family on the same 50 folds (Table 11). The
+intervals use the corrected resampled t-test of Nadeau and Bengio, which
+inflates the fold variance by n_test/n_train to account for overlapping
+training sets. Random Forest has the highest mean R² for both targets
+(0.145 for E_ICNIRP, 0.352 for H_ICNIRP), but none of the paired
+differences between families is significant at the 5% level (Table 12).
+In particular, the ranking of XGBoost and Random Forest in the single
+5-fold results is not supported: their difference is 0.103 [-0.066, 0.273]
+for E_ICNIRP and 0.039 [-0.154, 0.233] for H_ICNIRP.'''
         },
         'stacked_ensemble': {
             'title': 'Stacked Ensemble Performance',
@@ -237,7 +287,19 @@ where E is field strength and r is distance from source.
 Environmental Factors:
 • Temperature affects atmospheric conductivity
 • Humidity influences electromagnetic wave propagation
-• Combined effects captured through interaction features'''
+• Combined effects captured through interaction features
+
+Figures 15 and 16 show how the fitted models respond to distance, temperature
+and humidity, averaged over the measured conditions (partial dependence).''',
+            'sensitivity': '''A variance-based (Sobol) sensitivity analysis of the best models
+apportions the output variance to the raw measurement inputs, sampled
+uniformly over their observed ranges (Table 9, Figure 17). Distance
+dominates both targets: its total index is about 0.95 for E_ICNIRP and
+0.67 for H_ICNIRP. Temperature accounts for roughly 30% of the H_ICNIRP
+variance but only a few percent of E_ICNIRP, while humidity and time of
+day contribute almost nothing. The gap between total and first-order
+indices for Profile_Type and Circuit indicates that their influence acts
+mainly through interactions with distance.'''
         },
         'limitations': {
             'title': 'Limitations',
@@ -245,7 +307,23 @@ Environmental Factors:
 1. Sample Size: 66 samples may limit model generalization
 2. Geographic Scope: Limited to Ibri and Suhar ports
 3. Temporal Coverage: Data from specific time periods
-4. Equipment Variability: Measurement precision considerations'''
+4. Equipment Variability: Measurement precision considerations''',
+            'sample_size': '''To quantify the sample-size limitation, the measurements were split at
+random into training and test rows 20 times; for each split every model
+was refitted on nested subsamples of its training rows (8 sizes from 15 to
+52 samples) and scored on that split's test rows. A saturating power law
+fitted to the mean test R² was extrapolated to estimate the number of
+training samples needed to reach R² = 0.5, with 90% intervals from a
+bootstrap over the repeats (Table 10, Figure 18). H_ICNIRP reaches the
+target at roughly 150 samples with Random Forest and 270 with XGBoost.
+No E_ICNIRP model supports an estimate: the SVR and XGBoost curves are
+still rising at 52 samples, so their fitted asymptote runs into the R² = 1
+bound and the extrapolation would reflect that constraint rather than the
+data, while the Random Forest curve plateaus near 0.25. The Neural Network
+on both targets and SVR on H_ICNIRP do not approach the target at any
+extrapolated size. The upper interval bounds are unbounded for every
+model, so these figures indicate an order of magnitude rather than a
+precise requirement.'''
         },
         'future_work': {
             'title': 'Future Work',
@@ -20,32 +20,68 @@ from .tables import (
     create_normality_test_table,
     create_chi_square_table,
     create_effect_size_table,
-    create_metrics_explanation_table
+    create_metrics_explanation_table,
+    create_sobol_table,
+    create_sample_size_table,
+    create_repeated_cv_table,
+    create_model_comparison_table
 )
 from .images import add_image, add_all_images
-from .content import get_methodology_content, get_results_content, get_discussion_content
+from .packaging import DEFAULT_LEVEL, DEFAULT_WORKERS, save_document
+from .content import get_methodology_content, get_results_content, get_discussion_content, get_quality_summary
+
+
+def styled_template():
+    """Return an empty Document with the report styles applied"""
+    document = Document()
+    apply_styles(document)
+    return document
 
 
 class DocumentBuilder:
     """Builder class for creating the EMF ML Analysis Word document"""
     
-    def __init__(self, output_path, plots_dir=None):
+    def __init__(self, output_path, plots_dir=None, results=None, template=None,
+                 compress_level=DEFAULT_LEVEL, save_workers=DEFAULT_WORKERS, media_level=None):
         """
         Initialize the document builder
         
         Args:
-            output_path: Path where the Word document will be saved
-            plots_dir: Directory containing plot images
+            output_path: Path (or writable file object) where the Word
+                document will be saved
+            plots_dir: Directory containing plot images (defaults to plots/
+                next to output_path; required when output_path is a file object)
+            results: Optional dict of in-memory result tables keyed by table
+                name (e.g. 'descriptive_statistics'); published values are
+                used for tables not present. 'data_quality' may hold a data
+                quality profile dict (emf_ml.quality) to report its findings
+            template: Optional empty Document with the report styles already
+                applied (see styled_template()); it is built into directly,
+                so pass a copy to reuse it
+            compress_level: zlib level of the XML parts when saving
+            save_workers: Threads compressing the package parts
+            media_level: zlib level for the embedded plots, or None to store
+                them uncompressed (see packaging.save_document)
         """
+        if plots_dir is None:
+            if not isinstance(output_path, (str, os.PathLike)):
+                raise ValueError('plots_dir is required when output_path is a file object')
+            plots_dir = os.path.join(os.path.dirname(output_path), 'plots')
         self.output_path = output_path
-        self.plots_dir = plots_dir or os.path.join(os.path.dirname(output_path), 'plots')
-        self.document = Document()
+        self.plots_dir = plots_dir
+        self.results = results or {}
+        self.styled = template is not None
+        self.document = template if template is not None else Document()
+        self.compress_level = compress_level
+        self.save_workers = save_workers
+        self.media_level = media_level
         self.images_dict, _ = add_all_images(None, None)  # Get image definitions
         
     def build(self):
         """Build the complete document"""
         # Apply styles
-        apply_styles(self.document)
+        if not self.styled:
+            apply_styles(self.document)
         
         # Build sections
         self._add_title_page()
@@ -56,8 +92,9 @@ class DocumentBuilder:
         self._add_appendix()
         
         # Save document
-        self.document.save(self.output_path)
-        print(f"Document saved: {self.output_path}")
+        save_document(self.document, self.output_path, self.compress_level, self.save_workers, self.media_level)
+        if isinstance(self.output_path, str):
+            print(f"Document saved: {self.output_path}")
         
         return self.output_path
     
@@ -141,6 +178,8 @@ class DocumentBuilder:
         self._add_section_image('data_quality', 0)
         
         self._add_paragraph(content['preprocessing']['quality_assessment'])
+        if self.results.get('data_quality'):
+            self._add_paragraph(get_quality_summary(self.results['data_quality']))
         
         self.document.add_heading('3.2 Feature Engineering', 2)
         self._add_paragraph(content['preprocessing']['feature_engineering'])
@@ -204,7 +243,7 @@ class DocumentBuilder:
         self._add_section_image('exploration', 1)
         
         self._add_paragraph(content['data_exploration']['stats'])
-        create_descriptive_stats_table(self.document)
+        create_descriptive_stats_table(self.document, self.results.get('descriptive_statistics'))
         
         self.document.add_heading('7.2 Correlation Analysis Findings', 2)
         self._add_paragraph(content['data_exploration']['correlation'])
@@ -220,8 +259,11 @@ class DocumentBuilder:
         self.document.add_heading('8. Model Performance Results', 1)
         
         self.document.add_heading('8.1 Individual Model Performance', 2)
-        create_model_results_E_table(self.document)
-        create_model_results_H_table(self.document)
+        create_model_results_E_table(self.document, self.results.get('model_results_comparison'))
+        create_model_results_H_table(self.document, self.results.get('model_results_comparison'))
+        self._add_paragraph(content['repeated_cv']['content'])
+        create_repeated_cv_table(self.document, self.results.get('repeated_cv_summary'))
+        create_model_comparison_table(self.document, self.results.get('model_comparisons'))
         
         self.document.add_heading('8.2 Stacked Ensemble Performance', 2)
         self._add_paragraph(content['stacked_ensemble']['content'])
@@ -254,10 +296,18 @@ class DocumentBuilder:
         self.document.add_heading('10. Interpretation of Results', 1)
         self._add_paragraph(content['interpretation']['model_analysis'])
         self._add_paragraph(content['interpretation']['physical'])
+        self._add_section_image('interpretation', 0)
+        self._add_section_image('interpretation', 1)
+        self._add_paragraph(content['interpretation']['sensitivity'])
+        create_sobol_table(self.document, self.results.get('sobol_indices'))
+        self._add_section_image('sensitivity', 0)
         
         # 11. Limitations
         self.document.add_heading('11. Limitations', 1)
         self._add_paragraph(content['limitations']['content'])
+        self._add_paragraph(content['limitations']['sample_size'])
+        create_sample_size_table(self.document, self.results.get('sample_size_estimates'))
+        self._add_section_image('sample_size', 0)
         
         # 12. Future Work
         self.document.add_heading('12. Future Work', 1)
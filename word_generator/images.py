@@ -95,6 +95,17 @@ def add_all_images(document, plots_dir):
             ('10_residual_plots.png', 'Figure 13: Residual Analysis for Best Models'),
             ('stacked_ensemble_performance.png', 'Figure 14: Stacked Ensemble Model Performance Analysis'),
         ],
+        # Physical Interpretation
+        'interpretation': [
+            ('13_partial_dependence.png', 'Figure 15: Partial Dependence and ICE Curves for Distance, Temperature and Humidity'),
+            ('14_pdp_distance_temp.png', 'Figure 16: Two-way Partial Dependence of Distance and Temperature'),
+        ],
+        'sensitivity': [
+            ('15_sobol_indices.png', 'Figure 17: First-order and Total Sobol Indices with 95% Confidence Intervals'),
+        ],
+        'sample_size': [
+            ('16_learning_curves.png', 'Figure 18: Learning Curves with 90% Bands and Power-law Extrapolation'),
+        ],
     }
     
     stats = {'added': 0, 'not_found': 0}
@@ -0,0 +1,215 @@
+"""
+Packaging Module
+Fast DOCX packaging: stored media, parallel XML compression and streaming output
+
+document.save() writes every part of the OPC package through one zipfile
+with ZIP_DEFLATED, serially, including the PNG plots in word/media that
+are already compressed. save_document() writes the same parts as a
+sequential ZIP stream instead:
+
+    - media that is already compressed (PNG, JPEG, GIF) is written with
+      ZIP_STORED: only its CRC is computed. Matplotlib PNGs still deflate
+      by 10-30%, so pass media_level to trade that time for a smaller file
+    - the XML parts are deflated concurrently on a thread pool (zlib
+      releases the GIL) at a configurable level
+    - every entry is written to the destination as soon as it and the
+      entries before it are ready, with sizes and CRC in the local header,
+      so the destination may be any writable stream (no seeking and no
+      temporary archive in memory)
+
+The parts, their order and the content types are the same as
+python-docx writes them; entries carry a fixed timestamp, so the same
+document always packages to the same bytes.
+
+Serializing the parts uses python-docx internals (docx.opc.pkgwriter's
+_ContentTypesItem and Part.before_marshal), written and tested against
+python-docx 1.2. When those are missing or have changed, save_document()
+warns and falls back to document.save().
+
+Usage:
+    from word_generator.packaging import save_document
+    save_document(document, 'outputs/EMF_ML_ANALYSIS_REPORT.docx', level=6, workers=4)
+"""
+
+import os
+import struct
+import warnings
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Extensions of media formats that do not shrink under deflate
+STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif'}
+
+DEFAULT_LEVEL = 6
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Parts smaller than this are deflated inline rather than on the pool
+INLINE_BYTES = 16 * 1024
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+# MS-DOS date and time of 1980-01-01 00:00, the earliest ZIP timestamp
+DOS_DATE = (0 << 9) | (1 << 5) | 1
+DOS_TIME = 0
+
+ZIP32_LIMIT = 0xFFFFFFFF
+
+
+def package_items(document):
+    """
+    Serialize the parts of a document's package in python-docx order
+
+    Args:
+        document: python-docx Document
+
+    Returns:
+        list of (member name, bytes) tuples, or None when this python-docx
+        version does not have the internals used to serialize the parts
+    """
+    try:
+        from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+        from docx.opc.pkgwriter import _ContentTypesItem
+
+        package = document.part.package
+        parts = list(package.iter_parts())
+        for part in parts:
+            part.before_marshal()
+        items = [
+            (CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob),
+            (PACKAGE_URI.rels_uri.membername, package.rels.xml),
+        ]
+        for part in parts:
+            items.append((part.partname.membername, part.blob))
+            if len(part.rels):
+                items.append((part.partname.rels_uri.membername, part.rels.xml))
+    except (ImportError, AttributeError, TypeError):
+        return None
+    return items
+
+
+def is_media(name):
+    """Return True for members in an already-compressed media format"""
+    return os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+
+
+def encode_member(name, data, level=DEFAULT_LEVEL, media_level=None):
+    """
+    Compress one member
+
+    Args:
+        name: Member name in the archive
+        data: Uncompressed bytes
+        level: zlib level for deflated members
+        media_level: zlib level for compressed media, or None to store it
+
+    Returns:
+        tuple: (method, crc32, compressed bytes)
+    """
+    crc = zlib.crc32(data)
+    if is_media(name):
+        if media_level is None:
+            return ZIP_STORED, crc, data
+        level = media_level
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return ZIP_DEFLATED, crc, compressor.compress(data) + compressor.flush()
+
+
+class ZipStreamWriter:
+    """Writes a ZIP archive sequentially to a file object from pre-compressed members"""
+
+    def __init__(self, stream):
+        """
+        Initialize the writer
+
+        Args:
+            stream: Writable binary file object; it is never seeked
+        """
+        self.stream = stream
+        self.offset = 0
+        self.entries = []
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.offset += len(data)
+
+    def add(self, name, method, crc, payload, size):
+        """
+        Write one member
+
+        Args:
+            name: Member name
+            method: ZIP_STORED or ZIP_DEFLATED
+            crc: CRC-32 of the uncompressed data
+            payload: Stored or raw-deflated bytes
+            size: Uncompressed size
+        """
+        if max(size, len(payload), self.offset) > ZIP32_LIMIT:
+            raise ValueError(f'{name}: archives over 4 GB are not supported')
+        encoded = name.encode('utf-8')
+        flags = 0x800 if not encoded.isascii() else 0
+        self.entries.append((encoded, flags, method, crc, len(payload), size, self.offset))
+        self._write(struct.pack('<4s5H3L2H', b'PK\x03\x04', 20, flags, method, DOS_TIME, DOS_DATE,
+                                crc, len(payload), size, len(encoded), 0))
+        self._write(encoded)
+        self._write(payload)
+
+    def close(self):
+        """Write the central directory"""
+        start = self.offset
+        for encoded, flags, method, crc, compressed, size, offset in self.entries:
+            self._write(struct.pack('<4s6H3L5H2L', b'PK\x01\x02', 20, 20, flags, method, DOS_TIME, DOS_DATE,
+                                    crc, compressed, size, len(encoded), 0, 0, 0, 0, 0, offset))
+            self._write(encoded)
+        self._write(struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, len(self.entries), len(self.entries),
+                                self.offset - start, start, 0))
+
+
+def save_document(document, destination, level=DEFAULT_LEVEL, workers=DEFAULT_WORKERS, media_level=None):
+    """
+    Save a document as a DOCX package with stored media and parallel compression
+
+    Args:
+        document: python-docx Document
+        destination: File path or writable binary file object
+        level: zlib compression level of the XML parts (0-9)
+        workers: Compression threads (1 compresses inline)
+        media_level: zlib level for PNG/JPEG/GIF media, or None to store it
+
+    Returns:
+        The destination
+    """
+    items = package_items(document)
+    if items is None:
+        warnings.warn('python-docx packaging internals not available; saving with document.save()',
+                      RuntimeWarning, stacklevel=2)
+        document.save(destination)
+        return destination
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'wb') as stream:
+            _write_package(items, stream, level, workers, media_level)
+    else:
+        _write_package(items, destination, level, workers, media_level)
+    return destination
+
+
+def _write_package(items, stream, level, workers, media_level):
+    """Compress the members and stream them to the file object in order"""
+    writer = ZipStreamWriter(stream)
+    if workers <= 1:
+        for name, data in items:
+            writer.add(name, *encode_member(name, data, level, media_level), len(data))
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = [
+                pool.submit(encode_member, name, data, level, media_level)
+                if len(data) >= INLINE_BYTES and (media_level is not None or not is_media(name)) else None
+                for name, data in items
+            ]
+            for (name, data), future in zip(items, pending):
+                if future is None:
+                    writer.add(name, *encode_member(name, data, level, media_level), len(data))
+                else:
+                    writer.add(name, *future.result(), len(data))
+    writer.close()
@@ -0,0 +1,462 @@
+"""
+Render Service Module
+Long-lived local report rendering service with warm workers and an output cache
+
+A localhost HTTP server keeps a pool of worker processes that have already
+imported python-docx, parsed the default template and applied the report
+styles; each request is built into a copy of that styled template, so it
+pays for the document content only. Requests are JSON report
+specifications:
+
+    {
+        "format": "docx",                       # or "pdf"
+        "plots_dir": "outputs/plots",           # docx: figures directory
+        "results": {"model_results_comparison":  # docx: optional result tables
+                    "outputs/tables/07_model_results_comparison.csv"},
+        "markdown": "outputs/METHODOLOGY_RESULTS_DISCUSSION.md",  # pdf source
+        "cache": true                           # false forces a re-render
+    }
+
+Outputs are cached by content address: the key hashes the normalized
+specification, the content of every input file (figures, result tables,
+Markdown) and the renderer source code, so identical requests are served
+from outputs/cache/render/ without rendering, and any change to an input
+or to the report code yields a new key. Concurrent identical requests
+share one render.
+
+Endpoints:
+    POST /render   specification -> DOCX or PDF bytes (X-Cache: hit|miss)
+    GET  /health   worker and cache statistics
+
+Usage:
+    python -m word_generator.render_service serve --port 8770 --workers 2
+    python -m word_generator.render_service render spec.json report.docx
+    curl -X POST --data @spec.json http://127.0.0.1:8770/render -o report.docx
+"""
+
+import argparse
+import collections
+import contextlib
+import copy
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PLOTS_DIR = os.path.join(BASE_DIR, 'outputs', 'plots')
+DEFAULT_MARKDOWN = os.path.join(BASE_DIR, 'outputs', 'METHODOLOGY_RESULTS_DISCUSSION.md')
+CACHE_DIR = os.path.join(BASE_DIR, 'outputs', 'cache', 'render')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8770
+DEFAULT_WORKERS = 2
+
+CONTENT_TYPES = {
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pdf': 'application/pdf',
+}
+
+# Rendered outputs kept in memory in addition to the cache directory
+MEMORY_CACHE_ITEMS = 32
+
+# Source files whose content is part of every cache key
+RENDERER_SOURCES = [os.path.join(BASE_DIR, 'word_generator', name)
+                    for name in sorted(os.listdir(os.path.join(BASE_DIR, 'word_generator')))
+                    if name.endswith('.py')] + [os.path.join(BASE_DIR, 'convert_to_pdf.py')]
+
+# sha1 of input files keyed by (path, size, mtime_ns)
+_FILE_DIGESTS = {}
+_FILE_DIGESTS_LOCK = threading.Lock()
+
+# Styled template held by each warm worker process
+_TEMPLATE = None
+
+
+def normalize_spec(spec):
+    """
+    Validate a report specification and fill in defaults
+
+    Args:
+        spec: Dict (see module docstring)
+
+    Returns:
+        dict with absolute paths and only the keys that affect the output
+    """
+    if not isinstance(spec, dict):
+        raise ValueError('Report specification must be a JSON object')
+    fmt = spec.get('format', 'docx')
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"format must be one of {sorted(CONTENT_TYPES)}")
+    unknown = set(spec) - {'format', 'plots_dir', 'results', 'markdown', 'cache'}
+    if unknown:
+        raise ValueError(f'Unknown specification keys: {sorted(unknown)}')
+
+    if fmt == 'pdf':
+        markdown = _absolute(spec.get('markdown') or DEFAULT_MARKDOWN)
+        if not os.path.isfile(markdown):
+            raise ValueError(f'Markdown file not found: {markdown}')
+        return {'format': fmt, 'markdown': markdown}
+
+    plots_dir = _absolute(spec.get('plots_dir') or DEFAULT_PLOTS_DIR)
+    results = {}
+    for name, path in sorted((spec.get('results') or {}).items()):
+        path = _absolute(path)
+        if not os.path.isfile(path):
+            raise ValueError(f'Result table not found: {path}')
+        results[name] = path
+    return {'format': fmt, 'plots_dir': plots_dir, 'results': results}
+
+
+def _absolute(path):
+    """Resolve a specification path relative to the repository root"""
+    return os.path.normpath(os.path.join(BASE_DIR, os.path.expanduser(str(path))))
+
+
+def file_digest(path):
+    """sha1 of a file's content, memoized by path, size and modification time"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _FILE_DIGESTS_LOCK:
+        digest = _FILE_DIGESTS.get(key)
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        with _FILE_DIGESTS_LOCK:
+            _FILE_DIGESTS[key] = digest
+    return digest
+
+
+def spec_inputs(spec):
+    """Input files a normalized specification's output depends on"""
+    if spec['format'] == 'pdf':
+        return [spec['markdown']]
+    plots_dir = spec['plots_dir']
+    plots = sorted(os.path.join(plots_dir, n) for n in os.listdir(plots_dir)) if os.path.isdir(plots_dir) else []
+    return [p for p in plots if os.path.isfile(p)] + list(spec['results'].values())
+
+
+def cache_key(spec):
+    """
+    Content address of a normalized specification's output
+
+    Args:
+        spec: Dict from normalize_spec()
+
+    Returns:
+        str: sha256 hex digest
+    """
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode())
+    for path in RENDERER_SOURCES + spec_inputs(spec):
+        if os.path.exists(path):
+            digest.update(f'{os.path.relpath(path, BASE_DIR)}:{file_digest(path)}\n'.encode())
+    return digest.hexdigest()
+
+
+def read_table(path):
+    """Read a result table CSV, using the first column as index when it is unnamed"""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = f.readline()
+    return pd.read_csv(path, index_col=0 if header.startswith(',') else None, float_precision='round_trip')
+
+
+def warm_worker():
+    """Process initializer: import the renderer, style the template and do one warm-up build"""
+    global _TEMPLATE
+    from .document_builder import styled_template
+
+    _TEMPLATE = styled_template()
+    render(normalize_spec({}))
+
+
+def render(spec):
+    """
+    Render a normalized specification
+
+    Args:
+        spec: Dict from normalize_spec()
+
+    Returns:
+        bytes of the DOCX or PDF file
+    """
+    if spec['format'] == 'pdf':
+        if BASE_DIR not in sys.path:
+            sys.path.insert(0, BASE_DIR)
+        import convert_to_pdf
+
+        with open(spec['markdown'], 'r', encoding='utf-8') as f:
+            md_content = f.read()
+        return bytes(convert_to_pdf.markdown_to_pdf(convert_to_pdf.clean_markdown(md_content)).output())
+
+    from .document_builder import DocumentBuilder
+
+    buffer = io.BytesIO()
+    results = {name: read_table(path) for name, path in spec['results'].items()}
+    template = copy.deepcopy(_TEMPLATE) if _TEMPLATE is not None else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        DocumentBuilder(buffer, spec['plots_dir'], results, template=template).build()
+    return buffer.getvalue()
+
+
+class RenderCache:
+    """Content-addressed output cache on disk with a small in-memory LRU"""
+
+    def __init__(self, directory=CACHE_DIR, memory_items=MEMORY_CACHE_ITEMS):
+        """
+        Initialize the cache
+
+        Args:
+            directory: Cache directory, or None for memory only
+            memory_items: Outputs kept in memory
+        """
+        self.directory = directory
+        self.memory_items = memory_items
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def path(self, key, fmt):
+        """File of a cached output"""
+        return os.path.join(self.directory, key[:2], f'{key}.{fmt}')
+
+    def get(self, key, fmt):
+        """Return cached bytes, or None"""
+        with self._lock:
+            data = self._memory.get((key, fmt))
+            if data is not None:
+                self._memory.move_to_end((key, fmt))
+                return data
+        if self.directory and os.path.exists(self.path(key, fmt)):
+            with open(self.path(key, fmt), 'rb') as f:
+                data = f.read()
+            self._remember(key, fmt, data)
+            return data
+        return None
+
+    def put(self, key, fmt, data):
+        """Store rendered bytes"""
+        self._remember(key, fmt, data)
+        if self.directory:
+            path = self.path(key, fmt)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temporary, 'wb') as f:
+                f.write(data)
+            os.replace(temporary, path)
+
+    def _remember(self, key, fmt, data):
+        with self._lock:
+            self._memory[(key, fmt)] = data
+            self._memory.move_to_end((key, fmt))
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+
+def _submit(pool, spec):
+    """Submit a render job; a pool that is already broken returns a failed future"""
+    try:
+        return pool.submit(render, spec)
+    except BrokenProcessPool as e:
+        future = Future()
+        future.set_exception(e)
+        return future
+
+
+class RenderService:
+    """Warm worker pool plus output cache; thread-safe"""
+
+    def __init__(self, workers=DEFAULT_WORKERS, cache_dir=CACHE_DIR):
+        """
+        Start the workers and wait until every one is warm
+
+        Args:
+            workers: Worker processes
+            cache_dir: Output cache directory, or None for memory only
+        """
+        self.workers = workers
+        self.pool = self._start_pool()
+        self.cache = RenderCache(cache_dir)
+        self.counts = collections.Counter()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._restart_lock = threading.Lock()
+
+    def render(self, spec):
+        """
+        Render a specification or serve it from the cache
+
+        Args:
+            spec: Report specification dict
+
+        Returns:
+            (data, content_type, key, hit) tuple
+        """
+        use_cache = bool(spec.get('cache', True)) if isinstance(spec, dict) else True
+        spec = normalize_spec(spec)
+        fmt = spec['format']
+        key = cache_key(spec)
+        if use_cache:
+            data = self.cache.get(key, fmt)
+            if data is not None:
+                self._count('hit')
+                return data, CONTENT_TYPES[fmt], key, True
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            pool = self.pool
+            if owner:
+                self._inflight[key] = future = _submit(pool, spec)
+        try:
+            data = future.result()
+            if owner:
+                self.cache.put(key, fmt, data)
+        except BrokenProcessPool:
+            # A worker died; replace the pool so later requests can succeed
+            self._restart_pool(pool)
+            raise
+        finally:
+            if owner:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        self._count('miss' if owner else 'shared')
+        return data, CONTENT_TYPES[fmt], key, False
+
+    def health(self):
+        """Worker and cache statistics"""
+        with self._lock:
+            return {'workers': self.workers, 'inflight': len(self._inflight), **self.counts}
+
+    def close(self):
+        """Stop the worker processes"""
+        self.pool.shutdown()
+
+    def _start_pool(self):
+        """Start the worker processes and wait until every one is warm"""
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=warm_worker)
+        for future in [pool.submit(time.sleep, 0.05) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def _restart_pool(self, broken):
+        """Replace a broken pool, once however many requests saw it fail"""
+        with self._restart_lock:
+            if self.pool is not broken:
+                return
+            broken.shutdown(wait=False)
+            self.pool = self._start_pool()
+            self._count('restarts')
+
+    def _count(self, name):
+        with self._lock:
+            self.counts[name] += 1
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of a RenderService (set as server.service)"""
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._reply(404, b'Not found\n', 'text/plain')
+        self._reply(200, json.dumps(self.server.service.health()).encode(), 'application/json')
+
+    def do_POST(self):
+        if self.path != '/render':
+            return self._reply(404, b'Not found\n', 'text/plain')
+        try:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            spec = json.loads(body or b'{}')
+            start = time.perf_counter()
+            data, content_type, key, hit = self.server.service.render(spec)
+        except (ValueError, json.JSONDecodeError) as e:
+            return self._reply(400, f'{e}\n'.encode(), 'text/plain')
+        except Exception as e:
+            # Worker failures (missing plots, a crashed worker) are server errors
+            self.log_error('Render failed: %r', e)
+            return self._reply(500, f'Render failed: {type(e).__name__}: {e}\n'.encode(), 'text/plain')
+        self._reply(200, data, content_type, {
+            'X-Cache': 'hit' if hit else 'miss',
+            'X-Render-Key': key,
+            'X-Render-Ms': f'{(time.perf_counter() - start) * 1000:.1f}',
+        })
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _reply(self, status, data, content_type, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS, cache_dir=CACHE_DIR, quiet=False):
+    """
+    Run the rendering service until interrupted
+
+    Args:
+        host: Bind address (keep it local; there is no authentication)
+        port: TCP port
+        workers: Warm worker processes
+        cache_dir: Output cache directory, or None for memory only
+        quiet: Suppress per-request logging
+    """
+    service = RenderService(workers, cache_dir)
+    server = ThreadingHTTPServer((host, port), RenderRequestHandler)
+    server.service = service
+    server.quiet = quiet
+    print(f"Render service on http://{host}:{port} with {workers} warm worker(s)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main():
+    """Run the service or render one specification in-process"""
+    parser = argparse.ArgumentParser(description='Warm report rendering service')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Start the HTTP service')
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    serve_parser.add_argument('--cache-dir', default=CACHE_DIR)
+    serve_parser.add_argument('--no-cache', action='store_true', help='Keep the output cache in memory only')
+    serve_parser.add_argument('--quiet', action='store_true')
+
+    render_parser = commands.add_parser('render', help='Render one specification without the service')
+    render_parser.add_argument('spec', help='Specification JSON file ("-" for the default DOCX report)')
+    render_parser.add_argument('output', help='Output file')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.host, args.port, args.workers, None if args.no_cache else args.cache_dir, args.quiet)
+        return
+    spec = {}
+    if args.spec != '-':
+        with open(args.spec, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+    data = render(normalize_spec(spec))
+    with open(args.output, 'wb') as f:
+        f.write(data)
+    print(f"Saved: {args.output} ({len(data) / 1024:.1f} KB)")
+
+
+if __name__ == '__main__':
+    main()
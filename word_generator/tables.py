@@ -3,6 +3,8 @@ Tables Module
 Functions for creating various tables in the Word document
 """
 
+import math
+
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.table import WD_TABLE_ALIGNMENT
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -10,6 +12,10 @@ from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
 
+# Features shown in the descriptive statistics table
+DESCRIPTIVE_STATS_FEATURES = ['Distance_m', 'Temp_C', 'Humidity_Pct', 'Time_Hour', 'E_ICNIRP', 'H_ICNIRP']
+
+
 def set_cell_shading(cell, color_hex):
     """Set cell background color"""
     shading_elm = OxmlElement('w:shd')
@@ -135,9 +141,32 @@ def create_results_table(document, title, headers, rows, highlight_best=False):
     return table
 
 
-def create_descriptive_stats_table(document):
-    """Create the descriptive statistics table"""
+def create_descriptive_stats_table(document, stats=None):
+    """
+    Create the descriptive statistics table
+
+    Args:
+        document: Word document object
+        stats: Optional DataFrame in the 01_descriptive_statistics.csv layout
+            (e.g. StreamingDescriptiveStats.to_frame()); the published values
+            are used when omitted
+    """
     headers = ['Feature', 'Mean', 'Median', 'Std', 'Min', 'Max', 'Skewness']
+    if stats is not None:
+        features = [f for f in DESCRIPTIVE_STATS_FEATURES if f in stats.index]
+        rows = [
+            [
+                feature,
+                f"{stats.at[feature, 'mean']:.2f}",
+                str(round(stats.at[feature, 'median'], 2)),
+                f"{stats.at[feature, 'std']:.2f}",
+                str(round(stats.at[feature, 'min'], 2)),
+                str(round(stats.at[feature, 'max'], 2)),
+                f"{stats.at[feature, 'skewness']:.2f}",
+            ]
+            for feature in features
+        ]
+        return create_table(document, headers, rows, 'Table 1: Descriptive Statistics Summary')
     rows = [
         ['Distance_m', '112.58', '50.0', '119.61', '0.0', '390.0', '0.92'],
         ['Temp_C', '30.37', '29.4', '1.47', '29.0', '33.1', '0.83'],
@@ -178,9 +207,43 @@ def create_vif_table(document):
     return create_table(document, headers, rows, 'Table 3: Variance Inflation Factor (VIF) Results')
 
 
-def create_model_results_E_table(document):
-    """Create model results table for E_ICNIRP"""
+def model_results_rows(results, target):
+    """
+    Build model performance rows for one target from the results comparison table
+
+    Args:
+        results: DataFrame in the 07_model_results_comparison.csv layout
+        target: 'E_ICNIRP' or 'H_ICNIRP'
+
+    Returns:
+        list of row lists
+    """
+    rows = []
+    for _, r in results[results['Target'] == target].iterrows():
+        rows.append([
+            r['Model'],
+            f"{r['Train_R²']:.3f}",
+            f"{r['Test_R²']:.3f}",
+            f"{r['Test_RMSE']:.2f}",
+            f"{r['Test_MAE']:.2f}",
+            f"{r['CV_R²_Mean']:.3f} ± {r['CV_R²_Std']:.3f}",
+        ])
+    return rows
+
+
+def create_model_results_E_table(document, results=None):
+    """
+    Create model results table for E_ICNIRP
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the 07_model_results_comparison.csv
+            layout; the published values are used when omitted
+    """
     headers = ['Model', 'Train R²', 'Test R²', 'Test RMSE', 'Test MAE', 'CV R² (Mean±Std)']
+    if results is not None:
+        rows = model_results_rows(results, 'E_ICNIRP')
+        return create_results_table(document, 'E_ICNIRP Target Performance', headers, rows, highlight_best=True)
     rows = [
         ['SVR', '0.471', '-0.112', '5.70', '4.50', '0.047 ± 0.271'],
         ['Random Forest', '0.684', '-0.067', '5.58', '4.46', '0.259 ± 0.163'],
@@ -190,9 +253,19 @@ def create_model_results_E_table(document):
     return create_results_table(document, 'E_ICNIRP Target Performance', headers, rows, highlight_best=True)
 
 
-def create_model_results_H_table(document):
-    """Create model results table for H_ICNIRP"""
+def create_model_results_H_table(document, results=None):
+    """
+    Create model results table for H_ICNIRP
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the 07_model_results_comparison.csv
+            layout; the published values are used when omitted
+    """
     headers = ['Model', 'Train R²', 'Test R²', 'Test RMSE', 'Test MAE', 'CV R² (Mean±Std)']
+    if results is not None:
+        rows = model_results_rows(results, 'H_ICNIRP')
+        return create_results_table(document, 'H_ICNIRP Target Performance', headers, rows, highlight_best=True)
     rows = [
         ['SVR', '0.681', '-0.271', '1.17', '0.78', '0.204 ± 0.810'],
         ['Random Forest', '0.760', '0.401', '0.80', '0.67', '0.217 ± 0.587'],
@@ -265,3 +338,214 @@ def create_metrics_explanation_table(document):
         ['MAPE', '100/n × Σ|(y-ŷ)/y|', 'Percentage error'],
     ]
     return create_table(document, headers, rows, 'Table 8: Evaluation Metrics')
+
+
+def sobol_rows(results):
+    """
+    Build Sobol index rows from the sensitivity table
+
+    Args:
+        results: DataFrame in the sobol_indices.csv layout
+
+    Returns:
+        list of row lists
+    """
+    rows = []
+    for _, r in results.iterrows():
+        rows.append([
+            r['Target'],
+            r['Input'],
+            f"{r['S1']:.3f} [{r['S1_Low']:.3f}, {r['S1_High']:.3f}]",
+            f"{r['ST']:.3f} [{r['ST_Low']:.3f}, {r['ST_High']:.3f}]",
+        ])
+    return rows
+
+
+def create_sobol_table(document, results=None):
+    """
+    Create global sensitivity (Sobol index) table
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the sobol_indices.csv layout; the
+            published values are used when omitted
+    """
+    headers = ['Target', 'Input', 'First Order S1 [95% CI]', 'Total ST [95% CI]']
+    title = 'Table 9: Global Sensitivity Analysis (Sobol Indices)'
+    if results is not None:
+        return create_table(document, headers, sobol_rows(results), title)
+    rows = [
+        ['E_ICNIRP', 'Distance_m', '0.833 [0.791, 0.876]', '0.948 [0.939, 0.956]'],
+        ['E_ICNIRP', 'Temp_C', '0.001 [-0.006, 0.008]', '0.025 [0.024, 0.025]'],
+        ['E_ICNIRP', 'Humidity_Pct', '0.001 [-0.006, 0.008]', '0.017 [0.017, 0.018]'],
+        ['E_ICNIRP', 'Time_Hour', '0.000 [0.000, 0.000]', '0.000 [0.000, 0.000]'],
+        ['E_ICNIRP', 'Profile_Type', '0.000 [-0.011, 0.008]', '0.041 [0.040, 0.043]'],
+        ['E_ICNIRP', 'Circuit', '0.047 [0.033, 0.060]', '0.091 [0.089, 0.092]'],
+        ['H_ICNIRP', 'Distance_m', '0.568 [0.527, 0.617]', '0.669 [0.660, 0.677]'],
+        ['H_ICNIRP', 'Temp_C', '0.273 [0.237, 0.315]', '0.304 [0.299, 0.309]'],
+        ['H_ICNIRP', 'Humidity_Pct', '0.000 [-0.004, 0.004]', '0.005 [0.004, 0.005]'],
+        ['H_ICNIRP', 'Time_Hour', '0.000 [0.000, 0.000]', '0.000 [0.000, 0.000]'],
+        ['H_ICNIRP', 'Profile_Type', '0.051 [0.032, 0.071]', '0.112 [0.110, 0.115]'],
+        ['H_ICNIRP', 'Circuit', '0.005 [-0.002, 0.012]', '0.014 [0.014, 0.014]'],
+    ]
+    return create_table(document, headers, rows, title)
+
+
+def _samples(value):
+    """Format a sample count, where inf means the target is never reached"""
+    if math.isnan(value):
+        return '—'
+    return 'Not reached' if math.isinf(value) else f'{value:,.0f}'
+
+
+def sample_size_rows(results):
+    """
+    Build sample-size rows from the learning-curve estimates
+
+    Args:
+        results: DataFrame in the sample_size_estimates.csv layout
+
+    Returns:
+        list of row lists
+    """
+    rows = []
+    for _, r in results.iterrows():
+        # Fits pinned at the R² = 1 bound have no plateau and no estimate
+        if r.get('At_Bound', r['Asymptote'] >= 0.999):
+            asymptote, samples = '1 (bound)', 'Not estimable'
+        else:
+            asymptote = f"{r['Asymptote']:.2f}" if r['Asymptote'] > -1 else '—'
+            samples = f"{_samples(r['Samples_Needed'])} [{_samples(r['Samples_Low'])}, {_samples(r['Samples_High'])}]"
+        rows.append([
+            r['Target'],
+            r['Model'],
+            f"{r['Test_R2']:.3f} [{r['Test_R2_Low']:.2f}, {r['Test_R2_High']:.2f}]",
+            asymptote,
+            samples,
+        ])
+    return rows
+
+
+def create_sample_size_table(document, results=None):
+    """
+    Create learning-curve sample-size table
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the sample_size_estimates.csv layout;
+            the published values are used when omitted
+    """
+    headers = ['Target', 'Model', 'Test R² at n=52 [90% range]', 'Asymptote', 'Samples Needed [90% CI]']
+    title = 'Table 10: Training Samples Needed to Reach Test R² = 0.5 (Learning-Curve Extrapolation)'
+    if results is not None:
+        return create_table(document, headers, sample_size_rows(results), title)
+    rows = [
+        ['E_ICNIRP', 'Neural Network', '-0.564 [-1.40, 0.08]', '-0.20', 'Not reached [4,112, Not reached]'],
+        ['E_ICNIRP', 'Random Forest', '0.143 [-0.42, 0.55]', '0.25', 'Not reached [8,055, Not reached]'],
+        ['E_ICNIRP', 'SVR', '0.093 [-0.63, 0.64]', '1 (bound)', 'Not estimable'],
+        ['E_ICNIRP', 'XGBoost', '0.161 [-0.23, 0.47]', '1 (bound)', 'Not estimable'],
+        ['H_ICNIRP', 'Neural Network', '-0.539 [-1.97, 0.30]', '-0.10', 'Not reached [Not reached, Not reached]'],
+        ['H_ICNIRP', 'Random Forest', '0.348 [-0.06, 0.77]', '0.72', '151 [70, Not reached]'],
+        ['H_ICNIRP', 'SVR', '-0.291 [-1.47, 0.64]', '-0.21', 'Not reached [Not reached, Not reached]'],
+        ['H_ICNIRP', 'XGBoost', '0.303 [-0.20, 0.83]', '0.59', '269 [78, Not reached]'],
+    ]
+    return create_table(document, headers, rows, title)
+
+
+def repeated_cv_rows(results):
+    """
+    Build repeated cross-validation rows from the summary table
+
+    Args:
+        results: DataFrame in the repeated_cv_summary.csv layout
+
+    Returns:
+        list of row lists
+    """
+    rows = []
+    for _, r in results.iterrows():
+        rows.append([
+            r['Target'],
+            r['Model'],
+            f"{r['CV_R2_Mean']:.3f} ± {r['CV_R2_Std']:.3f}",
+            f"[{r['CV_R2_Low']:.3f}, {r['CV_R2_High']:.3f}]",
+        ])
+    return rows
+
+
+def model_comparison_rows(results):
+    """
+    Build paired model comparison rows from the comparisons table
+
+    Args:
+        results: DataFrame in the model_comparisons.csv layout
+
+    Returns:
+        list of row lists
+    """
+    rows = []
+    for _, r in results.iterrows():
+        rows.append([
+            r['Target'],
+            f"{r['Model_A']} vs {r['Model_B']}",
+            f"{r['R2_Difference']:.3f} [{r['Difference_Low']:.3f}, {r['Difference_High']:.3f}]",
+            f"{r['t']:.2f}",
+            f"{r['p_value']:.3f}",
+        ])
+    return rows
+
+
+def create_repeated_cv_table(document, results=None):
+    """
+    Create repeated cross-validation table with corrected confidence intervals
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the repeated_cv_summary.csv layout;
+            the published values are used when omitted
+    """
+    headers = ['Target', 'Model', 'CV R² (Mean±Std)', '95% CI (Nadeau-Bengio)']
+    title = 'Table 11: Repeated 5-Fold Cross-Validation (10 Repeats) with Corrected Intervals'
+    if results is not None:
+        return create_table(document, headers, repeated_cv_rows(results), title)
+    rows = [
+        ['E_ICNIRP', 'Random Forest', '0.145 ± 0.409', '[-0.282, 0.572]'],
+        ['E_ICNIRP', 'XGBoost', '0.042 ± 0.393', '[-0.368, 0.452]'],
+        ['E_ICNIRP', 'SVR', '-0.043 ± 0.581', '[-0.650, 0.564]'],
+        ['E_ICNIRP', 'Neural Network', '-0.324 ± 0.715', '[-1.071, 0.423]'],
+        ['H_ICNIRP', 'Random Forest', '0.352 ± 0.325', '[0.012, 0.691]'],
+        ['H_ICNIRP', 'XGBoost', '0.312 ± 0.436', '[-0.143, 0.767]'],
+        ['H_ICNIRP', 'SVR', '0.116 ± 0.548', '[-0.456, 0.688]'],
+        ['H_ICNIRP', 'Neural Network', '-0.057 ± 0.465', '[-0.542, 0.429]'],
+    ]
+    return create_table(document, headers, rows, title)
+
+
+def create_model_comparison_table(document, results=None):
+    """
+    Create paired model comparison (corrected resampled t-test) table
+
+    Args:
+        document: Word document object
+        results: Optional DataFrame in the model_comparisons.csv layout;
+            the published values are used when omitted
+    """
+    headers = ['Target', 'Comparison', 'ΔR² [95% CI]', 't', 'p-value']
+    title = 'Table 12: Paired Model Comparisons (Corrected Resampled t-test)'
+    if results is not None:
+        return create_table(document, headers, model_comparison_rows(results), title)
+    rows = [
+        ['E_ICNIRP', 'Random Forest vs XGBoost', '0.103 [-0.066, 0.273]', '1.22', '0.227'],
+        ['E_ICNIRP', 'Random Forest vs SVR', '0.188 [-0.102, 0.478]', '1.30', '0.198'],
+        ['E_ICNIRP', 'Random Forest vs Neural Network', '0.469 [-0.113, 1.051]', '1.62', '0.112'],
+        ['E_ICNIRP', 'XGBoost vs SVR', '0.085 [-0.217, 0.387]', '0.56', '0.575'],
+        ['E_ICNIRP', 'XGBoost vs Neural Network', '0.366 [-0.222, 0.954]', '1.25', '0.217'],
+        ['E_ICNIRP', 'SVR vs Neural Network', '0.281 [-0.279, 0.841]', '1.01', '0.319'],
+        ['H_ICNIRP', 'Random Forest vs XGBoost', '0.039 [-0.154, 0.233]', '0.41', '0.684'],
+        ['H_ICNIRP', 'Random Forest vs SVR', '0.235 [-0.220, 0.691]', '1.04', '0.305'],
+        ['H_ICNIRP', 'Random Forest vs Neural Network', '0.408 [-0.030, 0.846]', '1.87', '0.067'],
+        ['H_ICNIRP', 'XGBoost vs SVR', '0.196 [-0.329, 0.721]', '0.75', '0.457'],
+        ['H_ICNIRP', 'XGBoost vs Neural Network', '0.369 [-0.116, 0.854]', '1.53', '0.133'],
+        ['H_ICNIRP', 'SVR vs Neural Network', '0.173 [-0.279, 0.625]', '0.77', '0.446'],
+    ]
+    return create_table(document, headers, rows, title)